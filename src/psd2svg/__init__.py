@@ -1,4 +1,12 @@
+from psd2svg.image_utils import EncoderOptions, MaskProfile
 from psd2svg.resource_limits import WEBP_MAX_DIMENSION, ResourceLimits
 from psd2svg.svg_document import SVGDocument, convert
 
-__all__ = ["SVGDocument", "convert", "ResourceLimits", "WEBP_MAX_DIMENSION"]
+__all__ = [
+    "SVGDocument",
+    "convert",
+    "EncoderOptions",
+    "MaskProfile",
+    "ResourceLimits",
+    "WEBP_MAX_DIMENSION",
+]
@@ -1,9 +1,14 @@
 import argparse
 import logging
+import sys
+from typing import Any
 
-from psd2svg import convert
+from psd2svg import MaskProfile, convert
+from psd2svg.batch import collect_inputs, convert_batch
+from psd2svg.core.converter import MIN_TILE_SIZE
 from psd2svg.core.typesetting import TextWrappingMode
-from psd2svg.resource_limits import ResourceLimits
+from psd2svg.resource_limits import WEBP_MAX_DIMENSION, ResourceLimits
+from psd2svg.svg_document import ATLAS_MAX_SIZE
 
 
 def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
@@ -14,15 +19,113 @@ def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
     """
     parser = argparse.ArgumentParser(description="Convert PSD file to SVG")
     parser.add_argument(
-        "input", metavar="INPUT", type=str, help="Input PSD file path or URL"
+        "paths",
+        metavar="INPUT",
+        type=str,
+        nargs="+",
+        help=(
+            "Input PSD file path followed by an optional output file path. "
+            "With --output-dir, any number of input files, directories, or "
+            "glob patterns; '-' reads a manifest of paths from stdin."
+        ),
     )
     parser.add_argument(
-        "output",
-        metavar="PATH",
+        "--output-dir",
+        metavar="TEMPLATE",
         type=str,
-        nargs="?",
-        default=".",
-        help="Output file.",
+        default=None,
+        help=(
+            "Enable batch mode and write each INPUT to TEMPLATE/<stem>.svg. "
+            "TEMPLATE may contain {parent} (input directory), {relparent} "
+            "(input directory relative to the searched directory), and {stem}."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="N",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes in batch mode. "
+            "Use 0 for one worker per CPU. Default: 1"
+        ),
+    )
+    parser.add_argument(
+        "--max-workers",
+        metavar="N",
+        type=int,
+        default=None,
+        help=(
+            "Maximum number of threads for encoding images. "
+            "Default: one per CPU, or 1 per worker process with --jobs other "
+            "than 1. Use 1 to encode serially."
+        ),
+    )
+    parser.add_argument(
+        "--lazy-images",
+        dest="lazy_images",
+        action="store_true",
+        help=(
+            "Decode layer pixels only when writing images to lower peak memory "
+            "on large files."
+        ),
+    )
+    parser.add_argument(
+        "--low-memory",
+        dest="low_memory",
+        action="store_true",
+        help="Keep images losslessly compressed in memory during conversion.",
+    )
+    parser.add_argument(
+        "--trim-images",
+        dest="trim_images",
+        action="store_true",
+        help="Crop transparent borders of pixel layers and masks.",
+    )
+    parser.add_argument(
+        "--crop-to-canvas",
+        dest="crop_to_canvas",
+        action="store_true",
+        help="Crop pixel layers and masks to the canvas and artboards.",
+    )
+    parser.add_argument(
+        "--bake-masks",
+        dest="bake_masks",
+        action="store_true",
+        help="Multiply layer masks into the alpha of pixel layers.",
+    )
+    parser.add_argument(
+        "--max-image-scale",
+        metavar="SCALE",
+        dest="max_image_scale",
+        type=float,
+        default=None,
+        help="Downsample images by a factor in (0, 1], e.g. 0.25 for previews.",
+    )
+    parser.add_argument(
+        "--target-width",
+        metavar="PIXELS",
+        dest="target_width",
+        type=int,
+        default=None,
+        help="Downsample images for display at this document width.",
+    )
+    parser.add_argument(
+        "--tile-size",
+        metavar="PIXELS",
+        dest="tile_size",
+        type=int,
+        default=None,
+        help="Split images larger than PIXELS on a side into tiles.",
+    )
+    parser.add_argument(
+        "--pack-images",
+        metavar="PIXELS",
+        dest="pack_images",
+        type=int,
+        default=None,
+        help="Pack images up to PIXELS on a side into shared atlas images.",
     )
     parser.add_argument(
         "--image-prefix",
@@ -31,6 +134,24 @@ def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
         default=None,
         help="Path prefix for saving extracted images relative to output.",
     )
+    parser.add_argument(
+        "--hash-filenames",
+        dest="hash_filenames",
+        action="store_true",
+        help=(
+            "Name extracted images by a hash of their content and skip files "
+            "that already exist."
+        ),
+    )
+    parser.add_argument(
+        "--progressive",
+        dest="progressive",
+        action="store_true",
+        help=(
+            "Embed tiny blurred placeholders and reference the extracted "
+            "images in data-src. Requires --image-prefix."
+        ),
+    )
     parser.add_argument(
         "--no-text",
         dest="enable_text",
@@ -59,9 +180,58 @@ def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
         "--image-format",
         metavar="FORMAT",
         type=str,
-        choices=["webp", "png", "jpeg"],
+        choices=["webp", "png", "jpeg", "auto"],
         default="webp",
-        help="Image format for rasterized layers (webp, png, jpeg). Default: webp",
+        help=(
+            "Image format for rasterized layers (webp, png, jpeg), or auto to "
+            "choose one per image from its content. Default: webp"
+        ),
+    )
+    parser.add_argument(
+        "--encode-budget",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help=(
+            "Time budget for encoding images with --image-format auto. Once it "
+            "runs out, remaining images skip trying alternative formats."
+        ),
+    )
+    parser.add_argument(
+        "--encoder-preset",
+        metavar="PRESET",
+        type=str,
+        choices=["fastest", "balanced", "smallest"],
+        default=None,
+        help=(
+            "Image encoder settings: fastest (least CPU time), balanced "
+            "(Pillow defaults), or smallest (fewest bytes). Default: balanced"
+        ),
+    )
+    parser.add_argument(
+        "--mask-format",
+        metavar="FORMAT",
+        type=str,
+        choices=["png", "webp", "jpeg"],
+        default=None,
+        help=(
+            "Encode layer masks with their own profile, writing soft masks in "
+            "FORMAT (png, webp, jpeg) and hard masks as 1-bit or palette PNG."
+        ),
+    )
+    parser.add_argument(
+        "--mask-quality",
+        metavar="QUALITY",
+        type=int,
+        default=None,
+        help="Encoder quality (0-100) for soft masks in lossy mask formats.",
+    )
+    parser.add_argument(
+        "--mask-scale",
+        metavar="FACTOR",
+        type=float,
+        default=None,
+        help="Downsample soft masks by FACTOR, in (0, 1]. Default: 1.0",
     )
     parser.add_argument(
         "--text-letter-spacing-offset",
@@ -148,6 +318,26 @@ def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
             "Overrides PSD2SVG_MAX_IMAGE_DIMENSION environment variable."
         ),
     )
+    parser.add_argument(
+        "--max-memory",
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help=(
+            "Maximum address space in bytes for isolated conversion. "
+            "Default: 0 (disabled). Only enforced with --isolate. "
+            "Overrides PSD2SVG_MAX_MEMORY environment variable."
+        ),
+    )
+    parser.add_argument(
+        "--isolate",
+        dest="isolate",
+        action="store_true",
+        help=(
+            "Convert in a forked worker process with memory and CPU rlimits "
+            "and a hard timeout kill (Unix only)."
+        ),
+    )
     parser.add_argument(
         "--unlimited-resources",
         dest="unlimited_resources",
@@ -157,7 +347,55 @@ def parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
             "Conflicts with other limit flags."
         ),
     )
-    return parser.parse_args(), parser
+    args = parser.parse_args()
+    if args.output_dir is None:
+        if len(args.paths) > 2:
+            parser.error("multiple inputs require --output-dir")
+        args.input = args.paths[0]
+        args.output = args.paths[1] if len(args.paths) > 1 else "."
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or positive")
+    if args.max_workers is not None and args.max_workers < 1:
+        parser.error("--max-workers must be positive")
+    if args.encode_budget is not None and args.encode_budget < 0:
+        parser.error("--encode-budget must be zero or positive")
+    if args.max_image_scale is not None and not 0 < args.max_image_scale <= 1:
+        parser.error("--max-image-scale must be in (0, 1]")
+    if args.target_width is not None and args.target_width < 1:
+        parser.error("--target-width must be positive")
+    if args.progressive and args.image_prefix is None:
+        parser.error("--progressive requires --image-prefix")
+    if args.pack_images is not None and not (
+        1 <= args.pack_images <= ATLAS_MAX_SIZE - 2
+    ):
+        parser.error(f"--pack-images must be between 1 and {ATLAS_MAX_SIZE - 2}")
+    if args.tile_size is not None and not (
+        MIN_TILE_SIZE <= args.tile_size <= WEBP_MAX_DIMENSION
+    ):
+        parser.error(
+            f"--tile-size must be between {MIN_TILE_SIZE} and {WEBP_MAX_DIMENSION}"
+        )
+    return args, parser
+
+
+def run_batch(args: argparse.Namespace, options: dict[str, Any]) -> int:
+    """Run batch conversion and report per-file results.
+
+    Returns:
+        Process exit code: 0 if all files converted, 1 otherwise.
+    """
+    items = collect_inputs(args.paths)
+    failures = 0
+    for result in convert_batch(items, args.output_dir, jobs=args.jobs, **options):
+        if result.ok:
+            print(f"OK {result.input_path} -> {result.output_path}")
+        else:
+            failures += 1
+            print(f"FAILED {result.input_path}: {result.error}", file=sys.stderr)
+    if failures:
+        print(f"psd2svg: {failures} of {len(items)} files failed", file=sys.stderr)
+        return 1
+    return 0
 
 
 def main() -> None:
@@ -172,12 +410,25 @@ def main() -> None:
             timeout=args.timeout,
             max_layer_depth=args.max_layer_depth,
             max_image_dimension=args.max_image_dimension,
+            max_memory=args.max_memory,
             unlimited=args.unlimited_resources,
         )
     except ValueError as e:
         # Convert ValueError to CLI error with proper exit code
         parser.error(str(e))
 
+    # Any mask option selects a mask profile; unset ones keep the defaults
+    mask_profile = None
+    if (args.mask_format, args.mask_quality, args.mask_scale) != (None, None, None):
+        try:
+            mask_profile = MaskProfile(
+                format=args.mask_format or "png",
+                quality=args.mask_quality,
+                scale=1.0 if args.mask_scale is None else args.mask_scale,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
     # Map text wrapping mode to enum value
     text_wrapping_mode_map = {
         "none": TextWrappingMode.NONE,
@@ -185,9 +436,7 @@ def main() -> None:
     }
     text_wrapping_mode = text_wrapping_mode_map[args.text_wrapping_mode]
 
-    convert(
-        args.input,
-        args.output,
+    options = dict(
         image_prefix=args.image_prefix,
         enable_text=args.enable_text,
         enable_live_shapes=args.enable_live_shapes,
@@ -199,8 +448,29 @@ def main() -> None:
         font_format=args.font_format,
         text_wrapping_mode=text_wrapping_mode,
         resource_limits=resource_limits,
+        isolate=args.isolate,
+        max_workers=args.max_workers,
+        lazy_images=args.lazy_images,
+        low_memory=args.low_memory,
+        trim_images=args.trim_images,
+        crop_to_canvas=args.crop_to_canvas,
+        bake_masks=args.bake_masks,
+        max_image_scale=args.max_image_scale,
+        target_width=args.target_width,
+        tile_size=args.tile_size,
+        mask_profile=mask_profile,
+        encode_budget=args.encode_budget,
+        encoder_options=args.encoder_preset,
+        hash_filenames=args.hash_filenames,
+        pack_images=args.pack_images,
+        progressive=args.progressive,
     )
 
+    if args.output_dir is not None:
+        sys.exit(run_batch(args, options))
+
+    convert(args.input, args.output, **options)
+
 
 if __name__ == "__main__":
     main()
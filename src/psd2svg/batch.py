@@ -0,0 +1,323 @@
+"""Batch conversion of many PSD files.
+
+This module backs the batch mode of the ``psd2svg`` command line tool. Inputs
+are expanded from files, directories, glob patterns, or a manifest, and each
+file is converted with :func:`psd2svg.convert` in a pool of long-lived worker
+processes. Workers are initialized once, so interpreter startup, imports, and
+font mapping loading are paid per worker rather than per file.
+
+Example usage::
+
+    from psd2svg.batch import collect_inputs, convert_batch
+
+    inputs = collect_inputs(["designs/"])
+    for result in convert_batch(inputs, "out/{relparent}", jobs=4):
+        print(result.input_path, result.ok)
+"""
+
+import dataclasses
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, TextIO
+
+from psd2svg.core import font_mapping
+from psd2svg.svg_document import convert
+
+logger = logging.getLogger(__name__)
+
+PSD_EXTENSIONS = (".psd", ".psb")
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchItem:
+    """A single input file and the root it was discovered from.
+
+    Attributes:
+        input_path: Path to the PSD file, or the unmatched pattern for items
+            with an error.
+        root: Directory the file was discovered in. Used to compute the
+            ``{relparent}`` template field; equals the file's own directory
+            for inputs given explicitly.
+        error: Error message if the input could not be resolved, such as a
+            pattern without matches, otherwise None.
+    """
+
+    input_path: str
+    root: str
+    error: str | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchResult:
+    """Outcome of converting a single batch item.
+
+    Attributes:
+        input_path: Path to the PSD file.
+        output_path: Path to the output SVG file.
+        error: Error message if conversion failed, otherwise None.
+    """
+
+    input_path: str
+    output_path: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the conversion succeeded."""
+        return self.error is None
+
+
+def collect_inputs(
+    patterns: Iterable[str], manifest: TextIO | None = None
+) -> list[BatchItem]:
+    """Expand input arguments into a list of PSD files.
+
+    Args:
+        patterns: File paths, directories, or glob patterns. Directories are
+            searched recursively for ``.psd`` and ``.psb`` files. The special
+            value ``"-"`` reads one path per line from ``manifest``.
+        manifest: Stream to read the manifest from when ``"-"`` is given.
+            Defaults to ``sys.stdin``.
+
+    Returns:
+        List of batch items in a stable order, without duplicates. A pattern
+        that matches no files yields an item with an error, which
+        :func:`convert_batch` reports as a failure without aborting the batch.
+    """
+    items: list[BatchItem] = []
+    seen: set[str] = set()
+
+    def _add(path: str, root: str) -> None:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            items.append(BatchItem(input_path=path, root=root))
+
+    for pattern in patterns:
+        if pattern == "-":
+            stream = manifest if manifest is not None else sys.stdin
+            for line in stream:
+                path = line.strip()
+                if path and not path.startswith("#"):
+                    _add(path, os.path.dirname(path))
+        elif os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(PSD_EXTENSIONS):
+                        _add(os.path.join(dirpath, filename), pattern)
+        elif os.path.exists(pattern):
+            _add(pattern, os.path.dirname(pattern))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                items.append(
+                    BatchItem(
+                        input_path=pattern,
+                        root="",
+                        error=f"FileNotFoundError: No input files match: {pattern}",
+                    )
+                )
+                continue
+            root = _glob_root(pattern)
+            for path in matches:
+                if os.path.isfile(path):
+                    _add(path, root)
+    return items
+
+
+def _glob_root(pattern: str) -> str:
+    """Return the longest leading directory of a glob pattern without wildcards."""
+    parts = []
+    for part in pattern.replace(os.sep, "/").split("/")[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return "/".join(parts)
+
+
+def resolve_output_path(item: BatchItem, output_dir: str) -> str:
+    """Resolve the output SVG path for a batch item.
+
+    The output directory is a template formatted with the following fields:
+
+    - ``{parent}``: Directory of the input file.
+    - ``{relparent}``: Directory of the input file relative to the directory
+      or glob root it was discovered from (empty for explicit files).
+    - ``{stem}``: Input filename without extension.
+
+    The output filename is always ``{stem}.svg`` inside the formatted directory.
+
+    Args:
+        item: Batch item to resolve.
+        output_dir: Output directory template.
+
+    Returns:
+        Path to the output SVG file.
+    """
+    stem = os.path.splitext(os.path.basename(item.input_path))[0]
+    parent = os.path.dirname(item.input_path)
+    relparent = os.path.relpath(parent or ".", item.root or ".")
+    if relparent == ".":
+        relparent = ""
+    directory = output_dir.format(parent=parent, relparent=relparent, stem=stem)
+    return os.path.join(directory, stem + ".svg")
+
+
+def resolve_image_prefix(
+    item: BatchItem, image_prefix: str, hash_filenames: bool = False
+) -> str:
+    """Resolve the image prefix for a batch item.
+
+    Image files are numbered per document, so documents sharing an output
+    directory would overwrite each other's images under a common prefix. The
+    prefix is therefore made unique per document: a ``{stem}`` field is
+    replaced by the input filename without extension, and otherwise the stem
+    is appended to the prefix. With ``hash_filenames``, files are named by
+    content and may be shared, so the prefix is used as is.
+
+    Args:
+        item: Batch item to resolve.
+        image_prefix: Image prefix given for the batch.
+        hash_filenames: Whether image files are named by content hash.
+
+    Returns:
+        Image prefix for the item.
+    """
+    if hash_filenames:
+        return image_prefix
+    stem = os.path.splitext(os.path.basename(item.input_path))[0]
+    if "{stem}" in image_prefix:
+        return image_prefix.replace("{stem}", stem)
+    if image_prefix == ".":
+        return f"{stem}_"
+    if image_prefix.endswith(("/", os.sep)):
+        return f"{image_prefix}{stem}_"
+    return f"{image_prefix}_{stem}_"
+
+
+def _init_worker(loglevel: int) -> None:
+    """Warm up a worker process before it receives any file."""
+    logging.basicConfig(level=loglevel)
+    font_mapping.get_all_font_mappings()
+
+
+def _convert_one(
+    input_path: str, output_path: str, options: dict[str, Any]
+) -> BatchResult:
+    """Convert a single file, capturing any error as a result."""
+    try:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        convert(input_path, output_path, **options)
+    except Exception as e:
+        logger.debug("Failed to convert %s", input_path, exc_info=True)
+        return BatchResult(input_path, output_path, f"{type(e).__name__}: {e}")
+    return BatchResult(input_path, output_path)
+
+
+def convert_batch(
+    items: Iterable[BatchItem],
+    output_dir: str,
+    jobs: int = 1,
+    **options: Any,
+) -> Iterator[BatchResult]:
+    """Convert many PSD files, yielding one result per input.
+
+    A failure in one file is reported in its result and does not abort the
+    remaining conversions. Inputs whose output SVG or image files would
+    overwrite those of an earlier input, such as files with the same name in
+    different directories converted into one directory, fail without being
+    converted.
+
+    Args:
+        items: Batch items from :func:`collect_inputs`.
+        output_dir: Output directory template, see :func:`resolve_output_path`.
+        jobs: Number of worker processes. Use 1 to convert in the current
+            process and 0 to use one worker per CPU.
+        **options: Keyword arguments passed to :func:`psd2svg.convert`, such
+            as ``image_format`` or ``resource_limits``. With more than one worker
+            process, ``max_workers`` defaults to 1 to avoid oversubscription.
+            ``image_prefix`` is resolved per input, see
+            :func:`resolve_image_prefix`.
+
+    Yields:
+        BatchResult for each item, in input order.
+    """
+    plan = _plan_batch(items, output_dir, options)
+    tasks = [entry for entry in plan if isinstance(entry, tuple)]
+    if jobs == 1 or len(tasks) <= 1:
+        for entry in plan:
+            yield entry if isinstance(entry, BatchResult) else _convert_one(*entry)
+        return
+
+    if options.get("max_workers") is None:
+        # Processes already use all cores; avoid oversubscribing with threads.
+        tasks = [
+            (input_path, output_path, {**task_options, "max_workers": 1})
+            for input_path, output_path, task_options in tasks
+        ]
+    max_workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(tasks)),
+        initializer=_init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    ) as executor:
+        futures = [executor.submit(_convert_one, *task) for task in tasks]
+        pending = zip(tasks, futures)
+        for entry in plan:
+            if isinstance(entry, BatchResult):
+                yield entry
+                continue
+            (input_path, output_path, _), future = next(pending)
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed by the OS).
+                yield BatchResult(input_path, output_path, f"{type(e).__name__}: {e}")
+
+
+def _plan_batch(
+    items: Iterable[BatchItem], output_dir: str, options: dict[str, Any]
+) -> list[BatchResult | tuple[str, str, dict[str, Any]]]:
+    """Resolve the outputs of a batch.
+
+    Returns:
+        For each item in order, either a failed BatchResult for inputs that
+        cannot be converted, or the (input path, output path, options) to
+        convert it with.
+    """
+    plan: list[BatchResult | tuple[str, str, dict[str, Any]]] = []
+    # Input path by the absolute output and image prefix paths it writes to.
+    claimed: dict[str, str] = {}
+    for item in items:
+        if item.error is not None:
+            plan.append(BatchResult(item.input_path, "", item.error))
+            continue
+        output_path = resolve_output_path(item, output_dir)
+        item_options = options
+        paths = [os.path.abspath(output_path)]
+        if options.get("image_prefix") is not None:
+            image_prefix = resolve_image_prefix(
+                item, options["image_prefix"], options.get("hash_filenames", False)
+            )
+            item_options = {**options, "image_prefix": image_prefix}
+            if image_prefix != options["image_prefix"]:
+                paths.append(os.path.join(os.path.dirname(paths[0]), image_prefix))
+        collision = next((claimed[path] for path in paths if path in claimed), None)
+        if collision is not None:
+            plan.append(
+                BatchResult(
+                    item.input_path,
+                    output_path,
+                    f"Output collides with that of {collision}",
+                )
+            )
+            continue
+        claimed.update((path, item.input_path) for path in paths)
+        plan.append((item.input_path, output_path, item_options))
+    return plan
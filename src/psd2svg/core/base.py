@@ -8,8 +8,10 @@ from psd_tools.api import adjustments, layers
 from psd_tools.constants import BlendMode
 from psd_tools.psd.descriptor import Descriptor
 
+from psd2svg.image_utils import LazyImage
+
 if TYPE_CHECKING:
-    pass
+    from psd2svg.timeout_utils import Deadline
 
 
 class ConverterProtocol(Protocol):
@@ -18,7 +20,11 @@ class ConverterProtocol(Protocol):
     psd: PSDImage
     svg: ET.Element
     current: ET.Element
-    images: dict[str, Image.Image]
+    images: dict[str, Image.Image | LazyImage]
+    # Content hash to image, shared by image IDs with identical pixels.
+    image_store: dict[str, Image.Image | LazyImage]
+    # Pattern ID to the shared base <pattern> element.
+    pattern_cache: dict[str, ET.Element]
     # Note: fonts dict removed - PostScript names stored directly in SVG
 
     # Flags to control the conversion.
@@ -31,6 +37,21 @@ class ConverterProtocol(Protocol):
     text_letter_spacing_offset: float
     text_wrapping_mode: int
 
+    # Cooperative conversion deadline, checked at layer and effect boundaries.
+    deadline: "Deadline | None"
+
+    # Defer decoding layer pixels and masks until output.
+    lazy_images: bool
+    # Keep images compressed in memory during the build.
+    low_memory: bool
+    # Crop pixel layers and masks to their content.
+    trim_images: bool
+    # Multiply layer masks into the alpha of plain pixel layers.
+    bake_masks: bool
+    # Area where layer images can be seen, as (left, top, right, bottom), or
+    # None when images must be kept whole.
+    visible_bounds: tuple[int, int, int, int] | None
+
     def add_layer(
         self, layer: layers.Layer, depth: int = 0, **attrib: str
     ) -> ET.Element | None: ...
@@ -176,6 +197,23 @@ class ConverterProtocol(Protocol):
 
     # Utilities
     def auto_id(self, prefix: str = "") -> str: ...
+    def check_deadline(self) -> None: ...
+    def store_image(
+        self, image_id: str, image: Image.Image | LazyImage, scaled: bool = False
+    ) -> None: ...
+    def add_image(
+        self,
+        image: Image.Image | LazyImage,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        parent: ET.Element | None = None,
+        title: str = "",
+        class_: str = "",
+        tile: bool = True,
+        **attrib: Any,
+    ) -> ET.Element: ...
     def create_node(
         self,
         tag: str,
@@ -188,3 +226,7 @@ class ConverterProtocol(Protocol):
     ) -> ET.Element: ...
     @contextlib.contextmanager
     def set_current(self, node: ET.Element) -> Iterator[None]: ...
+    @contextlib.contextmanager
+    def set_visible_bounds(
+        self, bounds: tuple[int, int, int, int] | None
+    ) -> Iterator[None]: ...
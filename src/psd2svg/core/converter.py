@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING, Any, Iterator
 from PIL import Image
 from psd_tools import PSDImage
 
-from psd2svg import svg_utils
+from psd2svg import image_utils, svg_utils
 from psd2svg.core.adjustment import AdjustmentConverter
 from psd2svg.core.counter import AutoCounter
 from psd2svg.core.effects import EffectConverter
@@ -14,12 +14,18 @@ from psd2svg.core.layer import LayerConverter
 from psd2svg.core.paint import PaintConverter
 from psd2svg.core.shape import ShapeConverter
 from psd2svg.core.text import TextConverter
+from psd2svg.image_utils import LazyImage
+from psd2svg.resource_limits import WEBP_MAX_DIMENSION
 
 if TYPE_CHECKING:
     from psd2svg.resource_limits import ResourceLimits
+    from psd2svg.timeout_utils import Deadline
 
 logger = logging.getLogger(__name__)
 
+# Smallest tile size, so that tiling cannot create millions of images.
+MIN_TILE_SIZE = 256
+
 
 class Converter(
     AdjustmentConverter,
@@ -76,6 +82,10 @@ class Converter(
             When not provided, uses built-in mapping for ~4,950 fonts
             (539 default + 370 Hiragino + 4,042 Morisawa) with automatic fallback to
             system font resolution (fontconfig/Windows registry) if needed.
+        resource_limits: Optional resource limits for depth and dimension checks.
+        deadline: Optional cooperative deadline. When set, the converter raises
+            TimeoutError at the next layer, effect, or image boundary after the
+            deadline passes. Works from any thread.
     """
 
     _id_counter: AutoCounter | None = None
@@ -91,6 +101,15 @@ class Converter(
         text_wrapping_mode: int = 0,
         font_mapping: dict[str, dict[str, float | str]] | None = None,
         resource_limits: "ResourceLimits | None" = None,
+        deadline: "Deadline | None" = None,
+        lazy_images: bool = False,
+        low_memory: bool = False,
+        trim_images: bool = False,
+        crop_to_canvas: bool = False,
+        bake_masks: bool = False,
+        max_image_scale: float | None = None,
+        target_width: int | None = None,
+        tile_size: int | None = None,
     ) -> None:
         """Initialize the converter internal state."""
         # Source PSD image.
@@ -105,6 +124,21 @@ class Converter(
         self.text_wrapping_mode = text_wrapping_mode
         self.font_mapping = font_mapping
         self.resource_limits = resource_limits
+        self.deadline = deadline
+        self.lazy_images = lazy_images
+        self.low_memory = low_memory
+        self.trim_images = trim_images
+        self.bake_masks = bake_masks
+        self.image_scale = _image_scale(psdimage, max_image_scale, target_width)
+        if (
+            tile_size is not None
+            and not MIN_TILE_SIZE <= tile_size <= WEBP_MAX_DIMENSION
+        ):
+            raise ValueError(
+                f"tile_size must be between {MIN_TILE_SIZE} and "
+                f"{WEBP_MAX_DIMENSION}, got {tile_size}"
+            )
+        self.tile_size = tile_size
 
         # Initialize the SVG root element.
         self.svg = svg_utils.create_node(
@@ -114,12 +148,20 @@ class Converter(
             height=psdimage.height,
             viewBox=svg_utils.seq2str([0, 0, psdimage.width, psdimage.height], sep=" "),
         )
-        self.images: dict[str, Image.Image] = {}  # Store PIL images keyed by image ID.
+        # Store PIL images (or lazy handles) keyed by image ID.
+        self.images: dict[str, Image.Image | LazyImage] = {}
+        # Unique images by content.
+        self.image_store: dict[str, Image.Image | LazyImage] = {}
+        self.pattern_cache: dict[str, ET.Element] = {}  # Base patterns by ID.
         # Note: Font tracking removed - PostScript names are stored directly
         # in SVG font-family attributes
 
         # Initialize the current node pointer.
         self.current = self.svg
+        # Images are cropped to the canvas only when requested.
+        self.visible_bounds: tuple[int, int, int, int] | None = (
+            (0, 0, psdimage.width, psdimage.height) if crop_to_canvas else None
+        )
 
     def build(self) -> None:
         """Build the SVG structure and internally save the result."""
@@ -127,23 +169,147 @@ class Converter(
 
         if len(self.psd) == 0 and self.psd.has_preview():
             # Special case: No layers, just a flat image.
-            image_id = self.auto_id("image")
-            self.create_node(
-                "image",
-                id=image_id,
-                width=self.psd.width,
-                height=self.psd.height,
-            )
-            self.images[image_id] = self.psd.composite()
+            self.add_image(self.psd.composite(), 0, 0, self.psd.width, self.psd.height)
+            self.check_deadline()
         else:
             self.add_children(self.psd)
 
+        if self.image_scale < 1:
+            # Downsampled images keep their size in document units, and
+            # rounding may change their aspect ratio slightly.
+            for node in self.svg.iter("image"):
+                if node.get("id") in self.images:
+                    node.set("preserveAspectRatio", "none")
+
     def auto_id(self, prefix: str = "") -> str:
         """Generate a unique ID for SVG elements."""
         if self._id_counter is None:
             self._id_counter = AutoCounter()
         return self._id_counter.get_id(prefix)
 
+    def check_deadline(self) -> None:
+        """Raise TimeoutError if the conversion deadline has passed."""
+        if self.deadline is not None:
+            self.deadline.check()
+
+    def store_image(
+        self, image_id: str, image: Image.Image | LazyImage, scaled: bool = False
+    ) -> None:
+        """Store the image for an <image> element.
+
+        Images with identical pixels share a single PIL image, so they are
+        held in memory and encoded only once. Lazy images are matched by the
+        hash of their source data instead.
+
+        In low-memory mode, opaque RGBA images are reduced to RGB and each
+        unique image is kept as compressed bytes. With an image scale below 1,
+        each unique image is downsampled before it is stored, unless scaled is
+        True because the caller already did so.
+        """
+        if isinstance(image, LazyImage):
+            key = image.key
+        else:
+            if self.low_memory:
+                image = image_utils.drop_opaque_alpha(image)
+            key = image_utils.content_hash(image)
+        if key not in self.image_store:
+            if self.image_scale < 1 and not scaled:
+                image = image_utils.scale_image(image, self.image_scale)
+            if self.low_memory and isinstance(image, Image.Image):
+                # The hash of a downsampled image is no longer the key.
+                image = image_utils.CompressedImage.from_image(
+                    image, key if self.image_scale == 1 or scaled else None
+                )
+        self.images[image_id] = self.image_store.setdefault(key, image)
+
+    def add_image(
+        self,
+        image: Image.Image | LazyImage,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        parent: ET.Element | None = None,
+        title: str = "",
+        class_: str = "",
+        tile: bool = True,
+        **attrib: Any,
+    ) -> ET.Element:
+        """Store the image and add an <image> element that draws it.
+
+        With a tile size, an image larger than a tile on either side is split
+        into a grid of tiles, each stored as its own image, so that tiles are
+        encoded in parallel and stay within the WebP size limit. The tiles are
+        <image> elements inside a <g> that takes the attributes, so masks and
+        opacity apply to the image as a whole. Lazy images are not tiled, as
+        every tile would decode the whole image again.
+
+        Args:
+            image: Image to draw.
+            x: Left edge of the image in document units.
+            y: Top edge of the image in document units.
+            width: Width of the image in document units.
+            height: Height of the image in document units.
+            parent: Optional parent element. Defaults to the current element.
+            title: Optional title element.
+            class_: Optional class attribute.
+            tile: Whether the image may be split into tiles. Pass False for
+                effect targets: effects size their fills from the x, y, width,
+                and height of the target, which a <g> does not have.
+            **attrib: Additional attributes of the element.
+
+        Returns:
+            The <image> element, or the <g> element holding the tiles.
+        """
+        image_id = self.auto_id("image")
+        if (
+            not tile
+            or self.tile_size is None
+            or not isinstance(image, Image.Image)
+            or max(image.size) * self.image_scale <= self.tile_size
+        ):
+            self.store_image(image_id, image)
+            return self.create_node(
+                "image",
+                parent=parent,
+                id=image_id,
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                title=title,
+                class_=class_,
+                **attrib,
+            )
+
+        # Cut the tiles from the downsampled image, so that they line up.
+        image = image_utils.scale_image(image, self.image_scale)
+        assert isinstance(image, Image.Image)
+        scale_x, scale_y = width / image.width, height / image.height
+        logger.debug(f"Splitting image of size {image.size} into tiles")
+        group = self.create_node(
+            "g", parent=parent, id=image_id, title=title, class_=class_, **attrib
+        )
+        for top in range(0, image.height, self.tile_size):
+            bottom = min(top + self.tile_size, image.height)
+            for left in range(0, image.width, self.tile_size):
+                right = min(left + self.tile_size, image.width)
+                tile_id = self.auto_id("image")
+                self.store_image(
+                    tile_id, image.crop((left, top, right, bottom)), scaled=True
+                )
+                self.create_node(
+                    "image",
+                    parent=group,
+                    id=tile_id,
+                    x=x + left * scale_x,
+                    y=y + top * scale_y,
+                    width=(right - left) * scale_x,
+                    height=(bottom - top) * scale_y,
+                )
+            self.check_deadline()
+        return group
+
     def create_node(
         self,
         tag: str,
@@ -201,3 +367,42 @@ class Converter(
             yield
         finally:
             self.current = previous
+
+    @contextlib.contextmanager
+    def set_visible_bounds(
+        self, bounds: tuple[int, int, int, int] | None
+    ) -> Iterator[None]:
+        """Set the area where layer images can be seen.
+
+        Pass None to keep images whole, e.g. where effects may show pixels
+        from outside the visible area.
+        """
+        previous = self.visible_bounds
+        self.visible_bounds = bounds
+        try:
+            yield
+        finally:
+            self.visible_bounds = previous
+
+
+def _image_scale(
+    psdimage: PSDImage, max_image_scale: float | None, target_width: int | None
+) -> float:
+    """Return the scale factor for stored images.
+
+    Raises:
+        ValueError: If max_image_scale is not in (0, 1] or target_width is not
+            positive.
+    """
+    scale = 1.0
+    if max_image_scale is not None:
+        if not 0 < max_image_scale <= 1:
+            raise ValueError(
+                f"max_image_scale must be in (0, 1], got {max_image_scale}"
+            )
+        scale = max_image_scale
+    if target_width is not None:
+        if target_width <= 0:
+            raise ValueError(f"target_width must be positive, got {target_width}")
+        scale = min(scale, target_width / max(psdimage.width, 1))
+    return scale
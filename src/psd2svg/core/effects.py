@@ -24,6 +24,7 @@ class EffectConverter(ConverterProtocol):
         self, layer: layers.Layer, target: ET.Element, insert_before_target: bool = True
     ) -> None:
         """Apply background effects to the target element."""
+        self.check_deadline()
         self.apply_drop_shadow_effect(
             layer, target, insert_before_target=insert_before_target
         )
@@ -33,6 +34,7 @@ class EffectConverter(ConverterProtocol):
 
     def apply_overlay_effects(self, layer: layers.Layer, target: ET.Element) -> None:
         """Apply overlay effects to the target element."""
+        self.check_deadline()
         self.apply_pattern_overlay_effect(layer, target)
         self.apply_gradient_overlay_effect(layer, target)
         self.apply_color_overlay_effect(layer, target)
@@ -98,6 +100,7 @@ class EffectConverter(ConverterProtocol):
 
     def apply_stroke_effect(self, layer: layers.Layer, target: ET.Element) -> None:
         """Apply stroke effects to the target element."""
+        self.check_deadline()
         effect_list = list(layer.effects.find("stroke", enabled=True))
         for effect in reversed(effect_list):
             assert isinstance(effect, effects.Stroke)
@@ -1,15 +1,19 @@
 import contextlib
+import hashlib
 import logging
 from typing import Callable, Iterator
 from xml.etree import ElementTree as ET
 
+from PIL import Image
 from psd_tools import PSDImage
 from psd_tools.api import adjustments, layers
-from psd_tools.constants import BlendMode, Tag
+from psd_tools.constants import BlendMode, ChannelID, Tag
 
-from psd2svg import svg_utils
+from psd2svg import image_utils, svg_utils
+from psd2svg.core import color_utils
 from psd2svg.core.base import ConverterProtocol
 from psd2svg.core.constants import BLEND_MODE, INACCURATE_BLEND_MODES
+from psd2svg.image_utils import LazyImage
 from psd2svg.resource_limits import WEBP_MAX_DIMENSION
 
 logger = logging.getLogger(__name__)
@@ -27,7 +31,11 @@ class LayerConverter(ConverterProtocol):
             layer: The PSD layer to add.
             depth: Current nesting depth (for resource limit checking).
             attrib: Additional attributes to set on the created node.
+
+        Raises:
+            TimeoutError: If the conversion deadline has passed.
         """
+        self.check_deadline()
         if not layer.is_visible():
             # TODO: Option to include hidden layers.
             logger.debug(f"Layer '{layer.name}' ({layer.kind}) is invisible, skipping.")
@@ -85,7 +93,16 @@ class LayerConverter(ConverterProtocol):
             id=self.auto_id("artboard") if layer.has_effects() else None,
             **attrib,  # type: ignore[arg-type]
         )
-        with self.set_current(node):
+        # Nested <svg> elements clip their content to the artboard.
+        bounds = self.visible_bounds
+        if bounds is not None:
+            bounds = (
+                max(bounds[0], layer.left),
+                max(bounds[1], layer.top),
+                min(bounds[2], layer.left + layer.width),
+                min(bounds[3], layer.top + layer.height),
+            )
+        with self.set_current(node), self.set_visible_bounds(bounds):
             self.add_children(layer, depth=depth + 1)
         return node
 
@@ -100,7 +117,9 @@ class LayerConverter(ConverterProtocol):
             id=self.auto_id("group") if layer.has_effects() else None,
             **attrib,  # type: ignore[arg-type]
         )
-        with self.set_current(node):
+        # Group effects can show pixels of the children from outside the canvas.
+        bounds = None if layer.has_effects() else self.visible_bounds
+        with self.set_current(node), self.set_visible_bounds(bounds):
             self.add_children(layer, depth=depth + 1)
 
         self.apply_background_effects(layer, node, insert_before_target=True)
@@ -121,7 +140,10 @@ class LayerConverter(ConverterProtocol):
 
         Raises:
             ValueError: If depth exceeds resource_limits.max_layer_depth.
+            TimeoutError: If the conversion deadline has passed.
         """
+        self.check_deadline()
+
         # Check depth limit
         if (
             hasattr(self, "resource_limits")
@@ -171,7 +193,7 @@ class LayerConverter(ConverterProtocol):
                     raise ValueError(
                         f"Layer '{layer.name}' dimensions {layer.width}x{layer.height} exceed limit {max_dim}x{max_dim}. "  # noqa: E501
                         f"WebP has a {WEBP_MAX_DIMENSION}px hard limit. "
-                        f"To process images larger than this, use image_format='png' and, if necessary, "  # noqa: E501
+                        f"To process images larger than this, use tile_size or image_format='png' and, if necessary, "  # noqa: E501
                         f"increase PSD2SVG_MAX_IMAGE_DIMENSION (for example, to {max(layer.width, layer.height) + 1000})."  # noqa: E501
                     )
                 else:
@@ -182,16 +204,39 @@ class LayerConverter(ConverterProtocol):
                     )
 
         # We will later fill in the href attribute when embedding images.
-        image = layer.topil()
+        image: Image.Image | LazyImage | None
+        if self.lazy_images:
+            image = _lazy_layer_image(layer, self.psd.color_mode)
+        else:
+            image = layer.topil()
+            self.check_deadline()
+            if image is not None:
+                image = image.convert("RGBA")
         if image is None:
             logger.warning(
                 f"Layer has no image data, skipping: '{layer.name}' ({layer.kind})."
             )
             return None
 
-        # Generate image ID before creating the <image> element
-        image_id = self.auto_id("image")
-        self.images[image_id] = image.convert("RGBA")
+        # Effects are sized by the image element and can show pixels outside
+        # the canvas, so only plain layers are baked, cropped, or trimmed.
+        left, top, width, height = layer.left, layer.top, layer.width, layer.height
+        baked = False
+        if not layer.has_effects():
+            if (
+                self.bake_masks
+                and isinstance(image, Image.Image)
+                and "transform" not in attrib
+                and _has_enabled_mask(layer)
+            ):
+                image, baked = _bake_mask(layer, image)
+            if self.visible_bounds is not None:
+                image, (left, top) = _crop_image(
+                    image, (left, top), self.visible_bounds
+                )
+            if self.trim_images and isinstance(image, Image.Image):
+                image, (left, top) = _trim_image(image, (left, top))
+            width, height = image.size
 
         # Raster layers can have both fill opacity and overall opacity.
         fill_opacity = layer.tagged_blocks.get_data(Tag.BLEND_FILL_OPACITY, 255)
@@ -200,16 +245,16 @@ class LayerConverter(ConverterProtocol):
         # to handle fill opacity.
         if layer.has_effects():
             defs = self.create_node("defs")
-            node = self.create_node(
-                "image",
+            node = self.add_image(
+                image,
+                layer.left,
+                layer.top,
+                layer.width,
+                layer.height,
                 parent=defs,
-                x=layer.left,
-                y=layer.top,
-                width=layer.width,
-                height=layer.height,
                 title=layer.name,
                 class_=layer.kind,
-                id=image_id,
+                tile=False,
                 **attrib,
             )
             self.set_opacity(layer.opacity / 255, node)
@@ -220,13 +265,12 @@ class LayerConverter(ConverterProtocol):
             self.apply_overlay_effects(layer, node)
             self.apply_stroke_effect(layer, node)
         else:
-            node = self.create_node(
-                "image",
-                id=image_id,
-                x=layer.left,
-                y=layer.top,
-                width=layer.width,
-                height=layer.height,
+            node = self.add_image(
+                image,
+                left,
+                top,
+                width,
+                height,
                 title=layer.name,
                 class_=layer.kind,
                 **attrib,  # type: ignore[arg-type]
@@ -234,7 +278,8 @@ class LayerConverter(ConverterProtocol):
             if fill_opacity < 255:
                 self.set_opacity(fill_opacity / 255, node)
             self.set_layer_attributes(layer, node)
-            node = self.apply_mask(layer, node)
+            if not baked:
+                node = self.apply_mask(layer, node)
         return node
 
     def add_shape(
@@ -577,15 +622,37 @@ class LayerConverter(ConverterProtocol):
 
     def apply_mask(self, layer: layers.Layer, target: ET.Element) -> ET.Element:
         """Add a layer mask to the target node."""
+        if not _has_enabled_mask(layer):
+            return target
+        assert layer.mask is not None
+        logger.debug(f"Adding mask: '{layer.name}' ({layer.kind})")
+
+        # Mask image.
+        mask_image: Image.Image | LazyImage | None
+        if self.lazy_images:
+            mask_image = _lazy_mask_image(layer, self.psd.color_mode)
+        else:
+            mask_image = layer.mask.topil()
+            self.check_deadline()
+            if mask_image is not None:
+                mask_image = mask_image.convert("L")
+
+        # Viewbox for the mask. If the mask is empty, use the full canvas.
+        viewbox = layer.bbox
+        if viewbox == (0, 0, 0, 0):
+            viewbox = (0, 0, self.psd.width, self.psd.height)
+
+        # A white mask over the whole layer hides nothing. Groups and effects
+        # can draw outside the layer bounds, where the mask would still clip.
         if (
-            not layer.has_mask()
-            or layer.mask is None
-            or layer.mask.disabled
-            or layer.mask.width == 0
-            or layer.mask.height == 0
+            isinstance(mask_image, Image.Image)
+            and mask_image.getextrema() == (255, 255)
+            and not isinstance(layer, layers.Group)
+            and not layer.has_effects()
+            and (layer.mask.background_color > 0 or _contains(layer.mask.bbox, viewbox))
         ):
+            logger.debug(f"Skipping white mask: '{layer.name}' ({layer.kind})")
             return target
-        logger.debug(f"Adding mask: '{layer.name}' ({layer.kind})")
 
         # If the target already has a mask or a clip-path,
         # we need to transfer them to the content.
@@ -600,11 +667,6 @@ class LayerConverter(ConverterProtocol):
         if "clip-path" in target.attrib:
             context["clip-path"] = target.attrib.pop("clip-path")
 
-        # Viewbox for the mask. If the mask is empty, use the full canvas.
-        viewbox = layer.bbox
-        if viewbox == (0, 0, 0, 0):
-            viewbox = (0, 0, self.psd.width, self.psd.height)
-
         # Create the mask node.
         defs = self.create_node("defs")
         with self.set_current(defs):
@@ -627,21 +689,64 @@ class LayerConverter(ConverterProtocol):
                     **context,  # type: ignore[arg-type]
                 )
 
-        # Mask image.
-        mask_image = layer.mask.topil()
         if mask_image is not None:
-            image_id = self.auto_id("image")
-            self.images[image_id] = mask_image.convert("L")
-            with self.set_current(mask):
-                self.create_node(
-                    "image",
-                    id=image_id,
-                    x=layer.mask.left,
-                    y=layer.mask.top,
-                    width=layer.mask.width,
-                    height=layer.mask.height,
-                    **context,  # type: ignore[arg-type]
+            left, top = layer.mask.left, layer.mask.top
+            width, height = layer.mask.width, layer.mask.height
+            if self.visible_bounds is not None and not layer.has_effects():
+                mask_image, (left, top) = _crop_image(
+                    mask_image, (left, top), self.visible_bounds
                 )
+                width, height = mask_image.size
+            # Outside the mask image the mask is black, so only black is trimmed.
+            if (
+                self.trim_images
+                and isinstance(mask_image, Image.Image)
+                and layer.mask.background_color == 0
+            ):
+                mask_image, (left, top) = _trim_image(mask_image, (left, top))
+                width, height = mask_image.size
+            rectangle = (
+                image_utils.uniform_rectangle(mask_image)
+                if isinstance(mask_image, Image.Image)
+                else None
+            )
+            with self.set_current(mask):
+                if rectangle is not None:
+                    # Draw the image as up to two rectangles of solid gray.
+                    outer, inner, box = rectangle
+                    background = 255 if layer.mask.background_color > 0 else 0
+                    image_box = (left, top, left + width, top + height)
+                    if outer != background or (
+                        outer == 255 and not _contains(viewbox, image_box)
+                    ):
+                        self.create_node(
+                            "rect",
+                            x=left,
+                            y=top,
+                            width=width,
+                            height=height,
+                            fill=color_utils.rgb2hex((outer, outer, outer)),
+                            **context,  # type: ignore[arg-type]
+                        )
+                    if inner != outer:
+                        self.create_node(
+                            "rect",
+                            x=left + box[0],
+                            y=top + box[1],
+                            width=box[2] - box[0],
+                            height=box[3] - box[1],
+                            fill=color_utils.rgb2hex((inner, inner, inner)),
+                            **context,  # type: ignore[arg-type]
+                        )
+                else:
+                    self.add_image(
+                        mask_image,
+                        left,
+                        top,
+                        width,
+                        height,
+                        **context,  # type: ignore[arg-type]
+                    )
 
         # If the target has a transform, we cannot directly apply it to the mask.
         if "transform" in target.attrib:
@@ -659,3 +764,194 @@ class LayerConverter(ConverterProtocol):
 
         svg_utils.set_attribute(target, "mask", svg_utils.get_funciri(mask))
         return target
+
+
+def _has_enabled_mask(layer: layers.Layer) -> bool:
+    """Return True if the layer has a non-empty layer mask that is enabled."""
+    return (
+        layer.has_mask()
+        and layer.mask is not None
+        and not layer.mask.disabled
+        and layer.mask.width != 0
+        and layer.mask.height != 0
+    )
+
+
+def _bake_mask(layer: layers.Layer, image: Image.Image) -> tuple[Image.Image, bool]:
+    """Multiply the layer mask into the alpha of the layer image.
+
+    Returns the image and whether the mask was baked into it.
+    """
+    mask = layer.mask
+    assert mask is not None
+    mask_image = mask.topil()
+    if mask_image is None:
+        return image, False
+    logger.debug(f"Baking mask into layer alpha: '{layer.name}'")
+    image = image_utils.multiply_alpha(
+        image,
+        mask_image.convert("L"),
+        (mask.left - layer.left, mask.top - layer.top),
+        background=255 if mask.background_color > 0 else 0,
+    )
+    return image, True
+
+
+def _contains(outer: tuple[int, ...], inner: tuple[int, ...]) -> bool:
+    """Return True if the outer box contains the inner box."""
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def _crop_image(
+    image: Image.Image | LazyImage,
+    offset: tuple[int, int],
+    bounds: tuple[int, int, int, int],
+) -> tuple[Image.Image | LazyImage, tuple[int, int]]:
+    """Crop an image placed at offset to the visible bounds.
+
+    Lazy images stay lazy and are cropped when loaded. An image outside the
+    bounds is reduced to its first pixel, which is not visible either.
+    """
+    left, top = offset
+    box = (
+        max(bounds[0] - left, 0),
+        max(bounds[1] - top, 0),
+        min(bounds[2] - left, image.width),
+        min(bounds[3] - top, image.height),
+    )
+    if box == (0, 0, image.width, image.height):
+        return image, offset
+    if box[0] >= box[2] or box[1] >= box[3]:
+        box = (0, 0, 1, 1)
+    logger.debug(f"Cropping image from {image.size} to {box}")
+    if isinstance(image, LazyImage):
+        source = image
+        image = LazyImage(
+            lambda: source.load().crop(box),
+            source.mode,
+            (box[2] - box[0], box[3] - box[1]),
+            f"{source.key}:{box}",
+        )
+    else:
+        image = image.crop(box)
+    return image, (left + box[0], top + box[1])
+
+
+def _trim_image(
+    image: Image.Image, offset: tuple[int, int]
+) -> tuple[Image.Image, tuple[int, int]]:
+    """Crop an image to its non-background pixels and move its offset to match.
+
+    An image without any content is reduced to a single pixel, so that it can
+    still serve as a clipping base.
+    """
+    bbox = image_utils.content_bbox(image) or (0, 0, 1, 1)
+    if bbox == (0, 0, image.width, image.height):
+        return image, offset
+    logger.debug(f"Trimming image from {image.size} to {bbox}")
+    return image.crop(bbox), (offset[0] + bbox[0], offset[1] + bbox[1])
+
+
+def _channel_data(layer: layers.Layer) -> dict[int, tuple[str, bytes]] | None:
+    """Return the compression and compressed data of each layer channel by ID.
+
+    psd-tools has no public API for compressed channel data, so this reads its
+    internals. Returns None if they are not available, in which case callers
+    decode the layer eagerly instead.
+    """
+    try:
+        return {
+            info.id: (str(channel.compression), channel.data)
+            for info, channel in zip(layer._record.channel_info, layer._channels)
+        }
+    except (AttributeError, TypeError):
+        logger.debug(f"Channel data not available, decoding eagerly: '{layer.name}'")
+        return None
+
+
+def _channel_data_key(
+    channels: dict[int, tuple[str, bytes]],
+    prefix: str,
+    channel_ids: set[int] | None = None,
+) -> str:
+    """Hash the compressed channel data of a layer.
+
+    Layers with equal channel data decode to identical pixels, so this stands in
+    for image_utils.content_hash() without decoding the image.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{prefix}:".encode("ascii"))
+    for channel_id, (compression, data) in channels.items():
+        if channel_ids is None or channel_id in channel_ids:
+            digest.update(f"{channel_id}:{compression}:".encode("ascii"))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _lazy_layer_image(
+    layer: layers.Layer, color_mode: int
+) -> Image.Image | LazyImage | None:
+    """Create a lazy RGBA image of the layer pixels.
+
+    Returns None if the layer has no image data, checked without decoding, and
+    the decoded image if its channel data cannot be inspected.
+    """
+    channels = _channel_data(layer)
+    if channels is None:
+        image = layer.topil()
+        return image.convert("RGBA") if image is not None else None
+    # topil() returns None unless every color channel has data.
+    colors = [data for channel_id, (_, data) in channels.items() if channel_id >= 0]
+    if layer.width <= 0 or layer.height <= 0 or not colors or not all(colors):
+        return None
+
+    def load() -> Image.Image:
+        image = layer.topil()
+        if image is None:
+            raise RuntimeError(f"Layer has no image data: '{layer.name}'")
+        return image.convert("RGBA")
+
+    key = _channel_data_key(
+        channels, f"pixel:{color_mode}:{layer.width}x{layer.height}"
+    )
+    return LazyImage(load, "RGBA", (layer.width, layer.height), key)
+
+
+def _lazy_mask_image(
+    layer: layers.Layer, color_mode: int
+) -> Image.Image | LazyImage | None:
+    """Create a lazy grayscale image of the layer mask.
+
+    Returns None if the mask is empty, checked without decoding, and the
+    decoded image if its channel data cannot be inspected.
+    """
+    mask = layer.mask
+    assert mask is not None
+    channels = _channel_data(layer)
+    if channels is None:
+        image = mask.topil()
+        return image.convert("L") if image is not None else None
+    channel_id = (
+        ChannelID.REAL_USER_LAYER_MASK if mask.has_real() else ChannelID.USER_LAYER_MASK
+    )
+    _, data = channels.get(channel_id, ("", b""))
+    if mask.width <= 0 or mask.height <= 0 or not data:
+        return None
+
+    def load() -> Image.Image:
+        image = mask.topil()
+        if image is None:
+            raise RuntimeError(f"Layer mask has no image data: '{layer.name}'")
+        return image.convert("L")
+
+    key = _channel_data_key(
+        channels,
+        f"mask:{color_mode}:{mask.width}x{mask.height}:{mask.has_real()}",
+        {ChannelID.USER_LAYER_MASK, ChannelID.REAL_USER_LAYER_MASK},
+    )
+    return LazyImage(load, "L", (mask.width, mask.height), key)
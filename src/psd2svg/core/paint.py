@@ -354,13 +354,31 @@ class PaintConverter(ConverterProtocol):
                 logger.info("Smooth gradient interpolation is not accurate.")
 
     def add_pattern(self, psdimage: PSDImage, descriptor: Descriptor) -> ET.Element:
-        """Add pattern definition to the SVG document."""
+        """Add pattern definition to the SVG document.
+
+        The pattern bitmap is decoded once per pattern ID into a shared base
+        <pattern>. Each call returns a new <pattern> that inherits the base via
+        href, so that callers can set a per-use patternTransform.
+        """
         assert descriptor.classID == Enum.Pattern
         pattern_id = descriptor[Key.ID].value.rstrip("\x00")
+        base = self.pattern_cache.get(pattern_id)
+        if base is None:
+            base = self.add_base_pattern(psdimage, pattern_id)
+            self.pattern_cache[pattern_id] = base
+        return self.create_node(
+            "pattern",
+            id=self.auto_id("pattern"),
+            href=svg_utils.get_uri(base),
+        )
+
+    def add_base_pattern(self, psdimage: PSDImage, pattern_id: str) -> ET.Element:
+        """Add the shared <pattern> with the pattern image to the SVG document."""
         pattern_data = psdimage._get_pattern(pattern_id)
         if pattern_data is None:
             raise ValueError(f"Pattern data not found: {pattern_id}")
         image = pil_io.convert_pattern_to_pil(pattern_data)
+        self.check_deadline()
         image_id = self.auto_id("image")
 
         node = self.create_node(
@@ -378,7 +396,7 @@ class PaintConverter(ConverterProtocol):
                 height=image.height,
             )
         # We will later fill in the href attribute when embedding images.
-        self.images[image_id] = image
+        self.store_image(image_id, image)
         return node
 
     def set_pattern_transform(
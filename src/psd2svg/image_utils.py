@@ -1,17 +1,387 @@
 import base64
+import dataclasses
+import functools
+import hashlib
 import io
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Sequence, TypeVar
 
-from PIL import Image
+import numpy as np
+from PIL import Image, ImageFilter
+
+from psd2svg.resource_limits import WEBP_MAX_DIMENSION
+from psd2svg.timeout_utils import Deadline
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_parallel(
+    func: Callable[[T], R], items: Sequence[T], max_workers: int | None = None
+) -> list[R]:
+    """Apply a function to each item in a bounded thread pool.
+
+    Pillow encoders release the GIL, so encoding many images in threads scales
+    with the number of cores. Results are returned in the order of ``items``.
+
+    Args:
+        func: Function to apply to each item.
+        items: Items to process.
+        max_workers: Maximum number of threads. If None, uses the number of CPUs.
+            Use 1 to process items serially in the calling thread.
+
+    Returns:
+        List of results, one per item.
+
+    Raises:
+        ValueError: If max_workers is less than 1.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    max_workers = min(max_workers, len(items))
+    if max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
+class LazyImage:
+    """Handle to an image whose pixels are decoded only when needed.
+
+    The loader runs on every call to load(), so decoded pixels are released
+    once the caller is done with them instead of living as long as the
+    document. Pickling a handle stores the decoded image.
+
+    Args:
+        loader: Function returning the decoded PIL image.
+        mode: PIL mode of the decoded image.
+        size: Size of the decoded image as (width, height).
+        key: Hash identifying the source data. Handles with equal keys decode
+            to identical images.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Image.Image],
+        mode: str,
+        size: tuple[int, int],
+        key: str,
+    ) -> None:
+        self._loader = loader
+        self.mode = mode
+        self.size = size
+        self.key = key
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def load(self) -> Image.Image:
+        """Decode and return the image."""
+        return self._loader()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _unpickle_lazy_image, (self.load(),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} mode={self.mode} size={self.width}x{self.height}>"
+        )
+
+
+def _unpickle_lazy_image(image: Image.Image) -> Image.Image:
+    """Return the decoded image that a pickled LazyImage was replaced with."""
+    return image
+
+
+def load_image(image: "Image.Image | LazyImage") -> Image.Image:
+    """Return the PIL image for an image or a lazy image handle."""
+    if isinstance(image, LazyImage):
+        return image.load()
+    return image
+
+
+class CompressedImage(LazyImage):
+    """Image held in memory as lossless PNG bytes.
+
+    Only the compressed bytes stay resident; pixels are decoded on every call
+    to load(). Pickling a compressed image keeps it compressed.
+
+    Args:
+        data: PNG-encoded image.
+        mode: PIL mode of the decoded image.
+        size: Size of the decoded image as (width, height).
+        key: Content hash of the decoded image.
+    """
+
+    def __init__(self, data: bytes, mode: str, size: tuple[int, int], key: str) -> None:
+        super().__init__(functools.partial(decode_image, data), mode, size, key)
+        self.data = data
+
+    @classmethod
+    def from_image(
+        cls, image: Image.Image, key: str | None = None
+    ) -> "CompressedImage":
+        """Compress a PIL image.
+
+        Args:
+            image: Image to compress.
+            key: Content hash of the image, if already computed.
+        """
+        with io.BytesIO() as output:
+            # Favor speed: the bytes are decoded again before final encoding.
+            image.save(output, format="PNG", compress_level=1)
+            data = output.getvalue()
+        return cls(data, image.mode, image.size, key or content_hash(image))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (self.data, self.mode, self.size, self.key)
+
+
+def drop_opaque_alpha(image: Image.Image) -> Image.Image:
+    """Convert an RGBA image without any transparent pixels to RGB."""
+    if image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255):
+        return image.convert("RGB")
+    return image
+
+
+def scale_image(
+    image: "Image.Image | LazyImage", scale: float
+) -> "Image.Image | LazyImage":
+    """Downsample an image by a scale factor with Lanczos resampling.
+
+    Lazy images stay lazy and are resized when loaded. Each side is rounded
+    and kept at least one pixel.
+
+    Args:
+        image: Image to downsample.
+        scale: Scale factor in (0, 1].
+
+    Returns:
+        The downsampled image, or the image itself if its size is unchanged.
+    """
+    size = (
+        max(1, round(image.width * scale)),
+        max(1, round(image.height * scale)),
+    )
+    if size == image.size:
+        return image
+    if isinstance(image, LazyImage):
+        source = image
+        return LazyImage(
+            lambda: _resize(source.load(), size),
+            source.mode,
+            size,
+            f"{source.key}:{size[0]}x{size[1]}",
+        )
+    return _resize(image, size)
+
+
+def _resize(image: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Resize with Lanczos, reducing by whole factors first on large ratios."""
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def pack_atlases(
+    images: Sequence[Image.Image], max_size: int = 2048, padding: int = 1
+) -> tuple[list[Image.Image], list[tuple[int, int, int]]]:
+    """Pack images of one mode into as few atlas images as possible.
+
+    Images are placed on shelves, tallest first. Each image is surrounded by
+    padding that repeats its edge pixels, so that viewers sampling across the
+    edge of an image while scaling do not pick up its neighbors.
+
+    Args:
+        images: Images to pack, all of the same mode.
+        max_size: Maximum width and height of an atlas.
+        padding: Width of the repeated edge around each image.
+
+    Returns:
+        Tuple of (atlases, placements), where placements holds the atlas index
+        and the (left, top) position of each image in input order.
+
+    Raises:
+        ValueError: If an image with padding does not fit in an atlas.
+    """
+    order = sorted(
+        range(len(images)), key=lambda i: (-images[i].height, -images[i].width)
+    )
+    placements: list[tuple[int, int, int]] = [(0, 0, 0)] * len(images)
+    sizes: list[tuple[int, int]] = []
+    left = shelf_top = shelf_height = 0
+    for index in order:
+        width = images[index].width + 2 * padding
+        height = images[index].height + 2 * padding
+        if width > max_size or height > max_size:
+            raise ValueError(
+                f"Image of size {images[index].size} does not fit in a "
+                f"{max_size}px atlas"
+            )
+        if not sizes or left + width > max_size:
+            # Start a new shelf, and a new atlas when the shelf does not fit.
+            shelf_top += shelf_height
+            left = shelf_height = 0
+            if not sizes or shelf_top + height > max_size:
+                sizes.append((0, 0))
+                shelf_top = 0
+        placements[index] = (len(sizes) - 1, left + padding, shelf_top + padding)
+        left += width
+        shelf_height = max(shelf_height, height)
+        sizes[-1] = (max(sizes[-1][0], left), max(sizes[-1][1], shelf_top + height))
+
+    atlases = [Image.new(images[0].mode, size) for size in sizes] if images else []
+    for image, (atlas, x, y) in zip(images, placements):
+        pixels = np.asarray(image)
+        pad = ((padding, padding), (padding, padding)) + ((0, 0),) * (pixels.ndim - 2)
+        padded = Image.fromarray(np.pad(pixels, pad, mode="edge"), image.mode)
+        atlases[atlas].paste(padded, (x - padding, y - padding))
+    return atlases, placements
+
+
+def create_placeholder(
+    image: Image.Image, size: int = 16, blur: float = 1.0
+) -> Image.Image:
+    """Create a tiny blurred preview of an image to show while it loads.
+
+    The image is downsampled to fit in a size x size box, keeping its aspect
+    ratio, and blurred so that viewers scaling it up show a smooth preview
+    instead of blocky pixels. Transparent images are blurred with
+    premultiplied alpha, so transparent pixels do not darken the edges.
+
+    Args:
+        image: Image to preview.
+        size: Maximum width and height of the placeholder.
+        blur: Gaussian blur radius in placeholder pixels. 0 disables blurring.
+
+    Returns:
+        The placeholder image, in the mode of the input image.
+    """
+    scale = min(1.0, size / max(image.size))
+    placeholder = _resize(
+        image, (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    )
+    if blur <= 0:
+        return placeholder
+    if placeholder.mode == "RGBA":
+        blurred = placeholder.convert("RGBa").filter(ImageFilter.GaussianBlur(blur))
+        return blurred.convert("RGBA")
+    return placeholder.filter(ImageFilter.GaussianBlur(blur))
+
+
+def content_bbox(
+    image: Image.Image, background: int = 0
+) -> tuple[int, int, int, int] | None:
+    """Return the bounding box of pixels that differ from the background.
+
+    Images with an alpha channel are measured by alpha, so fully transparent
+    pixels count as background. Other images are measured by their first band.
+
+    Args:
+        image: Image to measure.
+        background: Background value of the measured band.
+
+    Returns:
+        Box as (left, top, right, bottom), or None if every pixel is background.
+    """
+    band = image.getchannel("A") if "A" in image.getbands() else image.getchannel(0)
+    content = np.asarray(band) != background
+    rows = np.flatnonzero(content.any(axis=1))
+    if rows.size == 0:
+        return None
+    columns = np.flatnonzero(content.any(axis=0))
+    return (
+        int(columns[0]),
+        int(rows[0]),
+        int(columns[-1]) + 1,
+        int(rows[-1]) + 1,
+    )
+
+
+def multiply_alpha(
+    image: Image.Image,
+    mask: Image.Image,
+    offset: tuple[int, int],
+    background: int = 0,
+) -> Image.Image:
+    """Multiply a grayscale mask into the alpha channel of an RGBA image.
+
+    Args:
+        image: RGBA image.
+        mask: Grayscale mask, placed at offset relative to the image.
+        offset: Position of the mask's top-left corner in image coordinates.
+        background: Mask value outside the mask image.
+
+    Returns:
+        New RGBA image with the masked alpha.
+    """
+    values = Image.new("L", image.size, background)
+    values.paste(mask, offset)
+    alpha = np.asarray(image.getchannel("A"), dtype=np.uint16)
+    alpha = (alpha * np.asarray(values, dtype=np.uint16) + 127) // 255
+    result = image.copy()
+    result.putalpha(Image.fromarray(alpha.astype(np.uint8), "L"))
+    return result
+
+
+def uniform_rectangle(
+    image: Image.Image,
+) -> tuple[int, int, tuple[int, int, int, int]] | None:
+    """Describe a single-band image of one value with at most one rectangle.
+
+    Such images, e.g. solid or hard-edged rectangular masks, can be drawn with
+    rectangles instead of being encoded.
+
+    Args:
+        image: Single-band image to analyze.
+
+    Returns:
+        Tuple of (outer, inner, box) where box is the (left, top, right, bottom)
+        rectangle filled with the inner value and every other pixel has the
+        outer value. Uniform images have inner equal to outer. Returns None if
+        the image is not of this form.
+    """
+    pixels = np.asarray(image)
+    # The rectangle cannot cover two opposite corners unless it fills the image.
+    for outer in {int(pixels[0, 0]), int(pixels[-1, -1])}:
+        content = pixels != outer
+        rows = np.flatnonzero(content.any(axis=1))
+        if rows.size == 0:
+            return outer, outer, (0, 0, image.width, image.height)
+        columns = np.flatnonzero(content.any(axis=0))
+        top, bottom = int(rows[0]), int(rows[-1]) + 1
+        left, right = int(columns[0]), int(columns[-1]) + 1
+        inner = pixels[top:bottom, left:right]
+        if (inner == inner[0, 0]).all():
+            return outer, int(inner[0, 0]), (left, top, right, bottom)
+    return None
+
+
+def content_hash(image: Image.Image) -> str:
+    """Return a hash of the image mode, size, and pixel data.
+
+    Images with equal hashes render identically and encode to the same bytes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
 
-def encode_image(image: Image.Image, format: str = "WEBP") -> bytes:
+
+def encode_image(image: Image.Image, format: str = "WEBP", **options: Any) -> bytes:
     """Encode a PIL image to bytes in the specified format.
 
     For JPEG format, RGBA images are automatically converted to RGB with a
-    white background.
+    white background. Extra keyword arguments are passed to the Pillow encoder.
     """
     # Convert RGBA to RGB for JPEG format (JPEG doesn't support alpha)
     if format.upper() == "JPEG" and image.mode == "RGBA":
@@ -20,18 +390,314 @@ def encode_image(image: Image.Image, format: str = "WEBP") -> bytes:
         image = rgb_image
 
     with io.BytesIO() as output:
-        image.save(output, format=format.upper())
+        image.save(output, format=format.upper(), **options)
         return output.getvalue()
 
 
+@dataclasses.dataclass(frozen=True)
+class EncoderOptions:
+    """Pillow encoder settings that trade encoding time against output size.
+
+    The defaults match Pillow's, so they produce the same bytes as encoding
+    without options. Use preset() for named trade-offs.
+
+    Attributes:
+        webp_quality: WebP quality from 0 to 100. For lossless WebP, this is
+            the compression effort instead.
+        webp_method: WebP encoding method from 0 (fastest) to 6 (smallest).
+        webp_lossless: If True, encode WebP losslessly.
+        png_compress_level: zlib compression level for PNG, from 0 to 9.
+        png_optimize: If True, search for the smallest PNG encoding.
+        jpeg_quality: JPEG quality from 0 to 100.
+        jpeg_optimize: If True, compute optimal JPEG Huffman tables.
+    """
+
+    webp_quality: int = 80
+    webp_method: int = 4
+    webp_lossless: bool = False
+    png_compress_level: int = 6
+    png_optimize: bool = False
+    jpeg_quality: int = 75
+    jpeg_optimize: bool = False
+
+    def __post_init__(self) -> None:
+        for name, value, upper in (
+            ("webp_quality", self.webp_quality, 100),
+            ("webp_method", self.webp_method, 6),
+            ("png_compress_level", self.png_compress_level, 9),
+            ("jpeg_quality", self.jpeg_quality, 100),
+        ):
+            if not 0 <= value <= upper:
+                raise ValueError(f"{name} must be between 0 and {upper}, got {value}")
+
+    @classmethod
+    def preset(cls, name: str) -> "EncoderOptions":
+        """Return the options of a named preset.
+
+        Args:
+            name: "fastest" for the least CPU time, "balanced" for the Pillow
+                defaults, or "smallest" for the fewest bytes at the same
+                quality.
+
+        Raises:
+            ValueError: If the preset name is unknown.
+        """
+        if name not in ENCODER_PRESETS:
+            raise ValueError(
+                f"Unknown encoder preset: {name!r}. "
+                f"Use one of {', '.join(ENCODER_PRESETS)}."
+            )
+        return ENCODER_PRESETS[name]
+
+    def pillow_options(
+        self, format: str, lossless: bool | None = None
+    ) -> dict[str, Any]:
+        """Return the Pillow save() arguments for a format.
+
+        Args:
+            format: Image format, e.g. "webp", "png", or "jpeg".
+            lossless: Override webp_lossless for WebP.
+        """
+        format = format.lower()
+        if format == "webp":
+            return {
+                "quality": self.webp_quality,
+                "method": self.webp_method,
+                "lossless": self.webp_lossless if lossless is None else lossless,
+            }
+        if format == "png":
+            return {
+                "compress_level": self.png_compress_level,
+                "optimize": self.png_optimize,
+            }
+        if format == "jpeg":
+            return {"quality": self.jpeg_quality, "optimize": self.jpeg_optimize}
+        return {}
+
+
+ENCODER_PRESETS = {
+    "fastest": EncoderOptions(webp_method=0, png_compress_level=1),
+    "balanced": EncoderOptions(),
+    "smallest": EncoderOptions(
+        webp_method=6, png_compress_level=9, png_optimize=True, jpeg_optimize=True
+    ),
+}
+
+
+def resolve_encoder_options(
+    options: "EncoderOptions | str | None",
+) -> EncoderOptions:
+    """Return encoder options for an options object, preset name, or None."""
+    if options is None:
+        return EncoderOptions()
+    if isinstance(options, str):
+        return EncoderOptions.preset(options)
+    return options
+
+
+@dataclasses.dataclass(frozen=True)
+class MaskProfile:
+    """Encoding policy for layer masks, independent of the image format.
+
+    Masks are the grayscale (mode "L") images of a document. Hard masks, with
+    at most 16 gray levels, are always written as 1-bit or palettized PNG.
+    Soft masks are written in ``format``, optionally downsampled; the SVG
+    keeps their size in document units, so viewers scale them back up.
+
+    Attributes:
+        format: Image format for soft masks: 'png', 'webp', or 'jpeg'.
+        quality: Encoder quality for soft masks in lossy formats, from 0 to
+            100. If None, uses the encoder default.
+        scale: Scale factor for soft masks, in (0, 1]. Default is 1.0 (no
+            downsampling).
+    """
+
+    format: str = "png"
+    quality: int | None = None
+    scale: float = 1.0
+
+    def __post_init__(self) -> None:
+        if self.format.lower() not in ("png", "webp", "jpeg"):
+            raise ValueError(
+                f"Unsupported mask format: {self.format!r}. "
+                "Use 'png', 'webp', or 'jpeg'."
+            )
+        if self.quality is not None and not 0 <= self.quality <= 100:
+            raise ValueError(
+                f"Mask quality must be between 0 and 100, got {self.quality}"
+            )
+        if not 0 < self.scale <= 1:
+            raise ValueError(f"Mask scale must be in (0, 1], got {self.scale}")
+
+
+def encode_mask(
+    image: Image.Image,
+    profile: MaskProfile,
+    options: EncoderOptions | None = None,
+) -> tuple[str, bytes]:
+    """Encode a grayscale mask following a mask profile.
+
+    Args:
+        image: Mask image in mode "L".
+        profile: Mask encoding profile.
+        options: Encoder options. The profile quality takes precedence.
+
+    Returns:
+        Tuple of (image format, encoded bytes).
+    """
+    options = options or EncoderOptions()
+    levels = [value for value, count in enumerate(image.histogram()) if count]
+    if len(levels) <= 16:
+        if set(levels) <= {0, 255}:
+            image = image.convert("1", dither=Image.Dither.NONE)
+        else:
+            # Index the gray levels so the PNG encoder can pack 1-4 bits per
+            # pixel for the palette size.
+            lut = [0] * 256
+            for index, value in enumerate(levels):
+                lut[value] = index
+            indexed = Image.frombytes("P", image.size, image.point(lut).tobytes())
+            indexed.putpalette([value for value in levels for _ in range(3)])
+            image = indexed
+        return "png", encode_image(image, "PNG", **options.pillow_options("png"))
+
+    if profile.scale < 1:
+        size = (
+            max(1, round(image.width * profile.scale)),
+            max(1, round(image.height * profile.scale)),
+        )
+        image = image.resize(size, Image.Resampling.BOX)
+    save_options = options.pillow_options(profile.format)
+    if profile.quality is not None:
+        save_options["quality"] = profile.quality
+    return profile.format.lower(), encode_image(image, profile.format, **save_options)
+
+
+def encode_auto(
+    image: Image.Image,
+    deadline: Deadline | None = None,
+    options: EncoderOptions | None = None,
+) -> tuple[str, bytes]:
+    """Encode an image in the format that suits its content.
+
+    Flat images, with at most 256 colors and mostly runs of equal pixels, such
+    as UI art, text, and hard masks, are encoded losslessly as palette PNG or
+    lossless WebP. Other images, including photos quantized to a palette, are
+    encoded lossily as JPEG, if opaque, or lossy WebP at the encoder default
+    quality. The smallest candidate wins.
+
+    Args:
+        image: Image to encode.
+        deadline: Optional encode-time budget. Once it expires, only the
+            first candidate is encoded, so the result depends on timing.
+        options: Encoder options. WebP candidates are lossless or lossy by
+            content regardless of webp_lossless.
+
+    Returns:
+        Tuple of (image format, encoded bytes).
+    """
+    best: tuple[str, bytes] | None = None
+    for format, encode in _auto_candidates(image, options or EncoderOptions()):
+        if best is not None and deadline is not None and deadline.expired():
+            break
+        data = encode()
+        if best is None or len(data) < len(best[1]):
+            best = (format, data)
+    assert best is not None
+    return best
+
+
+def _auto_candidates(
+    image: Image.Image, options: EncoderOptions
+) -> list[tuple[str, Callable[[], bytes]]]:
+    """Return (format, encoder) candidates for encode_auto(), cheapest first."""
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGBA")
+    image = drop_opaque_alpha(image)
+    # WebP cannot encode images beyond its dimension limit.
+    webp = max(image.size) <= WEBP_MAX_DIMENSION
+    png_options = options.pillow_options("png")
+    candidates: list[tuple[str, Callable[[], bytes]]] = []
+    if image.getcolors(256) is not None and _flatness(image) >= 0.6:
+        if image.mode == "L":
+            candidates.append(
+                ("png", lambda: encode_mask(image, MaskProfile(), options)[1])
+            )
+        else:
+            candidates.append(("png", lambda: _encode_palette(image, png_options)))
+        if webp:
+            webp_options = options.pillow_options("webp", lossless=True)
+            candidates.append(
+                ("webp", lambda: encode_image(image, "WEBP", **webp_options))
+            )
+    else:
+        if image.mode != "RGBA":
+            jpeg_options = options.pillow_options("jpeg")
+            candidates.append(
+                ("jpeg", lambda: encode_image(image, "JPEG", **jpeg_options))
+            )
+        if webp:
+            webp_options = options.pillow_options("webp", lossless=False)
+            candidates.append(
+                ("webp", lambda: encode_image(image, "WEBP", **webp_options))
+            )
+        if not candidates:
+            candidates.append(
+                ("png", lambda: encode_image(image, "PNG", **png_options))
+            )
+    return candidates
+
+
+def _flatness(image: Image.Image, max_pixels: int = 1 << 20) -> float:
+    """Return the share of pixels equal to their left neighbor.
+
+    Flat art is mostly runs of equal pixels, while photos and dithered images
+    rarely repeat a pixel. Large images are measured on a subset of rows.
+    """
+    pixels = np.asarray(image)
+    if pixels.shape[1] < 2:
+        return 1.0
+    pixels = pixels[:: max(1, image.width * image.height // max_pixels)]
+    equal = pixels[:, 1:] == pixels[:, :-1]
+    if equal.ndim == 3:
+        equal = equal.all(axis=2)
+    return float(equal.mean())
+
+
+def _encode_palette(image: Image.Image, png_options: dict[str, Any]) -> bytes:
+    """Encode an RGB or RGBA image of at most 256 colors as palette PNG.
+
+    Unlike Image.quantize(), the palette holds the exact colors, so the
+    encoding is lossless. Alpha is stored per palette entry.
+    """
+    bands = len(image.getbands())
+    pixels = np.asarray(image, dtype=np.uint32).reshape(-1, bands)
+    keys = pixels[:, 0] << 24 | pixels[:, 1] << 16 | pixels[:, 2] << 8
+    if bands == 4:
+        keys |= pixels[:, 3]
+    palette, indices = np.unique(keys, return_inverse=True)
+    colors = np.stack([(palette >> shift) & 255 for shift in (24, 16, 8, 0)], 1)
+    colors = colors.astype(np.uint8)
+
+    indexed = Image.frombytes("P", image.size, indices.astype(np.uint8).tobytes())
+    indexed.putpalette(colors[:, :3].tobytes())
+    if bands == 4:
+        png_options = {**png_options, "transparency": colors[:, 3].tobytes()}
+    return encode_image(indexed, "PNG", **png_options)
+
+
 def encode_data_uri(image: Image.Image, format: str = "WEBP") -> str:
     """Encode a PIL image as a base64 data URI.
 
     For JPEG format, RGBA images are automatically converted to RGB with a
     white background.
     """
-    image_bytes = encode_image(image, format)
-    base64_data = base64.b64encode(image_bytes).decode("utf-8")
+    return bytes_to_data_uri(encode_image(image, format), format)
+
+
+def bytes_to_data_uri(data: bytes, format: str = "WEBP") -> str:
+    """Wrap encoded image bytes in a base64 data URI."""
+    base64_data = base64.b64encode(data).decode("utf-8")
     return f"data:image/{format.lower()};base64,{base64_data}"
 
 
@@ -0,0 +1,149 @@
+"""Hard-isolated execution of conversions in a forked worker process.
+
+The cooperative timeout in :class:`~psd2svg.timeout_utils.Deadline` cannot stop
+code stuck inside native decoders, and nothing in the converter bounds memory
+usage. :func:`run_isolated` runs a function in a forked child process with
+``RLIMIT_AS`` and ``RLIMIT_CPU`` applied, kills it when the wall-clock timeout
+passes, and transfers the return value back to the parent through a pipe.
+
+This module is used by ``SVGDocument.from_psd(..., isolate=True)`` and
+``convert(..., isolate=True)``. It requires the ``fork`` start method and the
+``resource`` module, so it is only available on Unix-like platforms.
+"""
+
+import logging
+import multiprocessing
+import signal
+import sys
+from multiprocessing.connection import Connection
+from typing import Any, Callable, TypeVar
+
+from psd2svg.resource_limits import ResourceLimits
+from psd2svg.timeout_utils import _timeout_message
+
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:  # pragma: no cover - Windows
+    HAS_RESOURCE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def is_isolation_supported() -> bool:
+    """Check if isolated execution is supported on this platform."""
+    return HAS_RESOURCE and "fork" in multiprocessing.get_all_start_methods()
+
+
+def _lower_rlimit(kind: int, soft: int, hard: int) -> None:
+    """Lower a resource limit without exceeding the inherited hard limit."""
+    _, current_hard = resource.getrlimit(kind)
+    if current_hard != resource.RLIM_INFINITY:
+        soft = min(soft, current_hard)
+        hard = min(hard, current_hard)
+    resource.setrlimit(kind, (soft, hard))
+
+
+def _apply_rlimits(resource_limits: ResourceLimits) -> None:
+    """Apply memory and CPU limits to the current process."""
+    if resource_limits.is_memory_limited():
+        limit = resource_limits.max_memory
+        _lower_rlimit(resource.RLIMIT_AS, limit, limit)
+    if resource_limits.is_timeout_enabled():
+        # Soft limit sends SIGXCPU; the hard limit one second later sends SIGKILL.
+        soft = resource_limits.timeout
+        _lower_rlimit(resource.RLIMIT_CPU, soft, soft + 1)
+
+
+def _worker(
+    conn: Connection, func: Callable[[], Any], resource_limits: ResourceLimits
+) -> None:
+    """Entry point of the forked worker process."""
+    try:
+        _apply_rlimits(resource_limits)
+        result: tuple[str, Any] = ("ok", func())
+    except BaseException as e:
+        result = ("error", e)
+    try:
+        conn.send(result)
+    except Exception as e:
+        # The result or exception could not be pickled.
+        conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+    finally:
+        conn.close()
+
+
+def run_isolated(func: Callable[[], T], resource_limits: ResourceLimits) -> T:
+    """Run a function in a forked worker process with hard resource limits.
+
+    The child process inherits the parent's memory (copy-on-write), so ``func``
+    may be a closure over already loaded objects. Only the return value is
+    pickled and sent back to the parent.
+
+    Args:
+        func: Function to run in the worker. Its return value must be picklable.
+        resource_limits: Limits to enforce. ``max_memory`` sets ``RLIMIT_AS``;
+            ``timeout`` sets ``RLIMIT_CPU`` and the wall-clock kill timer.
+
+    Returns:
+        Return value of ``func``.
+
+    Raises:
+        RuntimeError: If isolation is unsupported on this platform, or the worker
+            exits without producing a result.
+        TimeoutError: If the worker exceeds the wall-clock or CPU time limit.
+        MemoryError: If the worker exceeds the memory limit.
+        Exception: Any exception raised by ``func`` is re-raised in the parent.
+    """
+    if not is_isolation_supported():
+        raise RuntimeError(
+            f"Isolated conversion requires fork and rlimit support, "
+            f"which are not available on {sys.platform}."
+        )
+
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_worker, args=(child_conn, func, resource_limits), daemon=True
+    )
+    process.start()
+    child_conn.close()
+
+    timeout = resource_limits.timeout if resource_limits.is_timeout_enabled() else None
+    try:
+        if not parent_conn.poll(timeout):
+            logger.warning(
+                "Isolated worker %d exceeded %s seconds, killing.", process.pid, timeout
+            )
+            process.kill()
+            raise TimeoutError(_timeout_message(resource_limits.timeout))
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join()
+            raise _worker_exit_error(process.exitcode, resource_limits) from None
+    finally:
+        parent_conn.close()
+        process.join()
+
+    if status == "error":
+        raise payload
+    return payload
+
+
+def _worker_exit_error(
+    exitcode: int | None, resource_limits: ResourceLimits
+) -> Exception:
+    """Map an abnormal worker exit to an exception."""
+    if exitcode == -signal.SIGXCPU:
+        return TimeoutError(_timeout_message(resource_limits.timeout))
+    if exitcode is not None and exitcode < 0:
+        reason = f"killed by signal {signal.Signals(-exitcode).name}"
+    else:
+        reason = f"exit code {exitcode}"
+    if resource_limits.is_memory_limited():
+        reason += f" (memory limit {resource_limits.max_memory} bytes)"
+    return RuntimeError(f"Isolated conversion worker died: {reason}.")
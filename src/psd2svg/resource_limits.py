@@ -15,6 +15,7 @@ DEFAULT_MAX_FILE_SIZE = 2147483648  # 2GB (typical for professional PSD files)
 DEFAULT_TIMEOUT = 180  # 3 minutes
 DEFAULT_MAX_LAYER_DEPTH = 100  # Maximum layer nesting depth
 DEFAULT_MAX_IMAGE_DIMENSION = 16383  # WebP hard limit for image dimensions
+DEFAULT_MAX_MEMORY = 0  # Address space limit for isolated conversion (disabled)
 
 # Deprecated: Use DEFAULT_MAX_IMAGE_DIMENSION instead
 WEBP_MAX_DIMENSION = DEFAULT_MAX_IMAGE_DIMENSION
@@ -29,6 +30,7 @@ class ResourceLimits:
     - Conversion timeout (prevents CPU exhaustion)
     - Layer depth (prevents exponential processing time)
     - Image dimensions (prevents memory exhaustion from large images)
+    - Memory (address space of isolated conversion workers)
 
     Limits can be configured via environment variables or constructor parameters.
     Constructor parameters take precedence over environment variables.
@@ -39,6 +41,9 @@ class ResourceLimits:
         PSD2SVG_MAX_LAYER_DEPTH: Maximum layer nesting depth (default: 100)
         PSD2SVG_MAX_IMAGE_DIMENSION: Maximum image dimension in pixels
             (default: 16383 = WebP limit)
+        PSD2SVG_MAX_MEMORY: Maximum address space in bytes for isolated
+            conversion workers (default: 0 = disabled). Only enforced when
+            converting with ``isolate=True``.
 
     Example:
         >>> # Use default limits
@@ -60,6 +65,7 @@ class ResourceLimits:
     timeout: int = DEFAULT_TIMEOUT
     max_layer_depth: int = DEFAULT_MAX_LAYER_DEPTH
     max_image_dimension: int = DEFAULT_MAX_IMAGE_DIMENSION
+    max_memory: int = DEFAULT_MAX_MEMORY
 
     @classmethod
     def default(cls) -> "ResourceLimits":
@@ -88,6 +94,7 @@ class ResourceLimits:
             max_image_dimension=cls._parse_env_int(
                 "PSD2SVG_MAX_IMAGE_DIMENSION", DEFAULT_MAX_IMAGE_DIMENSION
             ),
+            max_memory=cls._parse_env_int("PSD2SVG_MAX_MEMORY", DEFAULT_MAX_MEMORY),
         )
 
     @classmethod
@@ -97,6 +104,7 @@ class ResourceLimits:
         timeout: int | None = None,
         max_layer_depth: int | None = None,
         max_image_dimension: int | None = None,
+        max_memory: int | None = None,
         unlimited: bool = False,
     ) -> "ResourceLimits":
         """Create ResourceLimits from CLI arguments with proper precedence.
@@ -111,6 +119,7 @@ class ResourceLimits:
                 (None if not provided).
             max_image_dimension: CLI flag value for max image dimension
                 (None if not provided).
+            max_memory: CLI flag value for max memory (None if not provided).
             unlimited: Whether --unlimited-resources flag was set.
 
         Returns:
@@ -133,6 +142,8 @@ class ResourceLimits:
                 conflicting.append("--max-layer-depth")
             if max_image_dimension is not None:
                 conflicting.append("--max-image-dimension")
+            if max_memory is not None:
+                conflicting.append("--max-memory")
 
             if conflicting:
                 raise ValueError(
@@ -159,6 +170,8 @@ class ResourceLimits:
             limits.max_image_dimension = cls._validate_cli_limit(
                 max_image_dimension, "max_image_dimension"
             )
+        if max_memory is not None:
+            limits.max_memory = cls._validate_cli_limit(max_memory, "max_memory")
 
         return limits
 
@@ -232,6 +245,7 @@ class ResourceLimits:
             timeout=0,
             max_layer_depth=0,
             max_image_dimension=0,
+            max_memory=0,
         )
 
     def is_file_size_limited(self) -> bool:
@@ -249,3 +263,7 @@ class ResourceLimits:
     def is_image_dimension_limited(self) -> bool:
         """Check if image dimension limit is enabled."""
         return self.max_image_dimension > 0
+
+    def is_memory_limited(self) -> bool:
+        """Check if memory limit is enabled."""
+        return self.max_memory > 0
@@ -0,0 +1,751 @@
+"""Local conversion server with a warm worker pool.
+
+Run with ``python -m psd2svg.server``. The server accepts PSD bytes over HTTP on
+localhost and converts them in a pool of long-lived worker processes. Workers
+are warmed up once at startup (imports, font mappings, fontconfig, and the
+rasterizer), so per-request latency for small files is dominated by the
+conversion itself rather than by interpreter and cache warm-up.
+
+Endpoints:
+
+- ``POST /convert``: Convert the request body and return ``image/svg+xml``, or
+  ``application/zip`` with ``output=zip`` (SVG plus external images).
+- ``POST /rasterize``: Convert and rasterize the request body to ``image/png``.
+- ``GET /metrics``: Queue depth, per-stage latency histograms, and the hit
+  rate of font name resolution (see :func:`~psd2svg.svg_document.cache_stats`)
+  in the Prometheus text format.
+- ``GET /healthz``: Liveness check.
+
+Query parameters map to conversion options (``image_format``,
+``encoder_preset``, ``pack_images``, ``embed_fonts``, ``font_format``, ``enable_text``,
+``enable_live_shapes``, ``enable_title``, ``enable_class``,
+``text_letter_spacing_offset``, ``text_wrapping_mode``) and
+to per-request :class:`~psd2svg.resource_limits.ResourceLimits`
+(``max_file_size``, ``timeout``, ``max_layer_depth``, ``max_image_dimension``,
+``max_memory``). Per-request limits may only tighten the server's limits.
+
+Example usage::
+
+    $ python -m psd2svg.server --port 8000 --workers 4
+    $ curl --data-binary @input.psd "http://127.0.0.1:8000/convert?timeout=30"
+"""
+
+import argparse
+import dataclasses
+import io
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from psd_tools import PSDImage
+
+from psd2svg.core import font_mapping, font_utils
+from psd2svg.core.typesetting import TextWrappingMode
+from psd2svg.rasterizer import BaseRasterizer, PlaywrightRasterizer, ResvgRasterizer
+from psd2svg.resource_limits import ResourceLimits
+from psd2svg.svg_document import ATLAS_MAX_SIZE, SVGDocument, cache_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# Prometheus default latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RASTERIZERS = ("resvg", "playwright")
+OUTPUT_FORMATS = ("svg", "zip")
+IMAGE_FORMATS = ("webp", "png", "jpeg", "auto")
+ENCODER_PRESETS = ("fastest", "balanced", "smallest")
+FONT_FORMATS = ("woff2", "woff", "ttf", "otf")
+TEXT_WRAPPING_MODES = {
+    "none": TextWrappingMode.NONE,
+    "foreignobject": TextWrappingMode.FOREIGN_OBJECT,
+}
+BOOLEAN_OPTIONS = (
+    "enable_text",
+    "enable_live_shapes",
+    "enable_title",
+    "enable_class",
+    "embed_fonts",
+)
+LIMIT_FIELDS = (
+    "max_file_size",
+    "timeout",
+    "max_layer_depth",
+    "max_image_dimension",
+    "max_memory",
+)
+
+# Rasterizer of the current worker process, created by _init_worker().
+_rasterizer: BaseRasterizer | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class ConversionRequest:
+    """A conversion job sent to a worker.
+
+    Attributes:
+        data: PSD file content.
+        mode: ``"svg"``, ``"zip"``, or ``"png"``.
+        options: Keyword arguments for ``SVGDocument.from_psd()``.
+        output_options: Keyword arguments for ``SVGDocument.save()``.
+        isolate: Whether to build in an isolated child of the worker.
+    """
+
+    data: bytes
+    mode: str
+    options: dict[str, Any]
+    output_options: dict[str, Any]
+    isolate: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class ConversionResponse:
+    """Result of a conversion job returned by a worker.
+
+    Attributes:
+        body: Response body.
+        content_type: MIME type of the body.
+        started_at: Wall-clock time the worker started the job.
+        timings: Duration of each stage in seconds.
+        pid: Process ID of the worker.
+        cache_stats: Cumulative ``(hits, misses)`` of each lookup in the worker,
+            from :func:`~psd2svg.svg_document.cache_stats`.
+    """
+
+    body: bytes
+    content_type: str
+    started_at: float
+    timings: dict[str, float]
+    pid: int
+    cache_stats: dict[str, tuple[int, int]]
+
+
+def _init_worker(loglevel: int, rasterizer: str) -> None:
+    """Warm up a worker process before it receives any request."""
+    global _rasterizer
+    logging.basicConfig(level=loglevel)
+    font_mapping.get_all_font_mappings()
+    if font_utils.HAS_FONTCONFIG:
+        # Loads the fontconfig configuration and font cache.
+        font_utils.FontInfo.resolve("ArialMT")
+    if rasterizer == "playwright":
+        _rasterizer = PlaywrightRasterizer()
+    else:
+        _rasterizer = ResvgRasterizer()
+    # Render once so that lazily started backends (e.g. the browser) are ready.
+    _rasterizer.from_string(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>'
+    )
+
+
+def _ping() -> int:
+    """Return the worker process ID. Used to start and warm up workers."""
+    return os.getpid()
+
+
+def _build(request: ConversionRequest) -> SVGDocument:
+    """Build an SVGDocument from the request data."""
+    psdimage = PSDImage.open(io.BytesIO(request.data))
+    return SVGDocument.from_psd(psdimage, isolate=request.isolate, **request.options)
+
+
+def _run_request(request: ConversionRequest) -> ConversionResponse:
+    """Process a conversion job in a worker process."""
+    started_at = time.time()
+    timings: dict[str, float] = {}
+
+    start = time.perf_counter()
+    document = _build(request)
+    timings["build"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if request.mode == "png":
+        image = document.rasterize(rasterizer=_rasterizer)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        body, content_type = buffer.getvalue(), "image/png"
+        timings["rasterize"] = time.perf_counter() - start
+    elif request.mode == "zip":
+        body, content_type = _write_zip(document, request.output_options)
+        timings["output"] = time.perf_counter() - start
+    else:
+        svg = document.tostring(**request.output_options)
+        body, content_type = svg.encode("utf-8"), "image/svg+xml"
+        timings["output"] = time.perf_counter() - start
+
+    return ConversionResponse(
+        body=body,
+        content_type=content_type,
+        started_at=started_at,
+        timings=timings,
+        pid=os.getpid(),
+        cache_stats=cache_stats(),
+    )
+
+
+def _write_zip(
+    document: SVGDocument, output_options: dict[str, Any]
+) -> tuple[bytes, str]:
+    """Save the document with external images and pack the files into a zip."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        document.save(
+            os.path.join(tmpdir, "output.svg"),
+            embed_images=False,
+            image_prefix="images/",
+            **output_options,
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for dirpath, _, filenames in os.walk(tmpdir):
+                for filename in sorted(filenames):
+                    path = os.path.join(dirpath, filename)
+                    archive.write(path, os.path.relpath(path, tmpdir))
+    return buffer.getvalue(), "application/zip"
+
+
+def _parse_bool(name: str, value: str) -> bool:
+    """Parse a boolean query parameter."""
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Invalid boolean for {name}: {value!r}")
+
+
+def _parse_choice(name: str, value: str, choices: tuple[str, ...]) -> str:
+    """Parse a query parameter restricted to a set of choices."""
+    if value not in choices:
+        raise ValueError(f"Invalid {name}: {value!r}. Choose from {', '.join(choices)}")
+    return value
+
+
+def parse_resource_limits(
+    params: dict[str, str], server_limits: ResourceLimits
+) -> ResourceLimits:
+    """Build per-request resource limits from query parameters.
+
+    Each limit defaults to the server's limit. A request may lower a limit but
+    not raise or disable a limit that the server enforces.
+
+    Args:
+        params: Query parameters.
+        server_limits: Limits configured for the server.
+
+    Returns:
+        ResourceLimits for the request.
+
+    Raises:
+        ValueError: If a value is not a positive integer or exceeds the server's
+            limit.
+    """
+    values = dataclasses.asdict(server_limits)
+    for field in LIMIT_FIELDS:
+        if field not in params:
+            continue
+        try:
+            value = int(params[field])
+        except ValueError:
+            raise ValueError(
+                f"Invalid integer for {field}: {params[field]!r}"
+            ) from None
+        if value <= 0:
+            raise ValueError(f"{field} must be a positive integer")
+        server_value = values[field]
+        if server_value > 0 and value > server_value:
+            raise ValueError(f"{field}={value} exceeds the server limit {server_value}")
+        values[field] = value
+    return ResourceLimits(**values)
+
+
+def parse_conversion_options(
+    params: dict[str, str],
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Map query parameters to conversion and output options.
+
+    Args:
+        params: Query parameters.
+
+    Returns:
+        Tuple of (``from_psd()`` keyword arguments, ``save()``/``tostring()``
+        keyword arguments).
+
+    Raises:
+        ValueError: If a parameter has an invalid value.
+    """
+    options: dict[str, Any] = {}
+    output_options: dict[str, Any] = {}
+    for name in BOOLEAN_OPTIONS:
+        if name in params:
+            target = output_options if name == "embed_fonts" else options
+            target[name] = _parse_bool(name, params[name])
+    if "text_letter_spacing_offset" in params:
+        try:
+            options["text_letter_spacing_offset"] = float(
+                params["text_letter_spacing_offset"]
+            )
+        except ValueError:
+            raise ValueError(
+                "Invalid number for text_letter_spacing_offset: "
+                f"{params['text_letter_spacing_offset']!r}"
+            ) from None
+    if "text_wrapping_mode" in params:
+        mode = _parse_choice(
+            "text_wrapping_mode",
+            params["text_wrapping_mode"],
+            tuple(TEXT_WRAPPING_MODES),
+        )
+        options["text_wrapping_mode"] = TEXT_WRAPPING_MODES[mode]
+    if "image_format" in params:
+        output_options["image_format"] = _parse_choice(
+            "image_format", params["image_format"], IMAGE_FORMATS
+        )
+    if "encoder_preset" in params:
+        output_options["encoder_options"] = _parse_choice(
+            "encoder_preset", params["encoder_preset"], ENCODER_PRESETS
+        )
+    if "pack_images" in params:
+        try:
+            pack_images = int(params["pack_images"])
+        except ValueError:
+            pack_images = 0
+        if not 1 <= pack_images <= ATLAS_MAX_SIZE - 2:
+            raise ValueError(
+                f"Invalid pack_images: {params['pack_images']!r}. "
+                f"Expected an integer between 1 and {ATLAS_MAX_SIZE - 2}."
+            )
+        output_options["pack_images"] = pack_images
+    if "font_format" in params:
+        output_options["font_format"] = _parse_choice(
+            "font_format", params["font_format"], FONT_FORMATS
+        )
+    return options, output_options
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """Thread-safe server metrics rendered in the Prometheus text format."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests: dict[tuple[str, int], int] = {}
+        self._latency: dict[str, Histogram] = {}
+        self._cache_stats: dict[int, dict[str, tuple[int, int]]] = {}
+
+    def request_started(self) -> None:
+        """Count a job submitted to the worker pool."""
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self) -> None:
+        """Count a job that left the worker pool."""
+        with self._lock:
+            self._in_flight -= 1
+
+    def record_status(self, endpoint: str, status: int) -> None:
+        """Count a response by endpoint and status code."""
+        with self._lock:
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def record_response(
+        self, response: ConversionResponse, submitted_at: float, total: float
+    ) -> None:
+        """Record stage latencies and cache statistics of a finished job."""
+        stages = {"queue": max(0.0, response.started_at - submitted_at)}
+        stages.update(response.timings)
+        stages["total"] = total
+        with self._lock:
+            for stage, value in stages.items():
+                self._latency.setdefault(stage, Histogram()).observe(value)
+            self._cache_stats[response.pid] = response.cache_stats
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker."""
+        return max(0, self._in_flight - self.workers)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP psd2svg_workers Number of worker processes.",
+                "# TYPE psd2svg_workers gauge",
+                f"psd2svg_workers {self.workers}",
+                "# HELP psd2svg_requests_in_flight Jobs submitted to the pool.",
+                "# TYPE psd2svg_requests_in_flight gauge",
+                f"psd2svg_requests_in_flight {self._in_flight}",
+                "# HELP psd2svg_queue_depth Jobs waiting for a free worker.",
+                "# TYPE psd2svg_queue_depth gauge",
+                f"psd2svg_queue_depth {self.queue_depth}",
+                "# HELP psd2svg_requests_total Responses by endpoint and status.",
+                "# TYPE psd2svg_requests_total counter",
+            ]
+            for (endpoint, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'psd2svg_requests_total{{endpoint="{endpoint}",'
+                    f'status="{status}"}} {count}'
+                )
+
+            lines += [
+                "# HELP psd2svg_stage_seconds Latency of each conversion stage.",
+                "# TYPE psd2svg_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self._latency.items()):
+                label = f'stage="{stage}"'
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(
+                        f'psd2svg_stage_seconds_bucket{{{label},le="{bound:g}"}} '
+                        f"{count}"
+                    )
+                lines += [
+                    f'psd2svg_stage_seconds_bucket{{{label},le="+Inf"}} '
+                    f"{histogram.count}",
+                    f"psd2svg_stage_seconds_sum{{{label}}} {histogram.sum:.6f}",
+                    f"psd2svg_stage_seconds_count{{{label}}} {histogram.count}",
+                ]
+
+            totals: dict[str, list[int]] = {name: [0, 0] for name in cache_stats()}
+            for stats in self._cache_stats.values():
+                for name, (hits, misses) in stats.items():
+                    totals[name][0] += hits
+                    totals[name][1] += misses
+            lines += [
+                "# HELP psd2svg_cache_hits_total Cache hits summed over workers.",
+                "# TYPE psd2svg_cache_hits_total counter",
+            ]
+            for name, (hits, _) in sorted(totals.items()):
+                lines.append(f'psd2svg_cache_hits_total{{cache="{name}"}} {hits}')
+            lines += [
+                "# HELP psd2svg_cache_misses_total Cache misses summed over workers.",
+                "# TYPE psd2svg_cache_misses_total counter",
+            ]
+            for name, (_, misses) in sorted(totals.items()):
+                lines.append(f'psd2svg_cache_misses_total{{cache="{name}"}} {misses}')
+            lines += [
+                "# HELP psd2svg_cache_hit_ratio Cache hit ratio over workers.",
+                "# TYPE psd2svg_cache_hit_ratio gauge",
+            ]
+            for name, (hits, misses) in sorted(totals.items()):
+                ratio = hits / (hits + misses) if hits + misses else 0.0
+                lines.append(f'psd2svg_cache_hit_ratio{{cache="{name}"}} {ratio:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server that converts PSD files in a warm worker pool.
+
+    Args:
+        server_address: ``(host, port)`` to listen on. Use port 0 to pick a
+            free port.
+        workers: Number of worker processes. Use 0 for one per CPU.
+        resource_limits: Server-wide limits. Requests may only tighten them.
+            If None, uses ResourceLimits.default().
+        rasterizer: Rasterizer kept ready in each worker, ``"resvg"`` or
+            ``"playwright"``.
+        isolate: Whether to build each request in an isolated child of the
+            worker with memory and CPU rlimits.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        workers: int = 0,
+        resource_limits: ResourceLimits | None = None,
+        rasterizer: str = "resvg",
+        isolate: bool = False,
+    ) -> None:
+        if rasterizer not in RASTERIZERS:
+            raise ValueError(
+                f"Invalid rasterizer: {rasterizer!r}. Choose from "
+                f"{', '.join(RASTERIZERS)}"
+            )
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.resource_limits = resource_limits or ResourceLimits.default()
+        self.isolate = isolate
+        self.rasterizer = rasterizer
+        self.metrics = Metrics(self.workers)
+        self._pool_lock = threading.Lock()
+        self.executor = self._create_pool()
+        try:
+            self.warm_up()
+            super().__init__(server_address, ConversionRequestHandler)
+        except BaseException:
+            self.executor.shutdown(cancel_futures=True)
+            raise
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Pools are re-created from handler threads; forking a threaded process
+        # may copy locks held by other threads, so start workers fresh.
+        method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_init_worker,
+            initargs=(logging.getLogger().getEffectiveLevel(), self.rasterizer),
+        )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker died, unless another thread already did."""
+        with self._pool_lock:
+            if self.executor is broken:
+                logger.warning("A worker process died, restarting the worker pool")
+                self.executor = self._create_pool()
+                broken.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> None:
+        """Start and initialize all worker processes."""
+        start = time.perf_counter()
+        # The pool starts workers on demand; keep all of them busy at once so
+        # that every worker is spawned and initialized.
+        barrier = [self.executor.submit(_ping) for _ in range(self.workers)]
+        pids = {future.result() for future in barrier}
+        logger.info(
+            "Warmed up %d workers in %.2f seconds",
+            len(pids),
+            time.perf_counter() - start,
+        )
+
+    def convert(self, request: ConversionRequest) -> ConversionResponse:
+        """Run a conversion job in the worker pool and record metrics."""
+        submitted_at = time.time()
+        start = time.perf_counter()
+        executor = self.executor
+        self.metrics.request_started()
+        try:
+            response = executor.submit(_run_request, request).result()
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            raise
+        finally:
+            self.metrics.request_finished()
+        self.metrics.record_response(
+            response, submitted_at, time.perf_counter() - start
+        )
+        return response
+
+    def server_close(self) -> None:
+        """Close the listening socket and shut down the worker pool."""
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Request handler for :class:`ConversionServer`."""
+
+    server: ConversionServer
+
+    def do_GET(self) -> None:
+        """Serve /metrics and /healthz."""
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            body = self.server.metrics.render().encode("utf-8")
+            self._send(HTTPStatus.OK, body, "text/plain; version=0.0.4")
+        elif path == "/healthz":
+            self._send(HTTPStatus.OK, b"ok\n", "text/plain")
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+
+    def do_POST(self) -> None:
+        """Serve /convert and /rasterize."""
+        url = urlsplit(self.path)
+        if url.path not in ("/convert", "/rasterize"):
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {url.path}")
+            return
+        endpoint = url.path.lstrip("/")
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            limits = parse_resource_limits(params, self.server.resource_limits)
+            options, output_options = parse_conversion_options(params)
+            output = _parse_choice(
+                "output", params.get("output", "svg"), OUTPUT_FORMATS
+            )
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e), endpoint)
+            return
+
+        length_header = self.headers.get("Content-Length")
+        if length_header is None or not length_header.isdigit():
+            self._send_error(
+                HTTPStatus.LENGTH_REQUIRED, "Content-Length is required", endpoint
+            )
+            return
+        length = int(length_header)
+        if limits.max_file_size > 0 and length > limits.max_file_size:
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"File size {length} bytes exceeds limit {limits.max_file_size} bytes.",
+                endpoint,
+            )
+            return
+        data = self.rfile.read(length)
+
+        options["resource_limits"] = limits
+        request = ConversionRequest(
+            data=data,
+            mode="png" if endpoint == "rasterize" else output,
+            options=options,
+            output_options=output_options,
+            isolate=self.server.isolate,
+        )
+        try:
+            response = self.server.convert(request)
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e), endpoint)
+        except TimeoutError as e:
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT, str(e), endpoint)
+        except Exception as e:
+            logger.error("Conversion failed: %s: %s", type(e).__name__, e)
+            self._send_error(
+                HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}", endpoint
+            )
+        else:
+            self.server.metrics.record_status(endpoint, HTTPStatus.OK)
+            self._send(HTTPStatus.OK, response.body, response.content_type)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests through the logging module instead of stderr."""
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(
+        self, status: HTTPStatus, message: str, endpoint: str | None = None
+    ) -> None:
+        if endpoint is not None:
+            self.server.metrics.record_status(endpoint, status)
+        body = json.dumps({"error": message}).encode("utf-8")
+        self._send(status, body, "application/json")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m psd2svg.server",
+        description="Serve PSD to SVG conversion over HTTP on localhost",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Address to listen on. Default: {DEFAULT_HOST}",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on. Default: {DEFAULT_PORT}",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=int,
+        default=0,
+        help="Number of worker processes. Default: 0 (one per CPU)",
+    )
+    parser.add_argument(
+        "--rasterizer",
+        choices=RASTERIZERS,
+        default="resvg",
+        help="Rasterizer kept ready for /rasterize. Default: resvg",
+    )
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help=(
+            "Build each request in a forked child with memory and CPU rlimits "
+            "(Unix only)."
+        ),
+    )
+    parser.add_argument(
+        "--loglevel",
+        metavar="LEVEL",
+        default="INFO",
+        help="Logging level, default INFO",
+    )
+    for field in LIMIT_FIELDS:
+        parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            dest=field,
+            type=int,
+            default=None,
+            help=(
+                f"Server-wide {field.replace('_', ' ')} limit. Requests may only "
+                "lower it. See 'psd2svg --help' for defaults."
+            ),
+        )
+    args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must be zero or positive")
+    return args
+
+
+def main() -> None:
+    """Run the conversion server until interrupted."""
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.loglevel.upper(), "INFO"))
+    resource_limits = ResourceLimits.from_cli_args(
+        **{field: getattr(args, field) for field in LIMIT_FIELDS}
+    )
+    server = ConversionServer(
+        (args.host, args.port),
+        workers=args.workers,
+        resource_limits=resource_limits,
+        rasterizer=args.rasterizer,
+        isolate=args.isolate,
+    )
+    host, port = server.server_address[:2]
+    logger.info("Serving on http://%s:%s with %d workers", host, port, server.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,40 @@
+import asyncio
+import collections
 import dataclasses
+import functools
+import hashlib
 import logging
 import os
+import threading
+import uuid
 import xml.etree.ElementTree as ET
+from concurrent.futures import Executor
 from copy import deepcopy
+from typing import Any, Mapping, TextIO
 
 from PIL import Image
 from psd_tools import PSDImage
 
-from psd2svg import image_utils, svg_utils
+from psd2svg import image_utils, isolation, svg_utils
 from psd2svg.core import font_utils
 from psd2svg.core.converter import Converter
 from psd2svg.core.font_utils import FontInfo
+from psd2svg.image_utils import EncoderOptions, LazyImage, MaskProfile
 from psd2svg.rasterizer import BaseRasterizer, ResvgRasterizer
 from psd2svg.resource_limits import ResourceLimits
-from psd2svg.timeout_utils import with_timeout
+from psd2svg.timeout_utils import Deadline
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_IMAGE_FORMAT = "webp"
+# Maximum width and height of an atlas of packed images.
+ATLAS_MAX_SIZE = 2048
+# Maximum width and height of the placeholders of progressive output.
+PLACEHOLDER_SIZE = 16
+
+# Process-wide [hits, misses] of output lookups, see cache_stats().
+_CACHE_STATS: dict[str, list[int]] = {"font_mapping": [0, 0]}
+_CACHE_STATS_LOCK = threading.Lock()
 
 
 @dataclasses.dataclass
@@ -46,12 +63,33 @@ class SVGDocument:
     """
 
     svg: ET.Element
-    images: dict[str, Image.Image] = dataclasses.field(default_factory=dict)
+    images: dict[str, Image.Image | LazyImage] = dataclasses.field(default_factory=dict)
     # Note: fonts property removed - PostScript names stored directly in SVG
     # font-family attributes
     _font_data_cache: dict[str, str] = dataclasses.field(
         default_factory=dict, init=False, repr=False
     )
+    # Encoded (format, bytes) by (image ID, format, mask profile, encoder
+    # options), with the image they encode. The mask profile is None for
+    # images it does not apply to.
+    _image_data_cache: dict[
+        tuple[str, str, MaskProfile | None, EncoderOptions],
+        tuple[Image.Image | LazyImage, tuple[str, bytes]],
+    ] = dataclasses.field(default_factory=dict, init=False, repr=False)
+    # Placeholder data URIs by (image ID, format), with the image they preview.
+    _placeholder_cache: dict[tuple[str, str], tuple[Image.Image | LazyImage, str]] = (
+        dataclasses.field(default_factory=dict, init=False, repr=False)
+    )
+    # Packed atlases and placements by mode, size limit, and packed images,
+    # with the images they pack.
+    _atlas_cache: dict[
+        tuple[str, int, tuple[int, ...]],
+        tuple[
+            list[Image.Image | LazyImage],
+            list[Image.Image],
+            list[tuple[int, int, int]],
+        ],
+    ] = dataclasses.field(default_factory=dict, init=False, repr=False)
 
     @staticmethod
     def from_psd(
@@ -64,6 +102,16 @@ class SVGDocument:
         text_wrapping_mode: int = 0,
         font_mapping: dict[str, dict[str, float | str]] | None = None,
         resource_limits: ResourceLimits | None = None,
+        isolate: bool = False,
+        deadline: Deadline | None = None,
+        lazy_images: bool = False,
+        low_memory: bool = False,
+        trim_images: bool = False,
+        crop_to_canvas: bool = False,
+        bake_masks: bool = False,
+        max_image_scale: float | None = None,
+        target_width: int | None = None,
+        tile_size: int | None = None,
     ) -> "SVGDocument":
         """Create a new SVGDocument from a PSDImage.
 
@@ -106,6 +154,53 @@ class SVGDocument:
                 uses ResourceLimits.default() which enables limits (2GB file size,
                 3 minute timeout, 100 layer depth, 16K image dimension). Use
                 ResourceLimits.unlimited() to disable all limits for trusted input.
+                The timeout is enforced cooperatively at layer, effect, and image
+                boundaries, so conversions can run concurrently in worker threads.
+            isolate: If True, build the SVG in a forked worker process. The worker
+                runs under RLIMIT_AS (resource_limits.max_memory) and RLIMIT_CPU
+                (resource_limits.timeout) and is killed when the timeout passes,
+                so a pathological file cannot take down the calling process.
+                Only available on Unix-like platforms.
+            deadline: Optional deadline to check during the build instead of one
+                created from resource_limits.timeout. Useful to share a time budget
+                across stages or to cancel the build from another thread.
+            lazy_images: If True, layer pixels and masks are not decoded during
+                the build. images holds LazyImage handles that decode the
+                channel data each time an output method encodes them, which
+                lowers peak memory for large files at the cost of decoding again
+                on each output call. The PSDImage must stay alive until output.
+                Ignored with isolate=True, as images are decoded in the worker.
+            low_memory: If True, each image is kept as lossless PNG bytes as soon
+                as it is produced, and opaque layers are stored as RGB, so that
+                memory during and after the build is close to the compressed
+                size. Images are decoded again whenever they are encoded.
+            trim_images: If True, crop pixel layers without effects to their
+                non-transparent pixels and layer masks to their non-black
+                pixels, and position the <image> elements to match. Rendering
+                is unchanged. Images deferred by lazy_images are not trimmed.
+            crop_to_canvas: If True, crop pixel layers and masks to the canvas
+                and any enclosing artboard, since nothing outside is visible.
+                Layers with effects, and layers inside groups with effects, are
+                kept whole because the effects can show pixels from outside.
+            bake_masks: If True, multiply the layer mask of each pixel layer
+                without effects into the layer's alpha channel, so the layer is
+                one image without a <mask>. Images deferred by lazy_images are
+                not baked.
+            max_image_scale: Optional scale factor in (0, 1] to downsample pixel
+                layers, masks, and pattern images with Lanczos resampling, e.g.
+                0.25 for previews. The <image> elements keep their size in
+                document units, so the layout and vector content are unchanged.
+            target_width: Optional width in pixels that the document is meant
+                to be displayed at. Images are downsampled by target_width
+                divided by the document width, and never upsampled. When both
+                options are set, the smaller scale applies.
+            tile_size: Optional tile size in pixels, between 256 and 16383. Pixel
+                layers, masks, and the flat composite larger than a tile are
+                split into a grid of <image> tiles inside a <g>, which carries
+                the mask and opacity; pixel layers with effects are kept whole.
+                Tiles are encoded independently and in parallel, and are not
+                limited by the WebP maximum size. Images deferred by
+                lazy_images are not tiled.
 
         Returns:
             SVGDocument object containing the converted SVG and images.
@@ -113,10 +208,14 @@ class SVGDocument:
         Raises:
             ValueError: If layer depth or image dimensions exceed limits.
             TimeoutError: If conversion exceeds timeout limit.
+            MemoryError: If an isolated conversion exceeds the memory limit.
+            RuntimeError: If an isolated conversion worker dies unexpectedly.
         """
         # Default to ResourceLimits.default() if not specified
         if resource_limits is None:
             resource_limits = ResourceLimits.default()
+        if deadline is None and resource_limits.is_timeout_enabled():
+            deadline = Deadline(resource_limits.timeout)
 
         # Build SVG tree with original font names
         converter = Converter(
@@ -129,18 +228,27 @@ class SVGDocument:
             text_wrapping_mode=text_wrapping_mode,
             font_mapping=font_mapping,
             resource_limits=resource_limits,
+            deadline=deadline,
+            lazy_images=lazy_images and not isolate,
+            low_memory=low_memory,
+            trim_images=trim_images,
+            crop_to_canvas=crop_to_canvas,
+            bake_masks=bake_masks,
+            max_image_scale=max_image_scale,
+            target_width=target_width,
+            tile_size=tile_size,
         )
 
-        # Build with timeout protection
-        if resource_limits.is_timeout_enabled():
-            with_timeout(converter.build, resource_limits.timeout)
-        else:
+        def build() -> tuple[ET.Element, dict[str, Image.Image | LazyImage]]:
             converter.build()
+            return converter.svg, converter.images
 
-        document = SVGDocument(
-            svg=converter.svg,
-            images=converter.images,
-        )
+        if isolate:
+            svg, images = isolation.run_isolated(build, resource_limits)
+        else:
+            svg, images = build()
+
+        document = SVGDocument(svg=svg, images=images)
 
         return document
 
@@ -189,6 +297,14 @@ class SVGDocument:
         optimize: bool,
         svg_filepath: str | None,
         use_data_uri_for_fonts: bool = True,
+        max_workers: int | None = None,
+        payloads: dict[str, bytes] | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
     ) -> ET.Element:
         """Prepare SVG element for output by handling images, fonts, and optimization.
 
@@ -205,17 +321,85 @@ class SVGDocument:
             use_data_uri_for_fonts: If True, embed fonts as data URIs. If False, use
                 file:// URLs.
                 Only applies when embed_fonts=True. Default is True.
+            max_workers: Maximum number of threads for image encoding. If None,
+                uses the number of CPUs.
+            payloads: If provided, embedded images get placeholder data URIs and
+                their encoded bytes are added here for svg_utils.write().
+            mask_profile: Optional encoding profile for masks. If None, masks
+                are encoded in image_format like other images.
+            encode_budget: Optional encode-time budget in seconds for
+                image_format="auto".
+            encoder_options: Optional encoder options or preset name.
+            hash_filenames: If True, name image files by content hash.
+            pack_images: Optional size limit for packing images into atlases.
+            progressive: If True, give image files blurred inline placeholders.
 
         Returns:
             Prepared SVG element ready for serialization.
         """
-        # Create a copy to avoid modifying the original SVG
-        svg = deepcopy(self.svg)
+        svg = self._copy_for_output(optimize)
 
         svg = self._handle_images(
-            svg, embed_images, image_prefix, image_format, svg_filepath=svg_filepath
+            svg,
+            embed_images,
+            image_prefix,
+            image_format,
+            svg_filepath=svg_filepath,
+            max_workers=max_workers,
+            payloads=payloads,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
+        )
+        self._handle_fonts(
+            svg, embed_fonts, subset_fonts, font_format, use_data_uri_for_fonts
+        )
+        if optimize:
+            self._optimize(svg)
+        return svg
+
+    def _copy_for_output(self, optimize: bool) -> ET.Element:
+        """Copy self.svg for the output passes to modify.
+
+        The optimizer may restructure any part of the tree, so it gets a full
+        copy. Otherwise only the <image> and <style> elements and the subtrees
+        that declare a font family are copied, since those are all that the
+        image and font passes change; the rest is shared with self.svg.
+        """
+        if optimize:
+            return deepcopy(self.svg)
+        return svg_utils.copy_subtrees(self.svg, self._is_modified_for_output)
+
+    @staticmethod
+    def _is_modified_for_output(node: ET.Element) -> bool:
+        """Return True if the image or font passes may change this subtree."""
+        tag = node.tag.split("}")[-1]
+        return (
+            tag in ("image", "style")
+            or "font-family" in node.attrib
+            or "font-family" in node.attrib.get("style", "")
         )
 
+    def _handle_fonts(
+        self,
+        svg: ET.Element,
+        embed_fonts: bool,
+        subset_fonts: bool,
+        font_format: str,
+        use_data_uri: bool,
+    ) -> None:
+        """Resolve font names and optionally embed fonts, modifying svg in-place.
+
+        Args:
+            svg: SVG element to modify in-place.
+            embed_fonts: If True, embed fonts as @font-face rules in <style> element.
+            subset_fonts: If True, subset fonts to only include glyphs used in the SVG.
+            font_format: Font format for embedding: "woff2", "woff", "ttf", or "otf".
+            use_data_uri: If True, embed fonts as data URIs, otherwise file:// URLs.
+        """
         # Early split: different font resolution strategies for embed_fonts
         if embed_fonts:
             # Single-pass resolution: platform queries + charset extraction +
@@ -225,19 +409,19 @@ class SVGDocument:
                 svg,
                 subset_fonts=subset_fonts,
                 font_format=font_format,
-                use_data_uri=use_data_uri_for_fonts,
+                use_data_uri=use_data_uri,
                 resolved_fonts_map=resolved_fonts_map,
             )
         else:
             # Static mapping only: no platform queries, no charset extraction
             self._resolve_postscript_names_static(svg)
 
-        if optimize:
-            svg_utils.consolidate_defs(svg)
-            svg_utils.deduplicate_definitions(svg)
-            svg_utils.unwrap_groups(svg)
-
-        return svg
+    @staticmethod
+    def _optimize(svg: ET.Element) -> None:
+        """Apply SVG optimizations in-place."""
+        svg_utils.consolidate_defs(svg)
+        svg_utils.deduplicate_definitions(svg)
+        svg_utils.unwrap_groups(svg)
 
     def tostring(
         self,
@@ -249,6 +433,13 @@ class SVGDocument:
         image_format: str = DEFAULT_IMAGE_FORMAT,
         indent: str = "  ",
         optimize: bool = True,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
     ) -> str:
         """Convert SVG document to string.
 
@@ -267,10 +458,42 @@ class SVGDocument:
                 WOFF2 provides best compression and is recommended for web use.
             image_prefix: If provided, save images to files with this prefix.
                 When specified, embed_images is ignored.
-            image_format: Image format to use when embedding or saving images.
+            image_format: Image format to use when embedding or saving images:
+                "webp", "png", "jpeg", or "auto" to choose the format of each
+                image from its content. See image_utils.encode_auto().
             indent: Indentation string for pretty-printing the SVG.
             optimize: If True, apply SVG optimizations (consolidate defs, etc.).
                 Default is True.
+            max_workers: Maximum number of threads for encoding images. If None
+                (default), uses the number of CPUs. Use 1 to encode serially.
+                The output does not depend on this value.
+            mask_profile: Optional encoding profile for layer masks, applied
+                instead of image_format. See image_utils.MaskProfile. If None
+                (default), masks are encoded like other images.
+            encode_budget: Time budget in seconds for encoding all images with
+                image_format="auto". Once it runs out, each remaining image is
+                encoded in its first candidate format without trying others.
+                If None (default), every candidate is tried.
+            encoder_options: Encoder settings trading encoding time against
+                size, as an image_utils.EncoderOptions or a preset name:
+                "fastest", "balanced", or "smallest". If None (default), uses
+                the Pillow defaults, which equal "balanced".
+            hash_filenames: If True, name image files after a hash of their
+                encoded bytes instead of a per-document counter, and skip files
+                that already exist. Documents saved with the same image_prefix
+                directory then share one deduplicated asset store. Only applies
+                with image_prefix.
+            pack_images: If set, pack images of at most this many pixels on
+                either side into shared atlas images, written once each, so
+                viewers decode and fetch a few atlases instead of many small
+                images. Each packed <image> becomes a <rect> filled with a
+                <pattern> showing its part of the atlas. If None (default),
+                every image is written separately.
+            progressive: If True, set the href of each <image> to a tiny
+                blurred placeholder embedded as a data URI, and its data-src
+                attribute to the path of the full-resolution image file, so
+                pages show the placeholders at once and swap in the files as
+                they load. Requires image_prefix. Default is False.
         """
         svg = self._prepare_svg_for_output(
             embed_images=embed_images,
@@ -279,8 +502,15 @@ class SVGDocument:
             font_format=font_format,
             image_prefix=image_prefix,
             image_format=image_format,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
             optimize=optimize,
             svg_filepath=None,
+            max_workers=max_workers,
         )
         return svg_utils.tostring(svg, indent=indent)
 
@@ -295,6 +525,13 @@ class SVGDocument:
         image_format: str = DEFAULT_IMAGE_FORMAT,
         indent: str = "  ",
         optimize: bool = True,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
     ) -> None:
         """Save the SVG to a file.
 
@@ -314,11 +551,138 @@ class SVGDocument:
                 WOFF2 provides best compression and is recommended for web use.
             image_prefix: If provided, save images to files with this prefix
                 relative to the output SVG file's directory.
-            image_format: Image format to use when embedding or saving images.
+            image_format: Image format to use when embedding or saving images:
+                "webp", "png", "jpeg", or "auto" to choose the format of each
+                image from its content. See image_utils.encode_auto().
             indent: Indentation string for pretty-printing the SVG.
             optimize: If True, apply SVG optimizations (consolidate defs, etc.).
                 Default is True.
+            max_workers: Maximum number of threads for encoding images. If None
+                (default), uses the number of CPUs. Use 1 to encode serially.
+                The output does not depend on this value.
+            mask_profile: Optional encoding profile for layer masks, applied
+                instead of image_format. See image_utils.MaskProfile. If None
+                (default), masks are encoded like other images.
+            encode_budget: Time budget in seconds for encoding all images with
+                image_format="auto". Once it runs out, each remaining image is
+                encoded in its first candidate format without trying others.
+                If None (default), every candidate is tried.
+            encoder_options: Encoder settings trading encoding time against
+                size, as an image_utils.EncoderOptions or a preset name:
+                "fastest", "balanced", or "smallest". If None (default), uses
+                the Pillow defaults, which equal "balanced".
+            hash_filenames: If True, name image files after a hash of their
+                encoded bytes instead of a per-document counter, and skip files
+                that already exist. Documents saved with the same image_prefix
+                directory then share one deduplicated asset store. Only applies
+                with image_prefix.
+            pack_images: If set, pack images of at most this many pixels on
+                either side into shared atlas images, written once each, so
+                viewers decode and fetch a few atlases instead of many small
+                images. Each packed <image> becomes a <rect> filled with a
+                <pattern> showing its part of the atlas. If None (default),
+                every image is written separately.
+            progressive: If True, set the href of each <image> to a tiny
+                blurred placeholder embedded as a data URI, and its data-src
+                attribute to the path of the full-resolution image file, so
+                pages show the placeholders at once and swap in the files as
+                they load. Requires image_prefix. Default is False.
         """
+        with open(filepath, "w", encoding="utf-8") as f:
+            self._write(
+                f,
+                embed_images=embed_images,
+                embed_fonts=embed_fonts,
+                subset_fonts=subset_fonts,
+                font_format=font_format,
+                image_prefix=image_prefix,
+                image_format=image_format,
+                mask_profile=mask_profile,
+                encode_budget=encode_budget,
+                encoder_options=encoder_options,
+                hash_filenames=hash_filenames,
+                pack_images=pack_images,
+                progressive=progressive,
+                indent=indent,
+                optimize=optimize,
+                svg_filepath=filepath,
+                max_workers=max_workers,
+            )
+
+    def write(
+        self,
+        stream: TextIO,
+        embed_images: bool = True,
+        embed_fonts: bool = False,
+        subset_fonts: bool = True,
+        font_format: str = "woff2",
+        image_prefix: str | None = None,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        indent: str = "  ",
+        optimize: bool = True,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
+    ) -> None:
+        """Write the SVG to a text stream.
+
+        Produces the same output as tostring(), but embedded images are
+        written to the stream as chunked base64 straight from the encoded
+        bytes, without building the data URIs or the whole document as
+        strings. save() writes files the same way.
+
+        Args:
+            stream: Text stream to write to, such as a file opened in text mode
+                or io.StringIO.
+
+        See tostring() for the other arguments.
+        """
+        self._write(
+            stream,
+            embed_images=embed_images,
+            embed_fonts=embed_fonts,
+            subset_fonts=subset_fonts,
+            font_format=font_format,
+            image_prefix=image_prefix,
+            image_format=image_format,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
+            indent=indent,
+            optimize=optimize,
+            svg_filepath=None,
+            max_workers=max_workers,
+        )
+
+    def _write(
+        self,
+        stream: TextIO,
+        embed_images: bool,
+        embed_fonts: bool,
+        subset_fonts: bool,
+        font_format: str,
+        image_prefix: str | None,
+        image_format: str,
+        mask_profile: MaskProfile | None,
+        encode_budget: float | None,
+        encoder_options: EncoderOptions | str | None,
+        hash_filenames: bool,
+        pack_images: int | None,
+        progressive: bool,
+        indent: str,
+        optimize: bool,
+        svg_filepath: str | None,
+        max_workers: int | None,
+    ) -> None:
+        """Prepare the SVG and write it to a stream with streamed images."""
+        payloads: dict[str, bytes] = {}
         svg = self._prepare_svg_for_output(
             embed_images=embed_images,
             embed_fonts=embed_fonts,
@@ -326,11 +690,18 @@ class SVGDocument:
             font_format=font_format,
             image_prefix=image_prefix,
             image_format=image_format,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
             optimize=optimize,
-            svg_filepath=filepath,
+            svg_filepath=svg_filepath,
+            max_workers=max_workers,
+            payloads=payloads,
         )
-        with open(filepath, "w", encoding="utf-8") as f:
-            svg_utils.write(svg, f, indent=indent)
+        svg_utils.write(svg, stream, indent=indent, payloads=payloads)
 
     def rasterize(
         self, dpi: int = 0, rasterizer: BaseRasterizer | None = None
@@ -392,17 +763,26 @@ class SVGDocument:
         self,
         image_format: str = DEFAULT_IMAGE_FORMAT,
         indent: str = "  ",
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
     ) -> dict[str, str | dict[str, bytes]]:
         """Export the SVG document in a serializable format.
 
         Note: Font information is now embedded in SVG font-family attributes,
-        so no separate fonts list is exported.
+        so no separate fonts list is exported. See save() for the image_format,
+        encode_budget, and encoder_options arguments.
         """
+        image_ids = list(self.images)
+        encoded = self._encode_images(
+            image_ids,
+            image_format,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+        )
         return {
             "svg": svg_utils.tostring(self.svg, indent=indent),
             "images": {
-                image_id: image_utils.encode_image(image, image_format)
-                for image_id, image in self.images.items()
+                image_id: data for image_id, (_, data) in zip(image_ids, encoded)
             },
         }
 
@@ -423,12 +803,328 @@ class SVGDocument:
             as a separate parameter.
         """
         svg_node = ET.fromstring(svg)
-        images_dict = {
-            image_id: image_utils.decode_image(img_bytes)
-            for image_id, img_bytes in images.items()
-        }
+        # Identical image bytes share one decoded image, as in from_psd().
+        decoded: dict[bytes, Image.Image] = {}
+        images_dict: dict[str, Image.Image | LazyImage] = {}
+        for image_id, img_bytes in images.items():
+            if img_bytes not in decoded:
+                decoded[img_bytes] = image_utils.decode_image(img_bytes)
+            images_dict[image_id] = decoded[img_bytes]
         return SVGDocument(svg=svg_node, images=images_dict)
 
+    @staticmethod
+    async def from_psd_async(
+        psdimage: PSDImage,
+        executor: Executor | None = None,
+        **kwargs: Any,
+    ) -> "SVGDocument":
+        """Asynchronously create a new SVGDocument from a PSDImage.
+
+        The build runs in ``executor``. If the awaiting task is cancelled, the build
+        stops at the next layer, effect, or image boundary.
+
+        Args:
+            psdimage: PSDImage object to convert.
+            executor: Thread-based executor for the build. If None, uses the event
+                loop's default executor.
+            **kwargs: Keyword arguments accepted by from_psd().
+
+        Returns:
+            SVGDocument object containing the converted SVG and images.
+
+        Example:
+            >>> document = await SVGDocument.from_psd_async(psdimage)
+            >>> svg_string = await document.tostring_async()
+        """
+        resource_limits = kwargs.pop("resource_limits", None)
+        if resource_limits is None:
+            resource_limits = ResourceLimits.default()
+        deadline = kwargs.pop("deadline", None)
+        if deadline is None:
+            # Always create a deadline so that cancellation can stop the build.
+            deadline = Deadline(resource_limits.timeout)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            executor,
+            functools.partial(
+                SVGDocument.from_psd,
+                psdimage,
+                resource_limits=resource_limits,
+                deadline=deadline,
+                **kwargs,
+            ),
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+
+    async def _prepare_svg_for_output_async(
+        self,
+        executor: Executor | None,
+        image_executor: Executor | None,
+        embed_images: bool,
+        embed_fonts: bool,
+        subset_fonts: bool,
+        font_format: str,
+        image_prefix: str | None,
+        image_format: str,
+        optimize: bool,
+        svg_filepath: str | None,
+        use_data_uri_for_fonts: bool = True,
+        max_workers: int | None = None,
+        payloads: dict[str, bytes] | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
+    ) -> ET.Element:
+        """Asynchronous version of _prepare_svg_for_output().
+
+        Image encoding runs in ``image_executor`` concurrently with font resolution
+        and subsetting in ``executor``. Image encoding does not touch the SVG tree;
+        the resulting hrefs are applied once both stages finish.
+        """
+        loop = asyncio.get_running_loop()
+        svg = await loop.run_in_executor(executor, self._copy_for_output, optimize)
+        nodes = self._collect_image_nodes(svg)
+        if nodes and progressive and image_prefix is None:
+            raise ValueError("progressive output requires image_prefix")
+        # Mask preparation and atlas compositing read image data, so they run
+        # off the event loop. Both modify the tree before the font pass starts.
+        if nodes:
+            await loop.run_in_executor(
+                image_executor or executor,
+                self._prepare_mask_nodes,
+                nodes,
+                mask_profile,
+            )
+        images: Mapping[str, Image.Image | LazyImage] = self.images
+        if nodes and pack_images is not None:
+            nodes, atlases = await loop.run_in_executor(
+                image_executor or executor,
+                self._pack_images,
+                svg,
+                nodes,
+                pack_images,
+            )
+            images = collections.ChainMap(self.images, atlases)
+
+        if nodes:
+            image_ids = [node.attrib["id"] for node in nodes]
+            images_future = loop.run_in_executor(
+                image_executor or executor,
+                self._create_image_hrefs,
+                image_ids,
+                embed_images,
+                image_prefix,
+                image_format,
+                svg_filepath,
+                max_workers,
+                payloads,
+                mask_profile,
+                encode_budget,
+                encoder_options,
+                hash_filenames,
+                images,
+            )
+            placeholders_future = None
+            if progressive:
+                placeholders_future = loop.run_in_executor(
+                    image_executor or executor,
+                    self._create_placeholder_hrefs,
+                    image_ids,
+                    image_format,
+                    max_workers,
+                    images,
+                )
+        fonts_future = loop.run_in_executor(
+            executor,
+            self._handle_fonts,
+            svg,
+            embed_fonts,
+            subset_fonts,
+            font_format,
+            use_data_uri_for_fonts,
+        )
+        if nodes:
+            hrefs, _ = await asyncio.gather(images_future, fonts_future)
+            placeholders = None
+            if placeholders_future is not None:
+                placeholders = await placeholders_future
+            self._apply_image_hrefs(svg, nodes, hrefs, placeholders, images)
+        else:
+            await fonts_future
+
+        if optimize:
+            await loop.run_in_executor(executor, self._optimize, svg)
+        return svg
+
+    async def tostring_async(
+        self,
+        embed_images: bool = True,
+        embed_fonts: bool = False,
+        subset_fonts: bool = True,
+        font_format: str = "woff2",
+        image_prefix: str | None = None,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        indent: str = "  ",
+        optimize: bool = True,
+        executor: Executor | None = None,
+        image_executor: Executor | None = None,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
+    ) -> str:
+        """Asynchronously convert SVG document to string.
+
+        CPU-heavy stages run in executors, and image encoding overlaps with font
+        resolution and subsetting. Cancelling the awaiting task stops the pipeline
+        at the next stage boundary.
+
+        Args:
+            executor: Thread-based executor for copying, font handling,
+                optimization, and serialization. If None, uses the event loop's
+                default executor.
+            image_executor: Thread-based executor for image encoding. If None,
+                uses ``executor``.
+
+        See tostring() for the other arguments.
+        """
+        svg = await self._prepare_svg_for_output_async(
+            executor,
+            image_executor,
+            embed_images=embed_images,
+            embed_fonts=embed_fonts,
+            subset_fonts=subset_fonts,
+            font_format=font_format,
+            image_prefix=image_prefix,
+            image_format=image_format,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
+            optimize=optimize,
+            svg_filepath=None,
+            max_workers=max_workers,
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(svg_utils.tostring, svg, indent=indent)
+        )
+
+    async def save_async(
+        self,
+        filepath: str,
+        embed_images: bool = True,
+        embed_fonts: bool = False,
+        subset_fonts: bool = True,
+        font_format: str = "woff2",
+        image_prefix: str | None = None,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        indent: str = "  ",
+        optimize: bool = True,
+        executor: Executor | None = None,
+        image_executor: Executor | None = None,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
+    ) -> None:
+        """Asynchronously save the SVG to a file.
+
+        Args:
+            executor: Thread-based executor for copying, font handling,
+                optimization, and writing. If None, uses the event loop's
+                default executor.
+            image_executor: Thread-based executor for image encoding and saving.
+                If None, uses ``executor``.
+
+        See save() for the other arguments.
+        """
+        payloads: dict[str, bytes] = {}
+        svg = await self._prepare_svg_for_output_async(
+            executor,
+            image_executor,
+            embed_images=embed_images,
+            embed_fonts=embed_fonts,
+            subset_fonts=subset_fonts,
+            font_format=font_format,
+            image_prefix=image_prefix,
+            image_format=image_format,
+            mask_profile=mask_profile,
+            encode_budget=encode_budget,
+            encoder_options=encoder_options,
+            hash_filenames=hash_filenames,
+            pack_images=pack_images,
+            progressive=progressive,
+            optimize=optimize,
+            svg_filepath=filepath,
+            max_workers=max_workers,
+            payloads=payloads,
+        )
+
+        def write() -> None:
+            with open(filepath, "w", encoding="utf-8") as f:
+                svg_utils.write(svg, f, indent=indent, payloads=payloads)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, write)
+
+    async def rasterize_async(
+        self,
+        dpi: int = 0,
+        rasterizer: BaseRasterizer | None = None,
+        executor: Executor | None = None,
+        image_executor: Executor | None = None,
+    ) -> Image.Image:
+        """Asynchronously rasterize the SVG document to PIL Image.
+
+        Args:
+            executor: Thread-based executor for output preparation and
+                rasterization. If None, uses the event loop's default executor.
+                PlaywrightRasterizer binds its browser to the thread that first
+                uses it, so pass a single-thread executor when using it.
+            image_executor: Thread-based executor for image encoding. If None,
+                uses ``executor``.
+
+        See rasterize() for the other arguments.
+        """
+        if rasterizer is None:
+            rasterizer = ResvgRasterizer(dpi=dpi)
+
+        svg = await self._prepare_svg_for_output_async(
+            executor,
+            image_executor,
+            embed_images=True,
+            embed_fonts=True,
+            subset_fonts=False,
+            font_format="ttf",
+            image_prefix=None,
+            image_format=DEFAULT_IMAGE_FORMAT,
+            optimize=False,
+            svg_filepath=None,
+            use_data_uri_for_fonts=False,
+        )
+        loop = asyncio.get_running_loop()
+        svg_str = await loop.run_in_executor(
+            executor, functools.partial(svg_utils.tostring, svg, indent="")
+        )
+        return await loop.run_in_executor(executor, rasterizer.from_string, svg_str)
+
     def _handle_images(
         self,
         svg: ET.Element,
@@ -436,6 +1132,14 @@ class SVGDocument:
         image_prefix: str | None,
         image_format: str,
         svg_filepath: str | None = None,
+        max_workers: int | None = None,
+        payloads: dict[str, bytes] | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        pack_images: int | None = None,
+        progressive: bool = False,
     ) -> ET.Element:
         """Handle image embedding or saving.
 
@@ -450,13 +1154,68 @@ class SVGDocument:
             image_format: Image format to use when embedding or saving images.
             svg_filepath: Optional path to the SVG file. When provided, image_prefix
                 is interpreted relative to this file's directory.
+            max_workers: Maximum number of threads for image encoding.
+            payloads: Optional mapping to collect streamed image payloads in.
+                See _embed_images_as_data_uris().
+            mask_profile: Optional encoding profile for masks.
+            encode_budget: Optional encode-time budget for image_format="auto".
+            encoder_options: Optional encoder options or preset name.
+            hash_filenames: If True, name image files by content hash.
+            pack_images: Optional size limit for packing images into atlases.
+            progressive: If True, give image files blurred inline placeholders.
 
         Returns:
             The modified SVG element (same object as input).
         """
-        nodes = svg.findall(".//image")
+        nodes = self._collect_image_nodes(svg)
 
-        # Validate that all image nodes have IDs and corresponding images exist
+        # Handle image resources (skip if no images).
+        if len(nodes) == 0:
+            return svg
+
+        if progressive and image_prefix is None:
+            raise ValueError("progressive output requires image_prefix")
+        self._prepare_mask_nodes(nodes, mask_profile)
+        images: Mapping[str, Image.Image | LazyImage] = self.images
+        if pack_images is not None:
+            nodes, atlases = self._pack_images(svg, nodes, pack_images)
+            images = collections.ChainMap(self.images, atlases)
+        image_ids = [node.attrib["id"] for node in nodes]
+        hrefs = self._create_image_hrefs(
+            image_ids,
+            embed_images,
+            image_prefix,
+            image_format,
+            svg_filepath,
+            max_workers,
+            payloads,
+            mask_profile,
+            encode_budget,
+            encoder_options,
+            hash_filenames,
+            images,
+        )
+        placeholders = None
+        if progressive:
+            placeholders = self._create_placeholder_hrefs(
+                image_ids, image_format, max_workers, images
+            )
+        self._apply_image_hrefs(svg, nodes, hrefs, placeholders, images)
+        return svg
+
+    def _collect_image_nodes(self, svg: ET.Element) -> list[ET.Element]:
+        """Find all <image> elements and validate their image resources.
+
+        Args:
+            svg: SVG element to search.
+
+        Returns:
+            List of <image> elements in document order.
+
+        Raises:
+            RuntimeError: If an <image> element has no ID or no matching image.
+        """
+        nodes = svg.findall(".//image")
         for node in nodes:
             image_id = node.get("id")
             if image_id is None:
@@ -468,59 +1227,569 @@ class SVGDocument:
                 raise RuntimeError(
                     f"No image found for <image> element with id='{image_id}'"
                 )
+        return nodes
+
+    def _pack_images(
+        self, svg: ET.Element, nodes: list[ET.Element], max_image_size: int
+    ) -> tuple[list[ET.Element], dict[str, Image.Image | LazyImage]]:
+        """Pack small images into atlases, modifying svg in-place.
+
+        Images of at most max_image_size pixels on either side are packed into
+        one atlas per mode (RGBA or grayscale) with image_utils.pack_atlases(),
+        and each atlas is written once as an <image> in <defs>. Each packed
+        element becomes a <rect> with the same position, size, and attributes,
+        filled with a <pattern> whose viewBox selects its image from the atlas.
+        Unlike a <use> of the atlas, the <rect> has the bounding box of the
+        image, which filters, masks, and gradients in objectBoundingBox units
+        are sized by.
 
-        # Handle image resources (skip if no images).
-        if len(nodes) == 0:
-            return svg
+        Args:
+            svg: SVG element to modify in-place.
+            nodes: <image> elements from _collect_image_nodes().
+            max_image_size: Largest width or height of an image to pack.
+
+        The atlases are returned rather than stored on the document, so that
+        concurrent output calls do not see each other's atlases.
+
+        Returns:
+            The <image> elements to encode, which are the elements that were
+            not packed followed by the atlases, and the atlas images by ID.
+
+        Raises:
+            ValueError: If max_image_size is not between 1 and the atlas size.
+        """
+        if not 1 <= max_image_size <= ATLAS_MAX_SIZE - 2:
+            raise ValueError(
+                f"pack_images must be between 1 and {ATLAS_MAX_SIZE - 2}, "
+                f"got {max_image_size}"
+            )
+        # Drop atlases of images that were removed or replaced.
+        live = {id(image) for image in self.images.values()}
+        for key, (packed_images, _, _) in list(self._atlas_cache.items()):
+            if any(id(image) not in live for image in packed_images):
+                self._atlas_cache.pop(key, None)
+
+        # Group candidates by atlas mode. Packing one image gains nothing.
+        candidates: dict[str, list[ET.Element]] = collections.defaultdict(list)
+        for node in nodes:
+            image = self.images[node.attrib["id"]]
+            mode = {"RGB": "RGBA", "RGBA": "RGBA", "L": "L"}.get(image.mode)
+            if (
+                mode is not None
+                and max(image.size) <= max_image_size
+                and "width" in node.attrib
+                and "height" in node.attrib
+            ):
+                candidates[mode].append(node)
+        groups = {
+            mode: group
+            for mode, group in candidates.items()
+            if len({id(self.images[node.attrib["id"]]) for node in group}) > 1
+        }
+        if not groups:
+            return nodes, {}
+
+        defs = ET.Element("defs")
+        svg.insert(0, defs)
+        existing_ids = {
+            element.attrib["id"] for element in svg.iter() if "id" in element.attrib
+        }
+        existing_ids.update(self.images)
+        packed: set[int] = set()
+        atlas_nodes = []
+        atlas_images: dict[str, Image.Image | LazyImage] = {}
+        for mode, group in groups.items():
+            unique = list(
+                {
+                    id(image): image
+                    for image in (self.images[node.attrib["id"]] for node in group)
+                }.values()
+            )
+            key = (mode, ATLAS_MAX_SIZE, tuple(map(id, unique)))
+            entry = self._atlas_cache.get(key)
+            if entry is None or any(a is not b for a, b in zip(entry[0], unique)):
+                atlases, placements = image_utils.pack_atlases(
+                    [image_utils.load_image(image).convert(mode) for image in unique],
+                    ATLAS_MAX_SIZE,
+                )
+                entry = (unique, atlases, placements)
+                self._atlas_cache[key] = entry
+            _, atlases, placements = entry
+            logger.debug(
+                "Packing %d images into %d %s atlases", len(unique), len(atlases), mode
+            )
+
+            atlas_uris = []
+            for atlas in atlases:
+                atlas_id = svg_utils.unique_id("atlas", existing_ids)
+                existing_ids.add(atlas_id)
+                atlas_images[atlas_id] = atlas
+                atlas_nodes.append(
+                    svg_utils.create_node(
+                        "image",
+                        parent=defs,
+                        id=atlas_id,
+                        width=atlas.width,
+                        height=atlas.height,
+                        preserveAspectRatio="none",
+                    )
+                )
+                atlas_uris.append(svg_utils.get_uri(atlas_nodes[-1]))
+
+            positions = {
+                id(image): placement for image, placement in zip(unique, placements)
+            }
+            sprites: dict[tuple[int, str | None], str] = {}
+            for node in group:
+                image = self.images[node.attrib["id"]]
+                aspect = node.attrib.pop("preserveAspectRatio", None)
+                if (id(image), aspect) not in sprites:
+                    index, left, top = positions[id(image)]
+                    pattern_id = svg_utils.unique_id("sprite", existing_ids)
+                    existing_ids.add(pattern_id)
+                    pattern = svg_utils.create_node(
+                        "pattern",
+                        parent=defs,
+                        id=pattern_id,
+                        width=1,
+                        height=1,
+                        viewBox=svg_utils.seq2str(
+                            [left, top, image.width, image.height], sep=" "
+                        ),
+                    )
+                    if aspect is not None:
+                        pattern.set("preserveAspectRatio", aspect)
+                    svg_utils.create_node("use", parent=pattern, href=atlas_uris[index])
+                    sprites[(id(image), aspect)] = svg_utils.get_funciri(pattern)
+                node.tag = "rect"
+                node.set("fill", sprites[(id(image), aspect)])
+                packed.add(id(node))
+        unpacked = [node for node in nodes if id(node) not in packed]
+        return unpacked + atlas_nodes, atlas_images
+
+    def _create_image_hrefs(
+        self,
+        image_ids: list[str],
+        embed_images: bool,
+        image_prefix: str | None,
+        image_format: str,
+        svg_filepath: str | None,
+        max_workers: int | None = None,
+        payloads: dict[str, bytes] | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
+    ) -> list[str]:
+        """Encode or save images and return the href for each image ID.
+
+        This method does not touch the SVG tree, so it can run concurrently with
+        other output stages.
+
+        Args:
+            image_ids: Image IDs in document order.
+            embed_images: If True, embed images as base64 data URIs.
+            image_prefix: Path prefix for saving images.
+            image_format: Image format to use when embedding or saving images.
+            svg_filepath: Optional path to the SVG file for relative paths.
+            max_workers: Maximum number of threads for image encoding.
+            payloads: Optional mapping to collect streamed image payloads in.
+                See _embed_images_as_data_uris().
+            mask_profile: Optional encoding profile for masks.
+            encode_budget: Optional encode-time budget for image_format="auto".
+            encoder_options: Optional encoder options or preset name.
+            hash_filenames: If True, name image files by content hash.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+
+        Returns:
+            List of href values, one per image ID. Image IDs that share the same
+            image get the same href, and each unique image is encoded once.
+        """
+        # Image IDs with identical pixels share one PIL image (see
+        # Converter.store_image), so deduplicate by identity.
+        images = self.images if images is None else images
+        unique_ids: list[str] = []
+        positions: dict[int, int] = {}
+        indices = []
+        for image_id in image_ids:
+            image = images[image_id]
+            if id(image) not in positions:
+                positions[id(image)] = len(unique_ids)
+                unique_ids.append(image_id)
+            indices.append(positions[id(image)])
 
         # image_prefix takes precedence over embed_images (as documented)
         if image_prefix is not None:
-            self._save_images_to_files(nodes, image_prefix, image_format, svg_filepath)
+            hrefs = self._save_images_to_files(
+                unique_ids,
+                image_prefix,
+                image_format,
+                svg_filepath,
+                max_workers,
+                mask_profile,
+                encode_budget,
+                encoder_options,
+                hash_filenames,
+                images,
+            )
         elif embed_images:
-            self._embed_images_as_data_uris(nodes, image_format)
+            hrefs = self._embed_images_as_data_uris(
+                unique_ids,
+                image_format,
+                max_workers,
+                payloads,
+                mask_profile,
+                encode_budget,
+                encoder_options,
+                images,
+            )
         else:
             raise ValueError(
                 "Either embed_images must be True or image_prefix must be provided "
                 "when the document contains images."
             )
+        return [hrefs[index] for index in indices]
 
-        return svg
-
-    def _embed_images_as_data_uris(
-        self, nodes: list[ET.Element], image_format: str
+    def _apply_image_hrefs(
+        self,
+        svg: ET.Element,
+        nodes: list[ET.Element],
+        hrefs: list[str],
+        placeholders: list[str] | None = None,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
     ) -> None:
-        """Embed images as base64 data URIs in image nodes.
+        """Set href attributes on <image> elements, modifying svg in-place.
+
+        An embedded image used by several elements is written once as a
+        <symbol> in <defs>, and each of those elements becomes a <use> of the
+        symbol with the same position, size, and attributes.
+
+        With placeholders, each element shows its placeholder and keeps its
+        href in data-src instead. The element gets the size of its image if
+        it has none, and stretches the placeholder to it, so that swapping
+        in the full image does not change the layout.
 
         Args:
-            nodes: List of <image> elements to update.
-            image_format: Image format to use for encoding.
+            svg: SVG element to modify in-place.
+            nodes: <image> elements from _collect_image_nodes().
+            hrefs: href values from _create_image_hrefs(), one per node.
+            placeholders: Optional placeholder data URIs from
+                _create_placeholder_hrefs(), one per node.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+        """
+        images = self.images if images is None else images
+        if placeholders is not None:
+            for node, href, placeholder in zip(nodes, hrefs, placeholders):
+                if "width" not in node.attrib or "height" not in node.attrib:
+                    width, height = images[node.attrib["id"]].size
+                    node.set("width", str(width))
+                    node.set("height", str(height))
+                node.attrib.setdefault("preserveAspectRatio", "none")
+                node.set("href", placeholder)
+                node.set("data-src", href)
+            return
+
+        shareable = [
+            "width" in node.attrib
+            and "height" in node.attrib
+            and "preserveAspectRatio" not in node.attrib
+            and href.startswith("data:")
+            for node, href in zip(nodes, hrefs)
+        ]
+        counts = collections.Counter(href for href, ok in zip(hrefs, shareable) if ok)
+
+        symbols: dict[str, str] = {}
+        defs: ET.Element | None = None
+        existing_ids: set[str] = set()
+        for node, href, ok in zip(nodes, hrefs, shareable):
+            if not ok or counts[href] < 2:
+                node.set("href", href)
+                continue
+            if href not in symbols:
+                if defs is None:
+                    defs = ET.Element("defs")
+                    svg.insert(0, defs)
+                    existing_ids = {
+                        element.attrib["id"]
+                        for element in svg.iter()
+                        if "id" in element.attrib
+                    }
+                symbol_id = svg_utils.unique_id("symbol", existing_ids)
+                existing_ids.add(symbol_id)
+                width, height = images[node.attrib["id"]].size
+                symbol = svg_utils.create_node(
+                    "symbol",
+                    parent=defs,
+                    id=symbol_id,
+                    viewBox=svg_utils.seq2str([0, 0, width, height], sep=" "),
+                )
+                svg_utils.create_node(
+                    "image", parent=symbol, width=width, height=height, href=href
+                )
+                symbols[href] = svg_utils.get_uri(symbol)
+            node.tag = "use"
+            node.set("href", symbols[href])
+
+    def _create_placeholder_hrefs(
+        self,
+        image_ids: list[str],
+        image_format: str,
+        max_workers: int | None = None,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
+    ) -> list[str]:
+        """Create a blurred placeholder data URI for each image ID.
+
+        Placeholders are cached per image ID and format like encoded images
+        (see _encode_images()). This method does not touch the SVG tree.
+
+        Args:
+            image_ids: IDs of the images to preview.
+            image_format: Image format of the output. Placeholders use the same
+                format, or WebP for image_format="auto".
+            max_workers: Maximum number of threads for creating placeholders.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+
+        Returns:
+            List of data URIs, one per image ID.
         """
+        image_format = image_format.lower()
+        if image_format == "auto":
+            image_format = "webp"
+        images = self.images if images is None else images
+
+        # Drop entries for images that were removed or replaced.
+        for key, (image, _) in list(self._placeholder_cache.items()):
+            if images.get(key[0]) is not image:
+                self._placeholder_cache.pop(key, None)
+
+        def create(image: Image.Image | LazyImage) -> str:
+            placeholder = image_utils.create_placeholder(
+                image_utils.load_image(image), PLACEHOLDER_SIZE
+            )
+            return image_utils.encode_data_uri(placeholder, image_format)
+
+        uris: dict[int, str] = {}
+        for image_id in image_ids:
+            entry = self._placeholder_cache.get((image_id, image_format))
+            if entry is not None:
+                uris[id(entry[0])] = entry[1]
+
+        missing = list(
+            {
+                id(image): image
+                for image in (images[image_id] for image_id in image_ids)
+                if id(image) not in uris
+            }.values()
+        )
+        results = image_utils.map_parallel(create, missing, max_workers)
+        uris.update(zip(map(id, missing), results))
+
+        hrefs = []
+        for image_id in image_ids:
+            image = images[image_id]
+            self._placeholder_cache[(image_id, image_format)] = (image, uris[id(image)])
+            hrefs.append(uris[id(image)])
+        return hrefs
+
+    def _prepare_mask_nodes(
+        self, nodes: list[ET.Element], mask_profile: MaskProfile | None
+    ) -> None:
+        """Let downsampled masks stretch to their <image> element.
+
+        Rounding the downsampled size can change the aspect ratio slightly, so
+        mask elements ignore it instead of leaving unmasked slivers.
+        """
+        if mask_profile is None or mask_profile.scale == 1:
+            return
         for node in nodes:
-            image_id = node.get("id")
-            if image_id is None:
-                raise RuntimeError("<image> element missing required 'id' attribute")
-            if image_id not in self.images:
-                raise RuntimeError(
-                    f"No image found for <image> element with id='{image_id}'"
+            if self.images[node.attrib["id"]].mode == "L":
+                node.set("preserveAspectRatio", "none")
+
+    def _encode_images(
+        self,
+        image_ids: list[str],
+        image_format: str,
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
+    ) -> list[tuple[str, bytes]]:
+        """Encode images by ID, reusing bytes from earlier output calls.
+
+        Encoded bytes are cached per image ID, format, and encoder options, so
+        tostring(), save(),
+        rasterize(), and export() on the same document encode each image once.
+        A cache entry is only reused while the ID still maps to the same image
+        object, so replacing an entry in images invalidates it. Images that are
+        modified in-place must be assigned as new objects.
+        Results of image_format="auto" that may have been cut short by
+        encode_budget are not cached, as they depend on timing.
+
+        Args:
+            image_ids: IDs of the images to encode.
+            image_format: Image format to use for encoding, or "auto" to pick
+                one per image with image_utils.encode_auto().
+            max_workers: Maximum number of threads for image encoding.
+            mask_profile: Optional encoding profile for masks (mode "L"
+                images). If None, masks are encoded in image_format.
+            encode_budget: Time budget in seconds shared by all images encoded
+                with image_format="auto". If None, the budget is unlimited.
+            encoder_options: Encoder options or preset name. If None, uses the
+                Pillow defaults.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+
+        Returns:
+            List of (image format, encoded bytes) tuples, one per image ID.
+        """
+        image_format = image_format.lower()
+        options = image_utils.resolve_encoder_options(encoder_options)
+        images = self.images if images is None else images
+
+        # Drop entries for images that were removed or replaced.
+        for key, (image, _) in list(self._image_data_cache.items()):
+            if images.get(key[0]) is not image:
+                self._image_data_cache.pop(key, None)
+
+        def cache_key(
+            image_id: str,
+        ) -> tuple[str, str, MaskProfile | None, EncoderOptions]:
+            if mask_profile is not None and images[image_id].mode == "L":
+                return (image_id, image_format, mask_profile, options)
+            return (image_id, image_format, None, options)
+
+        deadline = Deadline(encode_budget) if encode_budget is not None else None
+        # Images whose "auto" encoding may have been cut short by the budget.
+        # Their result depends on timing, so it is not cached.
+        truncated: set[int] = set()
+
+        def encode(image: Image.Image | LazyImage) -> tuple[str, bytes]:
+            # Lazy images are decoded here and released once encoded.
+            loaded = image_utils.load_image(image)
+            if mask_profile is not None and loaded.mode == "L":
+                return image_utils.encode_mask(loaded, mask_profile, options)
+            if image_format == "auto":
+                result = image_utils.encode_auto(loaded, deadline, options)
+                if deadline is not None and deadline.expired():
+                    truncated.add(id(image))
+                return result
+            return image_format, image_utils.encode_image(
+                loaded, image_format, **options.pillow_options(image_format)
+            )
+
+        encoded: dict[int, tuple[str, bytes]] = {}
+        for image_id in image_ids:
+            entry = self._image_data_cache.get(cache_key(image_id))
+            if entry is not None:
+                encoded[id(entry[0])] = entry[1]
+
+        missing = list(
+            {
+                id(image): image
+                for image in (images[image_id] for image_id in image_ids)
+                if id(image) not in encoded
+            }.values()
+        )
+        if missing:
+            logger.debug("Encoding %d images as %s", len(missing), image_format)
+        results = image_utils.map_parallel(encode, missing, max_workers)
+        encoded.update(zip(map(id, missing), results))
+
+        data = []
+        for image_id in image_ids:
+            image = images[image_id]
+            if id(image) not in truncated:
+                self._image_data_cache[cache_key(image_id)] = (
+                    image,
+                    encoded[id(image)],
                 )
-            image = self.images[image_id]
-            data_uri = image_utils.encode_data_uri(image, image_format)
-            node.set("href", data_uri)
+            data.append(encoded[id(image)])
+        return data
+
+    def _embed_images_as_data_uris(
+        self,
+        image_ids: list[str],
+        image_format: str,
+        max_workers: int | None = None,
+        payloads: dict[str, bytes] | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
+    ) -> list[str]:
+        """Encode images as base64 data URIs.
+
+        Args:
+            image_ids: IDs of the images to encode.
+            image_format: Image format to use for encoding.
+            max_workers: Maximum number of threads for image encoding.
+            payloads: If provided, each data URI holds a placeholder token in
+                place of the base64 data, and the encoded bytes are stored here
+                by token for svg_utils.write() to stream.
+            mask_profile: Optional encoding profile for masks.
+            encode_budget: Optional encode-time budget for image_format="auto".
+            encoder_options: Optional encoder options or preset name.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+
+        Returns:
+            List of data URIs, one per image.
+        """
+        encoded = self._encode_images(
+            image_ids,
+            image_format,
+            max_workers,
+            mask_profile,
+            encode_budget,
+            encoder_options,
+            images,
+        )
+        if payloads is None:
+            return [
+                image_utils.bytes_to_data_uri(data, format) for format, data in encoded
+            ]
+        hrefs = []
+        for format, data in encoded:
+            token = f"psd2svg-payload-{uuid.uuid4().hex}"
+            payloads[token] = data
+            hrefs.append(f"data:image/{format};base64,{token}")
+        return hrefs
 
     def _save_images_to_files(
         self,
-        nodes: list[ET.Element],
+        image_ids: list[str],
         image_prefix: str,
         image_format: str,
         svg_filepath: str | None,
-    ) -> None:
-        """Save images to files and update image nodes with file paths.
+        max_workers: int | None = None,
+        mask_profile: MaskProfile | None = None,
+        encode_budget: float | None = None,
+        encoder_options: EncoderOptions | str | None = None,
+        hash_filenames: bool = False,
+        images: Mapping[str, Image.Image | LazyImage] | None = None,
+    ) -> list[str]:
+        """Save images to files and return the href for each file.
 
         Args:
-            nodes: List of <image> elements to update.
+            image_ids: IDs of the images to save.
             image_prefix: Path prefix for saving images.
             image_format: Image format to use for saving.
             svg_filepath: Optional path to the SVG file for relative path calculation.
+            max_workers: Maximum number of threads for image encoding.
+            mask_profile: Optional encoding profile for masks.
+            encode_budget: Optional encode-time budget for image_format="auto".
+            encoder_options: Optional encoder options or preset name.
+            hash_filenames: If True, name image files by content hash.
+            images: Images by ID, including the atlases of this output call.
+                Defaults to self.images.
+
+        Returns:
+            List of href values, one per image.
         """
         # Determine base directory and filename prefix
         base_dir, prefix = self._resolve_image_output_paths(image_prefix, svg_filepath)
@@ -528,33 +1797,48 @@ class SVGDocument:
         # Create directory if needed
         if base_dir and not os.path.exists(base_dir):
             logger.debug("Creating directory: %s", base_dir)
-            os.makedirs(base_dir)
+            # Concurrent saves into a shared asset store may race to create it.
+            os.makedirs(base_dir, exist_ok=True)
+
+        # Encode images (with JPEG conversion if needed). Masks may be
+        # encoded in their own format, which sets their file extension.
+        encoded = self._encode_images(
+            image_ids,
+            image_format,
+            max_workers,
+            mask_profile,
+            encode_budget,
+            encoder_options,
+            images,
+        )
 
-        # Save each image and update node href
-        for i, node in enumerate(nodes, start=1):
-            image_id = node.get("id")
-            if image_id is None:
-                raise RuntimeError("<image> element missing required 'id' attribute")
-            if image_id not in self.images:
-                raise RuntimeError(
-                    f"No image found for <image> element with id='{image_id}'"
+        if hash_filenames:
+            filenames = [
+                "{}{}.{}".format(
+                    prefix, hashlib.blake2b(data, digest_size=16).hexdigest(), format
                 )
-
-            image = self.images[image_id]
-            filename = "{}{:02d}.{}".format(prefix, i, image_format.lower())
-            filepath = os.path.join(base_dir, filename)
-
-            # Save image (with JPEG conversion if needed)
-            image_utils.save_image(image, filepath, image_format)
-
-            # Set href: if svg_filepath provided, use relative path; otherwise
-            # use filename
-            if svg_filepath:
-                svg_dir = os.path.dirname(os.path.abspath(svg_filepath))
-                href = os.path.relpath(filepath, svg_dir)
+                for format, data in encoded
+            ]
+        else:
+            # Filenames follow document order regardless of which thread saves them
+            filenames = [
+                "{}{:02d}.{}".format(prefix, i, format)
+                for i, (format, _) in enumerate(encoded, start=1)
+            ]
+        filepaths = [os.path.join(base_dir, filename) for filename in filenames]
+        for filepath, (_, data) in zip(filepaths, encoded):
+            if hash_filenames:
+                _write_asset(filepath, data)
             else:
-                href = filename
-            node.set("href", href)
+                with open(filepath, "wb") as f:
+                    f.write(data)
+
+        # Set href: if svg_filepath provided, use relative path; otherwise
+        # use filename
+        if svg_filepath:
+            svg_dir = os.path.dirname(os.path.abspath(svg_filepath))
+            return [os.path.relpath(filepath, svg_dir) for filepath in filepaths]
+        return filenames
 
     def _resolve_image_output_paths(
         self, image_prefix: str, svg_filepath: str | None
@@ -693,6 +1977,8 @@ class SVGDocument:
         for ps_name in postscript_names:
             # Resolve using static mapping only (no platform queries)
             resolved_font = FontInfo.lookup_static(ps_name)
+            found = resolved_font is not None
+            _record_lookups("font_mapping", int(found), int(not found))
 
             if resolved_font is None:
                 # Font not in static mapping - keep PostScript name
@@ -788,6 +2074,8 @@ class SVGDocument:
                     "Keeping PostScript name in SVG."
                 )
                 resolved_font = None
+            found = resolved_font is not None
+            _record_lookups("font_mapping", int(found), int(not found))
 
             if resolved_font is None:
                 # No resolution - keep PostScript name
@@ -958,6 +2246,22 @@ def convert(
     embed_fonts: bool = False,
     font_format: str = "woff2",
     resource_limits: ResourceLimits | None = None,
+    isolate: bool = False,
+    max_workers: int | None = None,
+    lazy_images: bool = False,
+    low_memory: bool = False,
+    trim_images: bool = False,
+    crop_to_canvas: bool = False,
+    bake_masks: bool = False,
+    max_image_scale: float | None = None,
+    target_width: int | None = None,
+    tile_size: int | None = None,
+    mask_profile: MaskProfile | None = None,
+    encode_budget: float | None = None,
+    encoder_options: EncoderOptions | str | None = None,
+    hash_filenames: bool = False,
+    pack_images: int | None = None,
+    progressive: bool = False,
 ) -> None:
     """Convenience method to convert a PSD file to an SVG file.
 
@@ -982,7 +2286,8 @@ def convert(
             attributes for layer types, effects, and semantic roles (e.g.,
             "shape-layer", "drop-shadow-effect", "fill") for debugging or styling.
         image_format: Image format to use when embedding or saving images.
-            Supported formats: 'webp', 'png', 'jpeg'. Default is 'webp'.
+            Supported formats: 'webp', 'png', 'jpeg', and 'auto' to choose a
+            format per image. Default is 'webp'.
         text_letter_spacing_offset: Global offset (in pixels) to add to all
             letter-spacing values. This can be used to compensate for differences
             between Photoshop's text rendering and SVG's text rendering. Typical
@@ -1009,10 +2314,44 @@ def convert(
             uses ResourceLimits.default() which enables limits (2GB file size,
             3 minute timeout, 100 layer depth, 16K image dimension). Use
             ResourceLimits.unlimited() to disable all limits for trusted input.
+        isolate: If True, build the SVG in a forked worker process with memory
+            and CPU rlimits and a hard wall-clock kill. See SVGDocument.from_psd().
+        max_workers: Maximum number of threads for encoding images. If None
+            (default), uses the number of CPUs. Use 1 to encode serially.
+        lazy_images: If True, decode layer pixels only when saving images to
+            lower peak memory. See SVGDocument.from_psd().
+        low_memory: If True, keep images compressed in memory during the build.
+            See SVGDocument.from_psd().
+        trim_images: If True, crop transparent borders of pixel layers and masks.
+            See SVGDocument.from_psd().
+        crop_to_canvas: If True, crop pixel layers and masks to the canvas and
+            artboards. See SVGDocument.from_psd().
+        bake_masks: If True, multiply layer masks into the alpha of pixel layers.
+            See SVGDocument.from_psd().
+        max_image_scale: Optional scale factor in (0, 1] to downsample images.
+            See SVGDocument.from_psd().
+        target_width: Optional display width in pixels to downsample images
+            for. See SVGDocument.from_psd().
+        tile_size: Optional tile size in pixels to split large images into.
+            See SVGDocument.from_psd().
+        mask_profile: Optional encoding profile for layer masks. See
+            SVGDocument.save().
+        encode_budget: Optional encode-time budget in seconds for
+            image_format='auto'. See SVGDocument.save().
+        encoder_options: Optional encoder options or preset name ('fastest',
+            'balanced', 'smallest'). See SVGDocument.save().
+        hash_filenames: If True, name image files by a hash of their content and
+            skip files that already exist. See SVGDocument.save().
+        pack_images: Optional size limit in pixels for packing small images
+            into atlases. See SVGDocument.save().
+        progressive: If True, embed blurred placeholders for the image files.
+            Requires image_prefix. See SVGDocument.save().
 
     Raises:
         ValueError: If file size, layer depth, or image dimensions exceed limits.
         TimeoutError: If conversion exceeds timeout limit.
+        MemoryError: If an isolated conversion exceeds the memory limit.
+        RuntimeError: If an isolated conversion worker dies unexpectedly.
     """
     # Default to ResourceLimits.default() if not specified
     if resource_limits is None:
@@ -1039,12 +2378,70 @@ def convert(
         text_wrapping_mode=text_wrapping_mode,
         font_mapping=font_mapping,
         resource_limits=resource_limits,
+        isolate=isolate,
+        lazy_images=lazy_images,
+        low_memory=low_memory,
+        trim_images=trim_images,
+        crop_to_canvas=crop_to_canvas,
+        bake_masks=bake_masks,
+        max_image_scale=max_image_scale,
+        target_width=target_width,
+        tile_size=tile_size,
     )
     document.save(
         output_path,
         embed_images=image_prefix is None,
         image_prefix=image_prefix,
         image_format=image_format,
+        mask_profile=mask_profile,
+        encode_budget=encode_budget,
+        encoder_options=encoder_options,
+        hash_filenames=hash_filenames,
+        pack_images=pack_images,
+        progressive=progressive,
         embed_fonts=embed_fonts,
         font_format=font_format,
+        max_workers=max_workers,
     )
+
+
+def cache_stats() -> dict[str, tuple[int, int]]:
+    """Return process-wide (hits, misses) of output lookups.
+
+    - ``font_mapping``: PostScript names resolved to a font family, and names
+      kept as is. Without font embedding only the static font mapping is
+      looked up; with font embedding the custom mapping and the platform
+      (fontconfig or the Windows registry) are queried as well.
+
+    Returns:
+        Mapping from lookup name to cumulative (hits, misses) in this process.
+    """
+    with _CACHE_STATS_LOCK:
+        return {name: (hits, misses) for name, (hits, misses) in _CACHE_STATS.items()}
+
+
+def _record_lookups(name: str, hits: int, misses: int = 0) -> None:
+    """Add lookup counts to cache_stats()."""
+    with _CACHE_STATS_LOCK:
+        _CACHE_STATS[name][0] += hits
+        _CACHE_STATS[name][1] += misses
+
+
+def _write_asset(filepath: str, data: bytes) -> None:
+    """Write a content-addressed file unless it already exists.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent writers and readers never see a partial file.
+    """
+    if os.path.exists(filepath):
+        logger.debug("Skipping existing image file: %s", filepath)
+        return
+    temp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "xb") as f:
+            f.write(data)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -1,11 +1,13 @@
+import base64
 import copy
 import html
+import io
 import logging
 import re
 import unicodedata
 import xml.etree.ElementTree as ET
 from re import Pattern
-from typing import Any, Optional, Sequence
+from typing import Any, Callable, MutableMapping, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +20,15 @@ ILLEGAL_XML_RE: Pattern[str] = re.compile(
 
 DEFAULT_NUMBER_DIGITS = 2
 
+# Bytes per base64 chunk in write(); a multiple of 3 so chunks concatenate.
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+# Prefixes ElementTree gives the namespaces found in generated trees.
+_NAMESPACE_PREFIXES = {
+    "http://www.w3.org/XML/1998/namespace": "xml",
+    XHTML_NAMESPACE: "html",
+}
+
 
 def safe_utf8(text: str) -> str:
     """Remove illegal and problematic XML characters from text.
@@ -270,135 +281,202 @@ def fromstring(data: str) -> ET.Element:
     return ET.fromstring(data)
 
 
-def _fix_xhtml_namespace_prefixes(svg_string: str) -> str:
-    """Remove namespace prefixes from XHTML elements in foreignObject.
-
-    ElementTree serializes XHTML namespaced elements with prefixes like
-    'html:div', 'html:p', 'html:span'. Browsers require unprefixed elements
-    with xmlns declaration for proper CSS styling.
-
-    Transforms:
-        <foreignObject xmlns:html="..."><html:div>...</html:div></foreignObject>
-
-    Into:
-        <foreignObject><div xmlns="http://www.w3.org/1999/xhtml">...</div></foreignObject>
-
-    Args:
-        svg_string: Serialized SVG string from ElementTree.
+def tostring(node: ET.Element, indent: str = "  ") -> str:
+    """Convert an XML node to a string."""
+    buffer = io.StringIO()
+    write(node, buffer, indent=indent)
+    return buffer.getvalue()
 
-    Returns:
-        SVG string with XHTML namespace prefixes removed.
 
-    Note:
-        - Handles multiple foreignObject elements
-        - Works with any namespace prefix (html, ns0, ns1, etc.)
-        - Only modifies XHTML elements (div, p, span)
-        - Adds xmlns declaration to first XHTML element in each foreignObject
-    """
-    # XHTML namespace URL - escaped for use in regex patterns
-    xhtml_ns_escaped = re.escape(XHTML_NAMESPACE)
-
-    # Pattern to match XHTML namespace declarations with any prefix
-    ns_decl_pattern = f' xmlns:([a-zA-Z0-9]+)="{xhtml_ns_escaped}"'
-
-    # Find all prefixes used for XHTML namespace
-    matches = re.findall(ns_decl_pattern, svg_string)
-    if not matches:
-        # No XHTML namespace found, return unchanged
-        return svg_string
-
-    result = svg_string
-
-    # Process each prefix (usually just one, but handle multiple)
-    for prefix in set(matches):  # Use set to avoid duplicates
-        # Remove the namespace declaration
-        result = re.sub(
-            f' xmlns:{re.escape(prefix)}="{xhtml_ns_escaped}"',
-            "",
-            result,
-        )
+def parse(file: Any) -> ET.Element:
+    """Parse an XML file to an Element."""
+    tree = ET.parse(file)
+    if tree is None or tree.getroot() is None:
+        raise ValueError("Failed to parse XML file.")
+    return tree.getroot()
 
-        # Replace prefixed tags with unprefixed versions
-        # Opening tags: <prefix:tag> or <prefix:tag attr="...">
-        result = re.sub(
-            f"<{re.escape(prefix)}:(div|p|span)",
-            r"<\1",
-            result,
-        )
-        # Closing tags: </prefix:tag>
-        result = re.sub(
-            f"</{re.escape(prefix)}:(div|p|span)>",
-            r"</\1>",
-            result,
-        )
 
-    # Add xmlns attribute to first XHTML element after each foreignObject
-    # Use negative lookahead to ensure we stay within foreignObject boundaries
-    def add_xmlns_to_first_element(match: re.Match[str]) -> str:
-        """Add xmlns declaration to first XHTML element."""
-        # Everything up to and including <foreignObject...> and content before tag
-        foreign_obj_part = match.group(1)
-        tag_name = match.group(2)  # div, p, or span
-        # All attributes and spaces before the closing >
-        existing_attrs = match.group(3)
-        end_bracket = match.group(4)  # The closing >
-
-        # Check if xmlns already exists anywhere in the tag (idempotency)
-        if f'xmlns="{XHTML_NAMESPACE}"' in existing_attrs:
-            return match.group(0)
-
-        xmlns_attr = f'xmlns="{XHTML_NAMESPACE}"'
-
-        # Add xmlns as the first attribute, preserving existing attributes
-        if existing_attrs.strip() == "":
-            # No attributes: <tag>
-            new_attrs = f" {xmlns_attr}"
-        else:
-            # Has attributes: <tag attr="...">
-            new_attrs = f" {xmlns_attr}{existing_attrs}"
-
-        return f"{foreign_obj_part}<{tag_name}{new_attrs}{end_bracket}"
-
-    # Apply xmlns addition to first XHTML element in each foreignObject
-    # Use negative lookahead (?!</foreignObject) to stay within boundaries
-    result = re.sub(
-        r"(<foreignObject[^>]*>(?:(?!</foreignObject).)*?)<(div|p|span)([^>]*)(>)",
-        add_xmlns_to_first_element,
-        result,
-        flags=re.DOTALL,
-    )
+def write(
+    node: ET.Element,
+    file: Any,
+    indent: str = "  ",
+    payloads: MutableMapping[str, bytes] | None = None,
+) -> None:
+    """Write an XML node to a text file.
 
-    return result
+    The tree is serialized element by element as it is walked and is left
+    unmodified, so it can be shared with other documents or written
+    concurrently. Indentation is computed on the fly, whitespace-only text in
+    SVG text elements is dropped, and XHTML elements in foreignObject are
+    written unprefixed with an xmlns declaration, as browsers require for CSS
+    styling.
 
+    Large binary payloads such as embedded images can be kept out of the tree:
+    put a placeholder token in an attribute value and pass the bytes in
+    payloads. When the attribute is reached, the token is replaced by the
+    base64 encoding of its bytes, written in chunks, and the entry is removed
+    from payloads so the bytes can be freed before the rest is written.
 
-def tostring(node: ET.Element, indent: str = "  ") -> str:
-    """Convert an XML node to a string."""
-    ET.indent(node, space=indent)
-    _strip_text_element_whitespace(node)
-    svg_string = ET.tostring(node, encoding="unicode", xml_declaration=False)
+    Args:
+        node: Root element to write.
+        file: Text stream to write to.
+        indent: Indentation string for pretty-printing.
+        payloads: Mapping from placeholder tokens to the bytes to write in their
+            place as base64. Each token must appear once and must not need XML
+            escaping. Written entries are removed from the mapping.
+    """
+    _StreamingSerializer(file.write, indent, payloads).serialize(node)
 
-    # Fix XHTML namespace prefixes in foreignObject elements
-    # ElementTree adds prefixes (html:div), but browsers need unprefixed elements
-    # with xmlns declaration for proper CSS styling
-    svg_string = _fix_xhtml_namespace_prefixes(svg_string)
 
-    return svg_string
+class _StreamingSerializer:
+    """Write an element tree piece by piece without modifying it.
 
+    The output matches ET.indent(), _strip_text_element_whitespace() and
+    ET.tostring() applied in turn, except that XHTML elements are unprefixed.
+    """
 
-def parse(file: Any) -> ET.Element:
-    """Parse an XML file to an Element."""
-    tree = ET.parse(file)
-    if tree is None or tree.getroot() is None:
-        raise ValueError("Failed to parse XML file.")
-    return tree.getroot()
+    def __init__(
+        self,
+        write: Callable[[str], Any],
+        indent: str,
+        payloads: MutableMapping[str, bytes] | None,
+    ) -> None:
+        self._write = write
+        self._indent = indent
+        self._indentations = ["\n"]
+        self._payloads = payloads
+        self._pattern = (
+            re.compile("|".join(map(re.escape, payloads))) if payloads else None
+        )
+        self._qnames: dict[str, str] = {}
+        self._namespaces: dict[str, str] = {}
+
+    def serialize(self, node: ET.Element) -> None:
+        """Write the node, its descendants and its tail."""
+        for element in node.iter():
+            if isinstance(element.tag, str):
+                self._add_qname(element.tag)
+            for key in element.keys():
+                self._add_qname(key)
+        # XHTML elements are written unprefixed, so the prefix is not declared.
+        declarations = {
+            uri: prefix
+            for uri, prefix in self._namespaces.items()
+            if uri != XHTML_NAMESPACE
+        }
+        self._serialize_element(node, 0, declarations, False)
+        if node.tail:
+            self._write(_escape_text(node.tail))
+
+    def _add_qname(self, qname: str) -> None:
+        """Assign a prefixed name to a tag or attribute key like ElementTree."""
+        if qname in self._qnames:
+            return
+        if qname[:1] != "{":
+            self._qnames[qname] = qname
+            return
+        uri, local_name = qname[1:].rsplit("}", 1)
+        prefix = self._namespaces.get(uri)
+        if prefix is None:
+            prefix = _NAMESPACE_PREFIXES.get(uri, f"ns{len(self._namespaces)}")
+            if prefix != "xml":
+                self._namespaces[uri] = prefix
+        self._qnames[qname] = f"{prefix}:{local_name}"
+
+    def _indentation(self, level: int) -> str:
+        """Return the whitespace that precedes an element at the given level."""
+        while len(self._indentations) <= level:
+            self._indentations.append(self._indentations[-1] + self._indent)
+        return self._indentations[level]
+
+    def _serialize_element(
+        self,
+        element: ET.Element,
+        level: int,
+        declarations: dict[str, str],
+        in_xhtml: bool,
+    ) -> None:
+        """Write an element and its descendants, without its tail."""
+        write = self._write
+        tag = element.tag
+        if tag is ET.Comment:
+            write(f"<!--{element.text}-->")
+            return
+        if tag is ET.ProcessingInstruction:
+            write(f"<?{element.text}?>")
+            return
 
+        local_name = tag.rsplit("}", 1)[-1]
+        is_xhtml = tag.startswith(f"{{{XHTML_NAMESPACE}}}")
+        is_text_element = local_name in ("text", "tspan", "textPath")
+        name = local_name if is_xhtml else self._qnames[tag]
+
+        write(f"<{name}")
+        for uri, prefix in sorted(declarations.items(), key=lambda item: item[1]):
+            write(f' xmlns:{prefix}="{_escape_attribute(uri)}"')
+        if is_xhtml and not in_xhtml and "xmlns" not in element.attrib:
+            write(f' xmlns="{XHTML_NAMESPACE}"')
+        for key, value in element.items():
+            write(f' {self._qnames[key]}="')
+            self._write_attribute_value(_escape_attribute(value))
+            write('"')
+
+        text = element.text
+        if len(element) and (not text or not text.strip()):
+            text = None if is_text_element else self._indentation(level + 1)
+        if not text and not len(element):
+            write(" />")
+            return
 
-def write(node: ET.Element, file: Any, indent: str = "  ") -> None:
-    """Write an XML node to a file."""
-    tree = ET.ElementTree(node)
-    ET.indent(tree, space=indent)
-    _strip_text_element_whitespace(node)
-    tree.write(file, encoding="unicode", xml_declaration=False)
+        write(">")
+        if text:
+            write(_escape_text(text))
+        last_index = len(element) - 1
+        for index, child in enumerate(element):
+            self._serialize_element(child, level + 1, {}, is_xhtml)
+            tail = child.tail
+            if not tail or not tail.strip():
+                if is_text_element:
+                    tail = None
+                else:
+                    tail = self._indentation(
+                        level if index == last_index else level + 1
+                    )
+            if tail:
+                write(_escape_text(tail))
+        write(f"</{name}>")
+
+    def _write_attribute_value(self, value: str) -> None:
+        """Write an escaped attribute value, streaming any payloads in it."""
+        if self._pattern is None or self._payloads is None:
+            self._write(value)
+            return
+        position = 0
+        for match in self._pattern.finditer(value):
+            self._write(value[position : match.start()])
+            data = self._payloads.pop(match.group())
+            for start in range(0, len(data), BASE64_CHUNK_SIZE):
+                chunk = data[start : start + BASE64_CHUNK_SIZE]
+                self._write(base64.b64encode(chunk).decode("ascii"))
+            del data
+            position = match.end()
+        self._write(value[position:])
+
+
+def _escape_text(text: str) -> str:
+    """Escape character data like ElementTree."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attribute(value: str) -> str:
+    """Escape an attribute value like ElementTree."""
+    return (
+        _escape_text(value)
+        .replace('"', "&quot;")
+        .replace("\r", "&#13;")
+        .replace("\n", "&#10;")
+        .replace("\t", "&#09;")
+    )
 
 
 def add_style(node: ET.Element, key: str, value: Any) -> None:
@@ -520,6 +598,20 @@ def get_funciri(node: ET.Element) -> str:
     return f"url({get_uri(node)})"
 
 
+def unique_id(base: str, existing: set[str]) -> str:
+    """Get an ID based on the base name that is not in the existing set.
+
+    IDs follow the same ``base``, ``base_2``, ``base_3``, ... scheme as the
+    converter's AutoCounter.
+    """
+    if base not in existing:
+        return base
+    index = 2
+    while f"{base}_{index}" in existing:
+        index += 1
+    return f"{base}_{index}"
+
+
 def wrap_element(
     node: ET.Element, parent: ET.Element, wrapper: ET.Element
 ) -> ET.Element:
@@ -933,6 +1025,68 @@ def merge_singleton_children(element: ET.Element) -> None:
         element.remove(child)
 
 
+def copy_subtrees(
+    root: ET.Element, predicate: Callable[[ET.Element], bool]
+) -> ET.Element:
+    """Copy the subtrees that match a predicate, sharing the rest of the tree.
+
+    Every element for which predicate() is true is deep-copied with its
+    subtree, and the root and the ancestors of those elements get new shallow
+    copies with their own attributes. All other subtrees are shared with the
+    original tree, so the copy is cheap when only a few elements match.
+
+    Only the copied elements may be modified. Attributes of a shared element,
+    or its list of children, must not be changed, or the change shows up in
+    both trees. Serializing with tostring() or write() leaves the tree as is.
+
+    Args:
+        root: Root element to copy.
+        predicate: Returns True for elements whose subtree is modified.
+
+    Returns:
+        The copied root element.
+
+    Example:
+        >>> svg = fromstring('<svg><g><image/></g><g><rect/></g></svg>')
+        >>> copied = copy_subtrees(svg, lambda node: node.tag == "image")
+        >>> copied[1] is svg[1]
+        True
+    """
+    if predicate(root):
+        return copy.deepcopy(root)
+
+    parents = {
+        child: (parent, index)
+        for parent in root.iter()
+        for index, child in enumerate(parent)
+    }
+    copies = {root: _shallow_copy(root)}
+    for node in root.iter():
+        if node is root or not predicate(node):
+            continue
+        # Walk up to the nearest copied ancestor; skip if it was deep-copied.
+        path = [node]
+        while path[-1] not in copies:
+            path.append(parents[path[-1]][0])
+        if predicate(path[-1]):
+            continue
+        for child in reversed(path[:-1]):
+            parent, index = parents[child]
+            new_child = copy.deepcopy(child) if child is node else _shallow_copy(child)
+            copies[parent][index] = new_child
+            copies[child] = new_child
+    return copies[root]
+
+
+def _shallow_copy(node: ET.Element) -> ET.Element:
+    """Copy an element with its own attributes, sharing its children."""
+    new_node = node.makeelement(node.tag, node.attrib.copy())
+    new_node.text = node.text
+    new_node.tail = node.tail
+    new_node.extend(node)
+    return new_node
+
+
 def consolidate_defs(svg: ET.Element) -> None:
     """Consolidate all <defs> and definition elements into a global <defs>.
 
@@ -1156,11 +1310,11 @@ def _update_url_references(
     svg: ET.Element,
     id_mapping: dict[str, str],
 ) -> None:
-    """Update all url(#id) references using id mapping.
+    """Update all url(#id) and href="#id" references using id mapping.
 
     Searches the SVG tree for elements with URL reference attributes
-    (fill, stroke, filter, clip-path, mask, marker-*) and updates
-    any url(#id) references according to the provided mapping.
+    (fill, stroke, filter, clip-path, mask, marker-*) and href attributes, and
+    updates any references according to the provided mapping.
 
     Note:
         The converter only creates URL references in direct attributes,
@@ -1210,8 +1364,17 @@ def _update_url_references(
                 if new_value != value:
                     element.set(attr, new_value)
 
+    # href="#id" references, e.g. <use> and <pattern> inheritance
+    for element in svg.findall(".//*[@href]"):
+        value = element.get("href", "")
+        if value.startswith("#"):
+            new_id = id_mapping.get(value[1:])
+            if new_id is not None and new_id != value[1:]:
+                element.set("href", f"#{new_id}")
+                updated_count += 1
+
     if updated_count > 0:
-        logger.debug(f"Updated {updated_count} url(#id) references")
+        logger.debug(f"Updated {updated_count} url(#id) and href references")
 
 
 def deduplicate_definitions(svg: ET.Element) -> None:
@@ -1,12 +1,87 @@
 """Timeout utilities for resource-limited operations."""
 
+import math
 import signal
 import threading
+import time
+from concurrent.futures import CancelledError
 from typing import Any, Callable, TypeVar
 
 T = TypeVar("T")
 
 
+def _timeout_message(timeout_seconds: float) -> str:
+    """Format the error message for a conversion timeout."""
+    suggested = math.ceil(timeout_seconds * 2)
+    return (
+        f"PSD conversion timed out after {timeout_seconds:g} seconds. "
+        f"File may be complex. "
+        f"To process: set PSD2SVG_TIMEOUT={suggested} environment variable, "
+        f"or use ResourceLimits(timeout={suggested}) in Python API."
+    )
+
+
+class Deadline:
+    """Cooperative, thread-safe deadline for long-running operations.
+
+    Unlike :func:`with_timeout`, a deadline does not rely on signals, so it works
+    in any thread, including ``ThreadPoolExecutor`` workers and asyncio executor
+    threads. The running operation must call :meth:`check` at safe points; the
+    converter does so at layer boundaries, effect application, and image decoding.
+
+    Example:
+        >>> deadline = Deadline(30)
+        >>> for layer in layers:
+        ...     deadline.check()  # Raises TimeoutError once 30 seconds passed
+        ...     process(layer)
+
+    A deadline can also be cancelled from another thread with :meth:`cancel`,
+    which makes the next :meth:`check` raise ``CancelledError``. The asyncio API
+    uses this to stop a conversion when the awaiting task is cancelled.
+
+    Args:
+        timeout_seconds: Time budget in seconds. If 0 or negative, the deadline
+            never expires.
+    """
+
+    def __init__(self, timeout_seconds: float) -> None:
+        self.timeout_seconds = timeout_seconds
+        self._expires_at = (
+            time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+        )
+        self._cancelled = False
+
+    def remaining(self) -> float | None:
+        """Return the remaining time in seconds, or None if unlimited."""
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Check whether the deadline has passed."""
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+    def cancel(self) -> None:
+        """Request cancellation of the operation checking this deadline."""
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        """Check whether cancellation was requested."""
+        return self._cancelled
+
+    def check(self) -> None:
+        """Raise an error if the deadline has passed or was cancelled.
+
+        Raises:
+            CancelledError: If cancel() was called.
+            TimeoutError: If the time budget is exhausted.
+        """
+        if self._cancelled:
+            raise CancelledError("PSD conversion was cancelled.")
+        if self.expired():
+            raise TimeoutError(_timeout_message(self.timeout_seconds))
+
+
 def with_timeout(
     func: Callable[..., T], timeout_seconds: int, *args: Any, **kwargs: Any
 ) -> T:
@@ -28,6 +103,8 @@ def with_timeout(
     Note:
         - On Unix/macOS: Uses signal.SIGALRM for reliable timeout
         - On Windows: Uses threading (may not interrupt native C code)
+        - SIGALRM only works in the main thread. Use :class:`Deadline` for
+          operations that may run in worker threads.
     """
     if timeout_seconds <= 0:
         return func(*args, **kwargs)
@@ -36,12 +113,7 @@ def with_timeout(
     if hasattr(signal, "SIGALRM"):
 
         def timeout_handler(signum: int, frame: Any) -> None:
-            raise TimeoutError(
-                f"PSD conversion timed out after {timeout_seconds} seconds. "
-                f"File may be complex. "
-                f"To process: set PSD2SVG_TIMEOUT={timeout_seconds * 2} environment variable, "  # noqa: E501
-                f"or use ResourceLimits(timeout={timeout_seconds * 2}) in Python API."
-            )
+            raise TimeoutError(_timeout_message(timeout_seconds))
 
         old_handler = signal.signal(signal.SIGALRM, timeout_handler)
         signal.alarm(timeout_seconds)
@@ -66,12 +138,7 @@ def with_timeout(
         thread.join(timeout=timeout_seconds)
 
         if thread.is_alive():
-            raise TimeoutError(
-                f"PSD conversion timed out after {timeout_seconds} seconds. "
-                f"File may be complex. "
-                f"To process: set PSD2SVG_TIMEOUT={timeout_seconds * 2} environment variable, "  # noqa: E501
-                f"or use ResourceLimits(timeout={timeout_seconds * 2}) in Python API."
-            )
+            raise TimeoutError(_timeout_message(timeout_seconds))
         if exception[0]:
             raise exception[0]
         # After successful thread completion, result[0] contains the return value
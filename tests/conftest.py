@@ -1,9 +1,12 @@
 import logging
 import os
 
+import numpy as np
 import pytest
 
+from psd2svg import SVGDocument
 from psd2svg.core.font_utils import FontInfo
+from psd2svg.rasterizer import ResvgRasterizer
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,17 @@ def get_fixture(name: str) -> str:
     return os.path.join(os.path.dirname(__file__), "fixtures", name)
 
 
+def render(source: SVGDocument | str, image_format: str = "png") -> np.ndarray:
+    """Rasterize a document or SVG string with resvg into an integer array.
+
+    Documents are serialized with the given image format first. The integer
+    dtype allows subtracting renderings to compare them.
+    """
+    if isinstance(source, SVGDocument):
+        source = source.tostring(image_format=image_format)
+    return np.asarray(ResvgRasterizer().from_string(source), dtype=int)
+
+
 def has_font(family: str) -> bool:
     """Check if a font family is available on the system.
 
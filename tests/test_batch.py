@@ -0,0 +1,261 @@
+"""Tests for batch conversion.
+
+This module tests the batch mode of the command line tool:
+- Input expansion from files, directories, globs, and manifests
+- Output directory templates and per-document image prefixes
+- Per-file error reporting with serial and parallel workers, including
+  unmatched patterns and colliding outputs
+"""
+
+import io
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from psd2svg.__main__ import main
+from psd2svg.batch import (
+    BatchItem,
+    collect_inputs,
+    convert_batch,
+    resolve_image_prefix,
+    resolve_output_path,
+)
+from tests.conftest import get_fixture
+
+
+@pytest.fixture
+def input_dir(tmp_path: Path) -> Path:
+    """Create a directory tree with valid and corrupted PSD files."""
+    root = tmp_path / "inputs"
+    (root / "sub").mkdir(parents=True)
+    shutil.copy(get_fixture("layer-types/pixel-layer.psd"), root / "a.psd")
+    shutil.copy(get_fixture("layer-types/group.psd"), root / "sub" / "b.psd")
+    (root / "sub" / "notes.txt").write_text("not a psd")
+    return root
+
+
+class TestCollectInputs:
+    """Tests for collect_inputs()."""
+
+    def test_directory_is_searched_recursively(self, input_dir: Path) -> None:
+        """Test directories yield PSD files in sorted order."""
+        items = collect_inputs([str(input_dir)])
+        assert [os.path.basename(item.input_path) for item in items] == [
+            "a.psd",
+            "b.psd",
+        ]
+        assert all(item.root == str(input_dir) for item in items)
+
+    def test_glob_pattern(self, input_dir: Path) -> None:
+        """Test glob patterns are expanded relative to their literal root."""
+        items = collect_inputs([str(input_dir / "**" / "*.psd")])
+        assert len(items) == 2
+        assert items[0].root == str(input_dir)
+
+    def test_manifest_from_stream(self, input_dir: Path) -> None:
+        """Test '-' reads paths from the manifest, skipping blanks and comments."""
+        manifest = io.StringIO(f"# comment\n\n{input_dir / 'a.psd'}\n")
+        items = collect_inputs(["-"], manifest=manifest)
+        assert [item.input_path for item in items] == [str(input_dir / "a.psd")]
+
+    def test_duplicates_are_removed(self, input_dir: Path) -> None:
+        """Test the same file given twice is converted once."""
+        path = str(input_dir / "a.psd")
+        assert len(collect_inputs([path, str(input_dir)])) == 2
+
+    def test_unmatched_pattern_is_an_error_item(
+        self, input_dir: Path, tmp_path: Path
+    ) -> None:
+        """Test a pattern without matches is kept as an item with an error."""
+        pattern = str(tmp_path / "*.missing")
+        items = collect_inputs([pattern, str(input_dir)])
+        assert [item.error is None for item in items] == [False, True, True]
+        assert items[0].input_path == pattern
+        assert "No input files match" in str(items[0].error)
+
+
+class TestResolveOutputPath:
+    """Tests for resolve_output_path()."""
+
+    def test_relparent_mirrors_tree(self) -> None:
+        """Test {relparent} reproduces the input subdirectory."""
+        item = BatchItem(input_path="in/sub/b.psd", root="in")
+        assert resolve_output_path(item, "out/{relparent}") == os.path.join(
+            "out", "sub", "b.svg"
+        )
+
+    def test_relparent_empty_for_root(self) -> None:
+        """Test {relparent} is empty for files at the root."""
+        item = BatchItem(input_path="in/a.psd", root="in")
+        assert resolve_output_path(item, "out/{relparent}") == os.path.join(
+            "out", "a.svg"
+        )
+
+    def test_parent_writes_next_to_input(self) -> None:
+        """Test {parent} resolves to the input directory."""
+        item = BatchItem(input_path="in/a.psd", root="in")
+        assert resolve_output_path(item, "{parent}") == os.path.join("in", "a.svg")
+
+
+class TestResolveImagePrefix:
+    """Tests for resolve_image_prefix()."""
+
+    item = BatchItem(input_path="in/a.psd", root="in")
+
+    @pytest.mark.parametrize(
+        "image_prefix, expected",
+        [
+            ("images/", "images/a_"),
+            ("images/img", "images/img_a_"),
+            ("images/{stem}/", "images/a/"),
+            (".", "a_"),
+        ],
+    )
+    def test_prefix_is_unique_per_document(
+        self, image_prefix: str, expected: str
+    ) -> None:
+        """Test the input stem makes the prefix unique per document."""
+        assert resolve_image_prefix(self.item, image_prefix) == expected
+
+    def test_hash_filenames_share_prefix(self) -> None:
+        """Test content-hash filenames keep the shared prefix."""
+        assert resolve_image_prefix(self.item, "assets/", True) == "assets/"
+
+
+class TestConvertBatch:
+    """Tests for convert_batch()."""
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_failure_does_not_abort_batch(
+        self, input_dir: Path, tmp_path: Path, jobs: int
+    ) -> None:
+        """Test a corrupted file is reported while the others convert."""
+        (input_dir / "bad.psd").write_bytes(b"8BPS corrupted")
+        items = collect_inputs([str(input_dir)])
+        output_dir = str(tmp_path / "out" / "{relparent}")
+
+        results = list(convert_batch(items, output_dir, jobs=jobs))
+
+        assert [os.path.basename(r.input_path) for r in results] == [
+            "a.psd",
+            "bad.psd",
+            "b.psd",
+        ]
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[1].error is not None
+        assert os.path.exists(tmp_path / "out" / "a.svg")
+        assert os.path.exists(tmp_path / "out" / "sub" / "b.svg")
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_unmatched_pattern_does_not_abort_batch(
+        self, input_dir: Path, tmp_path: Path, jobs: int
+    ) -> None:
+        """Test a pattern without matches is reported while the others convert."""
+        items = collect_inputs([str(tmp_path / "*.missing"), str(input_dir)])
+        results = list(convert_batch(items, str(tmp_path / "out"), jobs=jobs))
+        assert [r.ok for r in results] == [False, True, True]
+        assert "No input files match" in str(results[0].error)
+
+    def test_colliding_outputs_are_reported(
+        self, input_dir: Path, tmp_path: Path
+    ) -> None:
+        """Test inputs with the same name do not overwrite each other."""
+        shutil.copy(input_dir / "sub" / "b.psd", input_dir / "b.psd")
+        items = collect_inputs([str(input_dir)])
+        results = list(convert_batch(items, str(tmp_path / "out")))
+
+        assert [os.path.basename(r.input_path) for r in results] == [
+            "a.psd",
+            "b.psd",
+            "b.psd",
+        ]
+        assert [r.ok for r in results] == [True, True, False]
+        assert results[2].error == (
+            f"Output collides with that of {input_dir / 'b.psd'}"
+        )
+        assert results[2].output_path == results[1].output_path
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_image_files_are_per_document(
+        self, input_dir: Path, tmp_path: Path, jobs: int
+    ) -> None:
+        """Test documents in one directory do not share image filenames."""
+        shutil.copy(get_fixture("layer-types/pixel-layer.psd"), input_dir / "c.psd")
+        items = collect_inputs([str(input_dir)])
+        output_dir = tmp_path / "out"
+        results = list(
+            convert_batch(items, str(output_dir), jobs=jobs, image_prefix="images/")
+        )
+        assert all(r.ok for r in results)
+
+        for stem in ("a", "c"):
+            svg = (output_dir / f"{stem}.svg").read_text()
+            hrefs = re.findall(r'href="(images/[^"]+)"', svg)
+            assert hrefs
+            assert all(href.startswith(f"images/{stem}_") for href in hrefs)
+            assert all((output_dir / href).exists() for href in hrefs)
+
+
+class TestBatchCLI:
+    """Tests for the batch mode of the command line tool."""
+
+    def test_cli_batch_mode(
+        self, input_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test --output-dir converts all inputs and exits with status 0."""
+        argv = [
+            "psd2svg",
+            str(input_dir),
+            "--output-dir",
+            str(tmp_path / "out"),
+            "--jobs",
+            "2",
+        ]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 0
+        assert capsys.readouterr().out.count("OK ") == 2
+        assert os.path.exists(tmp_path / "out" / "a.svg")
+        assert os.path.exists(tmp_path / "out" / "b.svg")
+
+    def test_cli_batch_mode_reports_failures(
+        self, input_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test failed files are reported and the exit status is 1."""
+        (input_dir / "bad.psd").write_bytes(b"8BPS corrupted")
+        argv = ["psd2svg", str(input_dir), "--output-dir", str(tmp_path / "out")]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 1
+        assert "FAILED" in capsys.readouterr().err
+
+    def test_cli_batch_mode_reports_unmatched_patterns(
+        self, input_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test a pattern without matches fails alone and sets the exit status."""
+        pattern = str(tmp_path / "*.missing")
+        argv = [
+            "psd2svg",
+            pattern,
+            str(input_dir),
+            "--output-dir",
+            str(tmp_path / "out"),
+        ]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 1
+        captured = capsys.readouterr()
+        assert f"FAILED {pattern}" in captured.err
+        assert captured.out.count("OK ") == 2
+
+    def test_cli_multiple_inputs_require_output_dir(self) -> None:
+        """Test more than two positional paths without --output-dir is an error."""
+        argv = ["psd2svg", "a.psd", "b.psd", "c.psd"]
+        with patch.object(sys, "argv", argv), pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 2
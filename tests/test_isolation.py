@@ -0,0 +1,86 @@
+"""Tests for isolated conversion in forked worker processes.
+
+This module tests:
+- Result transfer from the worker to the parent
+- Exception propagation
+- Wall-clock timeout kill, memory limit, and worker crash handling
+- Isolated SVGDocument.from_psd() and convert()
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from psd_tools import PSDImage
+
+from psd2svg import ResourceLimits, SVGDocument, convert
+from psd2svg.isolation import is_isolation_supported, run_isolated
+from tests.conftest import get_fixture
+
+pytestmark = pytest.mark.skipif(
+    not is_isolation_supported(), reason="Isolation requires fork and rlimits"
+)
+
+
+class TestRunIsolated:
+    """Tests for run_isolated()."""
+
+    def test_returns_result(self) -> None:
+        """Test the return value is transferred back to the parent."""
+        values = [1, 2, 3]
+        result = run_isolated(lambda: sum(values), ResourceLimits.unlimited())
+        assert result == 6
+
+    def test_runs_in_child_process(self) -> None:
+        """Test the function runs in a different process."""
+        assert run_isolated(os.getpid, ResourceLimits.unlimited()) != os.getpid()
+
+    def test_propagates_exception(self) -> None:
+        """Test exceptions raised in the worker are re-raised in the parent."""
+
+        def failing() -> None:
+            raise ValueError("Test error")
+
+        with pytest.raises(ValueError, match="Test error"):
+            run_isolated(failing, ResourceLimits.unlimited())
+
+    def test_wall_clock_timeout_kills_worker(self) -> None:
+        """Test a worker exceeding the timeout is killed."""
+        start = time.monotonic()
+        with pytest.raises(TimeoutError, match="PSD conversion timed out"):
+            run_isolated(lambda: time.sleep(10), ResourceLimits(timeout=1))
+        assert time.monotonic() - start < 5
+
+    def test_memory_limit(self) -> None:
+        """Test allocations beyond max_memory fail in the worker only."""
+        limits = ResourceLimits(max_memory=512 * 1024 * 1024)
+
+        def allocate() -> int:
+            return len(bytearray(1024 * 1024 * 1024))
+
+        with pytest.raises(MemoryError):
+            run_isolated(allocate, limits)
+
+    def test_worker_crash(self) -> None:
+        """Test a worker that exits without a result raises RuntimeError."""
+        with pytest.raises(RuntimeError, match="worker died: exit code 3"):
+            run_isolated(lambda: os._exit(3), ResourceLimits.unlimited())
+
+
+class TestIsolatedConversion:
+    """Tests for isolate=True in the public API."""
+
+    def test_from_psd_isolated(self) -> None:
+        """Test from_psd(isolate=True) matches in-process conversion."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        expected = SVGDocument.from_psd(psdimage)
+        document = SVGDocument.from_psd(psdimage, isolate=True)
+        assert document.tostring() == expected.tostring()
+        assert document.images.keys() == expected.images.keys()
+
+    def test_convert_isolated(self, tmp_path: Path) -> None:
+        """Test convert(isolate=True) writes the output file."""
+        output_path = str(tmp_path / "output.svg")
+        convert(get_fixture("layer-types/pixel-layer.psd"), output_path, isolate=True)
+        assert os.path.exists(output_path)
@@ -548,6 +548,30 @@ class TestDeduplicateDefinitions:
         assert rect.get("fill") == "url(#p1)"
         assert path.get("fill") == "url(#p1)"
 
+    def test_deduplicate_updates_href_references(self) -> None:
+        """Test patterns inheriting from a duplicate via href are updated."""
+        svg_str = """
+        <svg xmlns="http://www.w3.org/2000/svg">
+            <defs>
+                <pattern id="p1" width="10" height="10">
+                    <circle cx="5" cy="5" r="3"/>
+                </pattern>
+                <pattern id="p2" width="10" height="10">
+                    <circle cx="5" cy="5" r="3"/>
+                </pattern>
+                <pattern id="p3" href="#p2" patternTransform="scale(2)"/>
+            </defs>
+            <rect fill="url(#p3)"/>
+        </svg>
+        """
+        svg = ET.fromstring(svg_str)
+        svg_utils.deduplicate_definitions(svg)
+
+        defs = svg[0]
+        assert [child.get("id") for child in defs] == ["p1", "p3"]
+        assert defs[1].get("href") == "#p1"
+        assert svg[1].get("fill") == "url(#p3)"
+
     def test_deduplicate_clippath_marker_symbol(self) -> None:
         """Test merging less common types (clipPath, marker, symbol)."""
         svg_str = """
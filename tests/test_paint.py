@@ -5,13 +5,16 @@ from unittest.mock import Mock
 from xml.etree import ElementTree as ET
 
 import pytest
+from psd_tools import PSDImage
 from psd_tools.api.layers import Layer
 from psd_tools.constants import Tag
 from psd_tools.psd import descriptor
 from psd_tools.psd.tagged_blocks import ListElement, TaggedBlocks
 from psd_tools.terminology import Key, Unit
 
+from psd2svg.core.converter import Converter
 from psd2svg.core.paint import PaintConverter
+from tests.conftest import get_fixture
 
 
 class TestPatternTransform:
@@ -85,3 +88,23 @@ class TestPatternTransform:
         assert (
             node.attrib["patternTransform"] == "translate(0,12) scale(0.5) rotate(-45)"
         )
+
+
+class TestPatternCache:
+    """Test pattern definitions are shared by pattern ID."""
+
+    def test_pattern_is_decoded_once(self) -> None:
+        """Test repeated uses of a pattern share one base <pattern>."""
+        psdimage = PSDImage.open(get_fixture("effects/pattern-overlay-1.psd"))
+        converter = Converter(psdimage)
+        layer = next(layer for layer in psdimage.descendants() if layer.has_effects())
+        pattern = next(layer.effects.find("patternoverlay", enabled=True)).pattern
+
+        first = converter.add_pattern(psdimage, pattern)
+        second = converter.add_pattern(psdimage, pattern)
+
+        assert len(converter.pattern_cache) == 1
+        base = next(iter(converter.pattern_cache.values()))
+        assert first.get("href") == second.get("href") == f"#{base.get('id')}"
+        assert first.get("id") != second.get("id")
+        assert len(converter.images) == 1
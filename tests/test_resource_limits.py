@@ -12,6 +12,7 @@ import os
 import signal
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
@@ -71,6 +72,11 @@ class TestResourceLimitsDefaults:
         assert ResourceLimits(max_layer_depth=100).is_layer_depth_limited()
         assert not ResourceLimits(max_layer_depth=0).is_layer_depth_limited()
 
+    def test_is_memory_limited(self) -> None:
+        """Test is_memory_limited() is disabled by default."""
+        assert not ResourceLimits.default().is_memory_limited()
+        assert ResourceLimits(max_memory=1024).is_memory_limited()
+
     def test_is_image_dimension_limited(self) -> None:
         """Test is_image_dimension_limited() check."""
         assert ResourceLimits(max_image_dimension=8192).is_image_dimension_limited()
@@ -318,6 +324,30 @@ class TestTimeoutProtection:
         document = SVGDocument.from_psd(psdimage, resource_limits=limits)
         assert document is not None
 
+    def test_from_psd_with_timeout_in_worker_thread(self) -> None:
+        """Test SVGDocument.from_psd() with a timeout works outside the main thread."""
+        input_path = get_fixture("layer-types/group.psd")
+        limits = ResourceLimits(timeout=30)
+
+        def worker() -> SVGDocument:
+            return SVGDocument.from_psd(
+                PSDImage.open(input_path), resource_limits=limits
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            documents = [f.result() for f in [executor.submit(worker) for _ in "ab"]]
+        assert all(document is not None for document in documents)
+
+    def test_from_psd_raises_when_deadline_expires(self) -> None:
+        """Test SVGDocument.from_psd() raises TimeoutError at a layer boundary."""
+        input_path = get_fixture("layer-types/group.psd")
+        psdimage = PSDImage.open(input_path)
+        limits = ResourceLimits(timeout=30)
+
+        with patch("psd2svg.timeout_utils.Deadline.expired", return_value=True):
+            with pytest.raises(TimeoutError, match="PSD conversion timed out"):
+                SVGDocument.from_psd(psdimage, resource_limits=limits)
+
     def test_convert_with_timeout_enabled(self, tmp_path: Path) -> None:
         """Test convert() applies timeout when enabled."""
         input_path = get_fixture("layer-types/pixel-layer.psd")
@@ -1095,6 +1125,13 @@ class TestFromCLIArgs:
             # Should log 4 warnings
             assert mock_logger.warning.call_count == 4
 
+    def test_from_cli_args_max_memory(self) -> None:
+        """Test from_cli_args() sets max_memory and detects conflicts."""
+        limits = ResourceLimits.from_cli_args(max_memory=1024)
+        assert limits.max_memory == 1024
+        with pytest.raises(ValueError, match="--max-memory"):
+            ResourceLimits.from_cli_args(max_memory=1024, unlimited=True)
+
     def test_from_cli_args_unlimited_conflicts_with_max_file_size(self) -> None:
         """Test from_cli_args() raises ValueError when unlimited conflicts."""
         with pytest.raises(ValueError, match="--unlimited-resources conflicts with"):
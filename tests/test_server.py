@@ -0,0 +1,234 @@
+"""Tests for the local conversion server.
+
+This module tests the HTTP conversion server:
+- Query parameter mapping to conversion options and resource limits
+- Conversion, zip output, and rasterization endpoints
+- Error responses and the metrics endpoint
+"""
+
+import io
+import json
+import os
+import signal
+import threading
+import urllib.error
+import urllib.request
+import zipfile
+from typing import Iterator
+
+import pytest
+from PIL import Image
+
+from psd2svg.core.typesetting import TextWrappingMode
+from psd2svg.resource_limits import ResourceLimits
+from psd2svg.server import (
+    ConversionServer,
+    Histogram,
+    parse_conversion_options,
+    parse_resource_limits,
+)
+from tests.conftest import get_fixture
+
+
+@pytest.fixture(scope="module")
+def server_url() -> Iterator[str]:
+    """Run a conversion server with one worker on a free port."""
+    server = ConversionServer(
+        ("127.0.0.1", 0),
+        workers=1,
+        resource_limits=ResourceLimits(max_file_size=10 * 1024 * 1024, timeout=60),
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _post(url: str, data: bytes) -> tuple[int, str, bytes]:
+    request = urllib.request.Request(url, data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.headers["Content-Type"], response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers["Content-Type"], e.read()
+
+
+def _fixture_bytes(name: str) -> bytes:
+    with open(get_fixture(name), "rb") as f:
+        return f.read()
+
+
+class TestParseQuery:
+    """Tests for query parameter parsing."""
+
+    def test_limits_default_to_server_limits(self) -> None:
+        """Test missing parameters keep the server's limits."""
+        server_limits = ResourceLimits(timeout=60)
+        assert parse_resource_limits({}, server_limits) == server_limits
+
+    def test_limits_can_be_lowered(self) -> None:
+        """Test a request may tighten a limit."""
+        limits = parse_resource_limits(
+            {"timeout": "5", "max_layer_depth": "10"}, ResourceLimits(timeout=60)
+        )
+        assert limits.timeout == 5
+        assert limits.max_layer_depth == 10
+
+    @pytest.mark.parametrize("value", ["120", "0", "-1", "abc"])
+    def test_limits_cannot_be_raised_or_disabled(self, value: str) -> None:
+        """Test a request cannot raise, disable, or garble a limit."""
+        with pytest.raises(ValueError):
+            parse_resource_limits({"timeout": value}, ResourceLimits(timeout=60))
+
+    def test_conversion_options(self) -> None:
+        """Test options are split between from_psd() and output arguments."""
+        options, output_options = parse_conversion_options(
+            {
+                "enable_text": "false",
+                "embed_fonts": "1",
+                "image_format": "png",
+                "encoder_preset": "fastest",
+                "pack_images": "64",
+                "text_wrapping_mode": "foreignobject",
+                "text_letter_spacing_offset": "-0.01",
+            }
+        )
+        assert options == {
+            "enable_text": False,
+            "text_wrapping_mode": TextWrappingMode.FOREIGN_OBJECT,
+            "text_letter_spacing_offset": -0.01,
+        }
+        assert output_options == {
+            "embed_fonts": True,
+            "image_format": "png",
+            "encoder_options": "fastest",
+            "pack_images": 64,
+        }
+
+    def test_invalid_choice_raises(self) -> None:
+        """Test an unknown image format is rejected."""
+        with pytest.raises(ValueError, match="Invalid image_format"):
+            parse_conversion_options({"image_format": "gif"})
+        with pytest.raises(ValueError, match="Invalid pack_images"):
+            parse_conversion_options({"pack_images": "large"})
+
+
+class TestHistogram:
+    """Tests for the latency histogram."""
+
+    def test_buckets_are_cumulative(self) -> None:
+        """Test each observation counts toward every bucket above it."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+        assert histogram.counts == [1, 2]
+        assert histogram.count == 3
+        assert histogram.sum == pytest.approx(5.55)
+
+
+class TestConversionServer:
+    """Tests for the HTTP endpoints."""
+
+    def test_convert_returns_svg(self, server_url: str) -> None:
+        """Test /convert returns an SVG document."""
+        status, content_type, body = _post(
+            f"{server_url}/convert?image_format=png",
+            _fixture_bytes("layer-types/pixel-layer.psd"),
+        )
+        assert status == 200
+        assert content_type == "image/svg+xml"
+        assert body.startswith(b"<svg")
+        assert b"data:image/png;base64," in body
+
+    def test_convert_returns_zip(self, server_url: str) -> None:
+        """Test output=zip returns the SVG with external images."""
+        status, content_type, body = _post(
+            f"{server_url}/convert?output=zip",
+            _fixture_bytes("layer-types/pixel-layer.psd"),
+        )
+        assert status == 200
+        assert content_type == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            names = archive.namelist()
+            svg = archive.read("output.svg").decode("utf-8")
+        images = [name for name in names if name.startswith("images/")]
+        assert len(images) == 1
+        assert f'href="{images[0]}"' in svg
+
+    def test_rasterize_returns_png(self, server_url: str) -> None:
+        """Test /rasterize returns a PNG image."""
+        status, content_type, body = _post(
+            f"{server_url}/rasterize", _fixture_bytes("layer-types/pixel-layer.psd")
+        )
+        assert status == 200
+        assert content_type == "image/png"
+        assert Image.open(io.BytesIO(body)).format == "PNG"
+
+    def test_invalid_query_returns_400(self, server_url: str) -> None:
+        """Test a limit above the server's limit is rejected."""
+        status, _, body = _post(f"{server_url}/convert?timeout=3600", b"")
+        assert status == 400
+        assert "exceeds the server limit" in json.loads(body)["error"]
+
+    def test_file_too_large_returns_413(self, server_url: str) -> None:
+        """Test the request body is checked against max_file_size."""
+        status, _, _ = _post(f"{server_url}/convert?max_file_size=4", b"8BPS....")
+        assert status == 413
+
+    def test_conversion_error_is_reported(self, server_url: str) -> None:
+        """Test a corrupted file returns an error response."""
+        status, content_type, body = _post(f"{server_url}/convert", b"8BPS corrupted")
+        assert status >= 400
+        assert content_type == "application/json"
+        assert json.loads(body)["error"]
+
+    def test_metrics(self, server_url: str) -> None:
+        """Test /metrics reports queue depth, stage latencies, and cache hits."""
+        _post(f"{server_url}/convert", _fixture_bytes("layer-types/pixel-layer.psd"))
+        with urllib.request.urlopen(f"{server_url}/metrics", timeout=60) as response:
+            text = response.read().decode("utf-8")
+        assert "psd2svg_workers 1" in text
+        assert "psd2svg_queue_depth 0" in text
+        assert 'psd2svg_stage_seconds_count{stage="build"}' in text
+        assert 'psd2svg_stage_seconds_count{stage="queue"}' in text
+        assert 'psd2svg_requests_total{endpoint="convert",status="200"}' in text
+        assert 'psd2svg_cache_hit_ratio{cache="font_mapping"}' in text
+        # Per-request documents never reuse encoded images, so it is not exported.
+        assert 'cache="encoded_images"' not in text
+
+    def test_unknown_path_returns_404(self, server_url: str) -> None:
+        """Test unknown paths return 404."""
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            urllib.request.urlopen(f"{server_url}/unknown", timeout=60)
+        assert exc_info.value.code == 404
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="Requires SIGKILL")
+class TestWorkerRestart:
+    """Tests for replacing the worker pool after a worker dies."""
+
+    def test_restarted_pool_serves_requests(self) -> None:
+        """Test a pool re-created from a handler thread converts again."""
+        server = ConversionServer(("127.0.0.1", 0), workers=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        url = f"http://{host}:{port}/convert"
+        data = _fixture_bytes("layer-types/pixel-layer.psd")
+        try:
+            broken = server.executor
+            os.kill(broken.submit(os.getpid).result(), signal.SIGKILL)
+            status, _, _ = _post(url, data)
+            assert status >= 500
+            assert server.executor is not broken
+            status, content_type, _ = _post(url, data)
+            assert status == 200
+            assert content_type == "image/svg+xml"
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -5,23 +5,38 @@ This module tests various SVGDocument methods including:
 - Image handling (embedding vs file saving)
 - String and file serialization (tostring, save)
 - Rasterization with different backends
+- Asyncio API and cancellation
 """
 
+import asyncio
+import copy
+import hashlib
+import io
 import os
+import pickle
 import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 from PIL import Image
 from psd_tools import PSDImage
+from psd_tools.api.layers import PixelLayer
 
-from psd2svg import SVGDocument
+from psd2svg import EncoderOptions, SVGDocument, image_utils, svg_utils
+from psd2svg.core.converter import Converter
 from psd2svg.core.font_utils import FontInfo, create_file_url, encode_font_data_uri
 from psd2svg.core.text import TextWrappingMode
 from psd2svg.rasterizer import PlaywrightRasterizer, ResvgRasterizer
-from tests.conftest import get_fixture, requires_playwright
+from psd2svg.svg_document import cache_stats
+from psd2svg.timeout_utils import Deadline
+from tests.conftest import get_fixture, render, requires_playwright
 
 
 class TestEncodeFontDataUri:
@@ -256,6 +271,1410 @@ class TestSVGDocumentImageHandling:
         assert result1 == result2
 
 
+class TestParallelImageEncoding:
+    """Tests for encoding images in a thread pool."""
+
+    @staticmethod
+    def _make_document(count: int) -> SVGDocument:
+        svg_elem = ET.Element("svg")
+        images = {}
+        for i in range(count):
+            image_id = f"image{i}"
+            ET.SubElement(svg_elem, "image", id=image_id)
+            images[image_id] = Image.new("RGBA", (8 + i, 8), (i * 20, 0, 0, 255))
+        return SVGDocument(svg=svg_elem, images=images)
+
+    def test_tostring_is_identical_across_max_workers(self) -> None:
+        """Test embedded output does not depend on the number of threads."""
+        document = self._make_document(8)
+        serial = document.tostring(max_workers=1)
+        assert document.tostring(max_workers=4) == serial
+        assert document.tostring() == serial
+
+    def test_save_is_identical_across_max_workers(self, tmp_path: Path) -> None:
+        """Test saved files keep their names and content with threads."""
+        document = self._make_document(8)
+        outputs = {}
+        for max_workers in (1, 4):
+            directory = tmp_path / str(max_workers)
+            directory.mkdir()
+            document.save(
+                str(directory / "output.svg"),
+                embed_images=False,
+                image_prefix="images/img",
+                image_format="png",
+                max_workers=max_workers,
+            )
+            outputs[max_workers] = {
+                path.relative_to(directory).as_posix(): path.read_bytes()
+                for path in sorted(directory.rglob("*"))
+                if path.is_file()
+            }
+        assert outputs[1] == outputs[4]
+        assert "images/img08.png" in outputs[4]
+
+    def test_invalid_max_workers_raises(self) -> None:
+        """Test max_workers must be at least 1."""
+        document = self._make_document(2)
+        with pytest.raises(ValueError, match="max_workers"):
+            document.tostring(max_workers=0)
+
+
+class TestImageDeduplication:
+    """Tests for sharing identical images between <image> elements."""
+
+    @staticmethod
+    def _make_document(share: bool = True, **attrib: str) -> SVGDocument:
+        svg_elem = ET.Element(
+            "svg",
+            xmlns="http://www.w3.org/2000/svg",
+            width="40",
+            height="20",
+            viewBox="0 0 40 20",
+        )
+        for id_, x, y in (("a", "0", "0"), ("b", "20", "5")):
+            ET.SubElement(
+                svg_elem, "image", id=id_, x=x, y=y, width="10", height="10", **attrib
+            )
+        ET.SubElement(svg_elem, "image", id="c", x="0", y="10", width="4", height="4")
+        red = Image.new("RGBA", (10, 10), (255, 0, 0, 255))
+        return SVGDocument(
+            svg=svg_elem,
+            images={
+                "a": red,
+                "b": red if share else Image.new("RGBA", (10, 10), (0, 255, 0, 255)),
+                "c": Image.new("RGBA", (4, 4), (0, 0, 255, 255)),
+            },
+        )
+
+    def test_store_image_shares_identical_pixels(self) -> None:
+        """Test the converter stores identical images once."""
+        converter = Converter(PSDImage.new("RGB", (4, 4)))
+        converter.store_image("a", Image.new("RGBA", (4, 4), (1, 2, 3, 255)))
+        converter.store_image("b", Image.new("RGBA", (4, 4), (1, 2, 3, 255)))
+        converter.store_image("c", Image.new("L", (4, 4), 1))
+        assert converter.images["a"] is converter.images["b"]
+        assert converter.images["c"] is not converter.images["a"]
+        assert len(converter.image_store) == 2
+
+    def test_embedded_duplicates_use_shared_symbol(self) -> None:
+        """Test shared images are embedded once and referenced with <use>."""
+        result = self._make_document().tostring()
+        svg = ET.fromstring(result)
+
+        assert result.count("data:image/") == 2
+        symbols = svg.findall(".//{http://www.w3.org/2000/svg}symbol")
+        assert len(symbols) == 1
+        uses = svg.findall(".//{http://www.w3.org/2000/svg}use")
+        assert [use.get("id") for use in uses] == ["a", "b"]
+        assert all(use.get("href") == f"#{symbols[0].get('id')}" for use in uses)
+        assert uses[1].get("x") == "20"
+
+    def test_distinct_images_are_unchanged(self) -> None:
+        """Test images without duplicates keep plain <image> elements."""
+        result = self._make_document(share=False).tostring()
+        assert result.count("data:image/") == 3
+        assert "<use" not in result
+        assert "<symbol" not in result
+
+    def test_image_prefix_writes_one_file_per_image(self, tmp_path: Path) -> None:
+        """Test shared images are saved to a single file."""
+        output_file = tmp_path / "output.svg"
+        self._make_document().save(
+            str(output_file), embed_images=False, image_prefix="img"
+        )
+        assert sorted(path.name for path in tmp_path.glob("img*")) == [
+            "img01.webp",
+            "img02.webp",
+        ]
+        content = output_file.read_text()
+        assert content.count('href="img01.webp"') == 2
+
+    def test_shared_symbol_renders_identically(self) -> None:
+        """Test <use> of a shared symbol rasterizes like separate images."""
+        shared = self._make_document().rasterize()
+        # preserveAspectRatio (here the default value) opts elements out of sharing.
+        separate = self._make_document(preserveAspectRatio="xMidYMid meet").rasterize()
+        assert (
+            "<use"
+            not in self._make_document(preserveAspectRatio="xMidYMid meet").tostring()
+        )
+        assert shared.tobytes() == separate.tobytes()
+
+    def test_export_and_load_preserve_sharing(self) -> None:
+        """Test exported duplicates are encoded once and shared after load."""
+        exported = self._make_document().export(image_format="png")
+        images = exported["images"]
+        assert isinstance(images, dict)
+        assert images["a"] is images["b"]
+
+        loaded = SVGDocument.load(str(exported["svg"]), images)
+        assert loaded.images["a"] is loaded.images["b"]
+
+
+class TestHashFilenames:
+    """Tests for naming external image files by content hash."""
+
+    @staticmethod
+    def _make_document(color: tuple[int, int, int, int]) -> SVGDocument:
+        svg_elem = ET.Element(
+            "svg",
+            xmlns="http://www.w3.org/2000/svg",
+            width="20",
+            height="10",
+            viewBox="0 0 20 10",
+        )
+        for id_, x in (("a", "0"), ("b", "10")):
+            ET.SubElement(svg_elem, "image", id=id_, x=x, width="10", height="10")
+        return SVGDocument(
+            svg=svg_elem,
+            images={
+                "a": Image.new("RGBA", (10, 10), (255, 0, 0, 255)),
+                "b": Image.new("RGBA", (10, 10), color),
+            },
+        )
+
+    def test_files_are_named_by_content(self, tmp_path: Path) -> None:
+        """Test each file is named by the hash of its bytes and referenced."""
+        output_file = tmp_path / "output.svg"
+        self._make_document((0, 255, 0, 255)).save(
+            str(output_file), image_prefix="assets/", hash_filenames=True
+        )
+        files = sorted((tmp_path / "assets").iterdir())
+        assert len(files) == 2
+        content = output_file.read_text()
+        for path in files:
+            digest = hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+            assert path.name == f"{digest}.webp"
+            assert f'href="assets/{path.name}"' in content
+
+    def test_documents_share_the_asset_store(self, tmp_path: Path) -> None:
+        """Test files already in the store are reused instead of rewritten."""
+        self._make_document((0, 255, 0, 255)).save(
+            str(tmp_path / "first.svg"), image_prefix="assets/", hash_filenames=True
+        )
+        existing = sorted((tmp_path / "assets").iterdir())
+        for path in existing:
+            os.utime(path, ns=(0, 0))
+
+        self._make_document((0, 0, 255, 255)).save(
+            str(tmp_path / "second.svg"), image_prefix="assets/", hash_filenames=True
+        )
+        files = sorted((tmp_path / "assets").iterdir())
+        assert len(files) == 3
+        assert [path.stat().st_mtime_ns for path in existing] == [0, 0]
+        first = (tmp_path / "first.svg").read_text()
+        second = (tmp_path / "second.svg").read_text()
+        shared = [path.name for path in existing if path.name in second]
+        assert len(shared) == 1
+        assert shared[0] in first
+
+    def test_equal_output_for_equal_content(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test hrefs do not depend on image IDs or document order."""
+        monkeypatch.chdir(tmp_path)
+        document = self._make_document((255, 0, 0, 255))
+        document.images["b"] = document.images["b"].copy()
+        result = document.tostring(image_prefix="assets/", hash_filenames=True)
+        hrefs = [node.get("href") for node in ET.fromstring(result).iter()]
+        hrefs = [href for href in hrefs if href]
+        assert len(hrefs) == 2
+        assert hrefs[0] == hrefs[1]
+        assert len(list((tmp_path / "assets").iterdir())) == 1
+
+
+class TestPackImages:
+    """Tests for packing small images into atlases."""
+
+    @staticmethod
+    def _icons_psd(count: int = 6) -> PSDImage:
+        """Create a canvas with small masked icons of different sizes."""
+        psdimage = PSDImage.new("RGB", (200, 100))
+        for index in range(count):
+            size = (8 + 3 * index, 20 - 2 * index)
+            icon = Image.effect_noise(size, 60).convert("RGBA")
+            icon.putalpha(Image.linear_gradient("L").resize(size))
+            psdimage.append(
+                PixelLayer.frompil(icon, psdimage, top=10 * index, left=30 * index)
+            )
+        return psdimage
+
+    def test_pack_atlases(self) -> None:
+        """Test images are placed without overlap with repeated edges."""
+        images = [
+            Image.new("RGBA", (10, 4), (255, 0, 0, 255)),
+            Image.new("RGBA", (3, 9), (0, 255, 0, 128)),
+            Image.new("RGBA", (30, 6), (0, 0, 255, 255)),
+        ]
+        atlases, placements = image_utils.pack_atlases(images, max_size=32)
+        assert [atlas.size for atlas in atlases] == [(32, 25)]
+        for image, (index, left, top) in zip(images, placements):
+            box = (left, top, left + image.width, top + image.height)
+            assert atlases[index].crop(box).tobytes() == image.tobytes()
+            padded = (left - 1, top - 1, box[2] + 1, box[3] + 1)
+            colors = atlases[index].crop(padded).getcolors()
+            assert colors is not None
+            assert [color for _, color in colors] == [image.getpixel((0, 0))]
+        with pytest.raises(ValueError):
+            image_utils.pack_atlases([Image.new("L", (32, 1))], max_size=32)
+
+    def test_small_images_are_packed(self) -> None:
+        """Test icons and masks render identically from one atlas per mode."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        regular = document.tostring(image_format="png")
+        packed = document.tostring(image_format="png", pack_images=32)
+
+        assert regular.count("data:image/") == 12
+        assert packed.count("data:image/") == 2
+        svg = ET.fromstring(packed)
+        namespace = "{http://www.w3.org/2000/svg}"
+        assert len(svg.findall(f".//{namespace}pattern")) == 12
+        assert len(svg.findall(f".//{namespace}image")) == 2
+        assert np.array_equal(render(packed), render(regular))
+
+    @pytest.mark.parametrize(
+        ("fixture", "pack_images"),
+        [
+            ("clipping/pixel-with-clip-stroke-effect.psd", 64),
+            ("clipping/shape-with-clip-stroke-effect.psd", 64),
+            ("effects/gradient-overlay-2.psd", 200),
+            ("effects/multiple-overlays-1-no-color.psd", 200),
+            ("effects/outer-glow-1.psd", 200),
+            ("effects/stroke-1-raster-gradient.psd", 200),
+            ("effects/stroke-1-raster-pattern.psd", 200),
+        ],
+    )
+    def test_packed_effect_targets(self, fixture: str, pack_images: int) -> None:
+        """Test effects sized by a packed image's bounding box render the same."""
+        document = SVGDocument.from_psd(PSDImage.open(get_fixture(fixture)))
+        regular = document.tostring(image_format="png")
+        packed = document.tostring(image_format="png", pack_images=pack_images)
+        assert packed != regular
+        assert np.array_equal(render(packed), render(regular))
+
+    def test_large_images_are_not_packed(self) -> None:
+        """Test images larger than the limit keep their own <image>."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        packed = document.tostring(image_format="png", pack_images=18)
+        assert packed.count("data:image/") == 2 + 6
+        assert document.tostring(image_format="png", pack_images=1) == (
+            document.tostring(image_format="png")
+        )
+
+    def test_image_prefix_writes_atlases(self, tmp_path: Path) -> None:
+        """Test only the atlases are written as external files."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        output_file = tmp_path / "output.svg"
+        document.save(str(output_file), image_prefix="img", pack_images=32)
+        assert sorted(path.name for path in tmp_path.glob("img*")) == [
+            "img01.webp",
+            "img02.webp",
+        ]
+
+    def test_repeated_output_reuses_atlases(self) -> None:
+        """Test atlases are packed and encoded once across output calls."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        with (
+            patch.object(
+                image_utils, "pack_atlases", wraps=image_utils.pack_atlases
+            ) as pack,
+            patch.object(
+                image_utils, "encode_image", wraps=image_utils.encode_image
+            ) as encode,
+        ):
+            first = document.tostring(pack_images=32)
+            second = document.tostring(pack_images=32)
+        assert first == second
+        assert pack.call_count == 2
+        assert encode.call_count == 2
+        assert set(document.images) == {
+            node.attrib["id"] for node in document.svg.iter("image")
+        }
+
+    def test_concurrent_output(self) -> None:
+        """Test output calls with and without atlases do not share atlases."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        sizes = [1, 32] * 50
+        expected = {size: document.tostring(pack_images=size) for size in (1, 32)}
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(
+                executor.map(lambda size: document.tostring(pack_images=size), sizes)
+            )
+        assert results == [expected[size] for size in sizes]
+
+    def test_replaced_images_release_atlases(self) -> None:
+        """Test cached atlases are dropped once their images are replaced."""
+        document = SVGDocument.from_psd(self._icons_psd())
+        document.tostring(pack_images=32)
+        assert len(document._atlas_cache) == 2
+        for image_id, image in list(document.images.items()):
+            document.images[image_id] = image.copy()
+        document.tostring(pack_images=32)
+        assert len(document._atlas_cache) == 2
+        live = {id(image) for image in document.images.values()}
+        for packed_images, _, _ in document._atlas_cache.values():
+            assert all(id(image) in live for image in packed_images)
+
+    @pytest.mark.parametrize("pack_images", [0, 2047])
+    def test_invalid_limit(self, pack_images: int) -> None:
+        """Test limits outside the atlas size are rejected."""
+        document = SVGDocument.from_psd(self._icons_psd(2))
+        with pytest.raises(ValueError):
+            document.tostring(pack_images=pack_images)
+
+
+class TestProgressiveImages:
+    """Tests for blurred placeholders in front of external image files."""
+
+    @staticmethod
+    def _make_document() -> SVGDocument:
+        svg_elem = ET.Element(
+            "svg",
+            xmlns="http://www.w3.org/2000/svg",
+            width="300",
+            height="100",
+            viewBox="0 0 300 100",
+        )
+        ET.SubElement(svg_elem, "image", id="a", width="200", height="100")
+        ET.SubElement(svg_elem, "image", id="b", x="200")
+        gradient = np.tile(np.arange(200, dtype=np.uint8), (100, 1))
+        return SVGDocument(
+            svg=svg_elem,
+            images={
+                "a": Image.fromarray(np.dstack([gradient] * 3), "RGB"),
+                "b": Image.new("RGBA", (100, 100), (0, 0, 255, 128)),
+            },
+        )
+
+    def test_create_placeholder(self) -> None:
+        """Test placeholders fit the size and blur without darkening edges."""
+        image = Image.new("RGBA", (400, 200), (255, 0, 0, 0))
+        image.paste((0, 0, 255, 255), (100, 50, 300, 150))
+        placeholder = image_utils.create_placeholder(image, size=16)
+        assert placeholder.size == (16, 8)
+        assert placeholder.mode == "RGBA"
+        red, green, blue, alpha = placeholder.getpixel((3, 4))
+        assert 0 < alpha < 255
+        assert (red, green, blue) == (0, 0, 255)
+
+    def test_placeholders_reference_files(self, tmp_path: Path) -> None:
+        """Test images show inline placeholders and keep files in data-src."""
+        output_file = tmp_path / "output.svg"
+        self._make_document().save(
+            str(output_file), image_prefix="images/", progressive=True
+        )
+        svg = ET.parse(output_file).getroot()
+        nodes = svg.findall(".//{http://www.w3.org/2000/svg}image")
+        assert len(nodes) == 2
+        for node, size in zip(nodes, [(16, 8), (16, 16)]):
+            assert node.get("data-src") in ("images/01.webp", "images/02.webp")
+            assert (tmp_path / node.attrib["data-src"]).exists()
+            placeholder = image_utils.decode_data_uri(node.attrib["href"])
+            assert placeholder.size == size
+            assert node.get("preserveAspectRatio") == "none"
+        # The element without a size gets the size of its image.
+        assert (nodes[1].get("width"), nodes[1].get("height")) == ("100", "100")
+
+    def test_swapped_images_match_regular_output(self, tmp_path: Path) -> None:
+        """Test data-src holds the hrefs of the regular output."""
+        document = self._make_document()
+        document.save(str(tmp_path / "regular.svg"), image_prefix="images/")
+        document.save(
+            str(tmp_path / "progressive.svg"), image_prefix="images/", progressive=True
+        )
+        tag = "{http://www.w3.org/2000/svg}image"
+        regular = ET.parse(tmp_path / "regular.svg").getroot().iter(tag)
+        progressive = ET.parse(tmp_path / "progressive.svg").getroot().iter(tag)
+        hrefs = [node.get("href") for node in regular]
+        assert hrefs == ["images/01.webp", "images/02.webp"]
+        assert hrefs == [node.get("data-src") for node in progressive]
+
+    def test_requires_image_prefix(self) -> None:
+        """Test progressive output without image files is rejected."""
+        with pytest.raises(ValueError, match="image_prefix"):
+            self._make_document().tostring(progressive=True)
+
+    def test_placeholders_are_cached(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test repeated output reuses placeholders, also in async output."""
+        monkeypatch.chdir(tmp_path)
+        document = self._make_document()
+        with patch.object(
+            image_utils, "create_placeholder", wraps=image_utils.create_placeholder
+        ) as create:
+            first = document.tostring(image_prefix="images/", progressive=True)
+            second = asyncio.run(
+                document.tostring_async(image_prefix="images/", progressive=True)
+            )
+        assert first == second
+        assert create.call_count == 2
+
+
+class TestEncodedImageCache:
+    """Tests for reusing encoded images across output calls."""
+
+    @staticmethod
+    def _make_document() -> SVGDocument:
+        svg_elem = ET.Element("svg")
+        ET.SubElement(svg_elem, "image", id="a", width="4", height="4")
+        return SVGDocument(
+            svg=svg_elem, images={"a": Image.new("RGBA", (4, 4), (255, 0, 0, 255))}
+        )
+
+    def test_outputs_share_encoded_images(self, tmp_path: Path) -> None:
+        """Test tostring(), save(), rasterize(), and export() encode once."""
+        document = self._make_document()
+        with patch(
+            "psd2svg.image_utils.encode_image",
+            wraps=image_utils.encode_image,
+        ) as encode_image:
+            embedded = document.tostring()
+            document.save(
+                str(tmp_path / "output.svg"), embed_images=False, image_prefix="img"
+            )
+            document.rasterize()
+            exported = document.export()
+            assert encode_image.call_count == 1
+
+        assert isinstance(exported["images"], dict)
+        data = exported["images"]["a"]
+        assert (tmp_path / "img01.webp").read_bytes() == data
+        assert image_utils.bytes_to_data_uri(data, "webp") in embedded
+
+    def test_cache_is_keyed_by_format(self) -> None:
+        """Test each image format is encoded separately."""
+        document = self._make_document()
+        assert "data:image/png;" in document.tostring(image_format="png")
+        assert "data:image/webp;" in document.tostring(image_format="webp")
+        assert {key[1] for key in document._image_data_cache} == {"png", "webp"}
+
+    def test_replacing_image_invalidates_cache(self) -> None:
+        """Test a replaced image is encoded again."""
+        document = self._make_document()
+        before = document.tostring(image_format="png")
+        document.images["a"] = Image.new("RGBA", (4, 4), (0, 0, 255, 255))
+        after = document.tostring(image_format="png")
+        assert after != before
+        red, _, blue, _ = document.rasterize().getpixel((0, 0))
+        assert blue > 200 and red < 50
+
+
+class TestStreamingWrite:
+    """Tests for writing documents to streams with streamed image data."""
+
+    @staticmethod
+    def _make_document() -> SVGDocument:
+        svg_elem = ET.Element("svg")
+        for image_id in ("a", "b", "c"):
+            ET.SubElement(svg_elem, "image", id=image_id, width="8", height="8")
+        red = Image.new("RGBA", (8, 8), (255, 0, 0, 255))
+        return SVGDocument(
+            svg=svg_elem,
+            images={"a": red, "b": red, "c": Image.new("L", (8, 8), 128)},
+        )
+
+    def test_write_matches_tostring(self) -> None:
+        """Test write() produces the same output as tostring()."""
+        document = self._make_document()
+        stream = io.StringIO()
+        document.write(stream, image_format="png")
+        assert stream.getvalue() == document.tostring(image_format="png")
+        assert "psd2svg-payload" not in stream.getvalue()
+
+    def test_save_matches_tostring(self, tmp_path: Path) -> None:
+        """Test save() streams the same output as tostring()."""
+        document = self._make_document()
+        output_file = tmp_path / "output.svg"
+        document.save(str(output_file))
+        assert output_file.read_text(encoding="utf-8") == document.tostring()
+
+    def test_tree_is_serialized_without_image_data(self) -> None:
+        """Test the tree holds placeholders and each payload is consumed."""
+        document = self._make_document()
+        with patch("psd2svg.svg_utils.write", wraps=svg_utils.write) as write:
+            document.write(io.StringIO())
+        serialized = write.call_args.args[0]
+        hrefs = [
+            element.get("href", "")
+            for element in serialized.iter()
+            if element.get("href", "").startswith("data:")
+        ]
+        assert len(hrefs) == 2
+        assert all("psd2svg-payload" in href for href in hrefs)
+        assert write.call_args.kwargs["payloads"] == {}
+
+    def test_large_images_are_written_in_chunks(self) -> None:
+        """Test no single write holds a whole encoded image."""
+        pixels = np.random.default_rng(0).integers(0, 256, (512, 512), dtype=np.uint8)
+        noise = Image.fromarray(pixels)
+        document = SVGDocument(
+            svg=ET.Element("svg"),
+            images={"noise": noise},
+        )
+        ET.SubElement(document.svg, "image", id="noise", width="512", height="512")
+        writes: list[str] = []
+        stream = io.StringIO()
+        stream.write = writes.append  # type: ignore[method-assign]
+        document.write(stream, image_format="png")
+
+        output = "".join(writes)
+        assert output == document.tostring(image_format="png")
+        chunk_length = svg_utils.BASE64_CHUNK_SIZE // 3 * 4
+        assert len(output) > chunk_length
+        assert max(len(text) for text in writes) <= chunk_length
+
+
+class TestLazyImages:
+    """Tests for deferring pixel decoding until output."""
+
+    FIXTURE = "clipping/clipping-4-pixel-mask-with-transform-w-mask.psd"
+
+    def test_images_are_lazy_handles(self) -> None:
+        """Test lazy handles decode to the same pixels as eager images."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        eager = SVGDocument.from_psd(psdimage)
+        lazy = SVGDocument.from_psd(psdimage, lazy_images=True)
+
+        assert lazy.images.keys() == eager.images.keys()
+        modes = set()
+        for image_id, image in lazy.images.items():
+            assert isinstance(image, image_utils.LazyImage)
+            decoded = image.load()
+            expected = eager.images[image_id]
+            assert isinstance(expected, Image.Image)
+            assert (image.mode, image.size) == (expected.mode, expected.size)
+            assert decoded.tobytes() == expected.tobytes()
+            modes.add(image.mode)
+        assert modes == {"RGBA", "L"}
+
+    def test_output_matches_eager_images(self) -> None:
+        """Test lazy images produce the same SVG structure and rendering."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        eager = SVGDocument.from_psd(psdimage)
+        lazy = SVGDocument.from_psd(psdimage, lazy_images=True)
+        assert len(lazy.tostring()) == len(eager.tostring())
+        assert lazy.rasterize().tobytes() == eager.rasterize().tobytes()
+
+    def test_pickle_decodes_lazy_images(self) -> None:
+        """Test pickled lazy handles load back as PIL images."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        lazy = SVGDocument.from_psd(psdimage, lazy_images=True)
+        images = pickle.loads(pickle.dumps(lazy.images))
+        assert all(isinstance(image, Image.Image) for image in images.values())
+
+    def test_lazy_images_are_deduplicated(self) -> None:
+        """Test handles with identical channel data share one entry."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        layer = next(layer for layer in psdimage.descendants() if layer.has_pixels())
+        converter = Converter(psdimage, lazy_images=True)
+        converter.add_pixel(layer)
+        converter.add_pixel(layer)
+        assert len(converter.images) == 2
+        assert len(converter.image_store) == 1
+
+    def test_layer_without_image_data_is_skipped(self) -> None:
+        """Test layers that topil() cannot decode are skipped while building."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        layer = next(layer for layer in psdimage.descendants() if layer.has_pixels())
+        ids = [info.id for info in layer._record.channel_info]
+        layer._channels[ids.index(1)].data = b""
+        assert layer.has_pixels() and layer.topil() is None
+
+        eager = SVGDocument.from_psd(psdimage)
+        lazy = SVGDocument.from_psd(psdimage, lazy_images=True)
+        assert lazy.images.keys() == eager.images.keys()
+        assert lazy.rasterize().tobytes() == eager.rasterize().tobytes()
+
+    def test_decodes_eagerly_without_channel_data(self) -> None:
+        """Test layers fall back to eager images if channel data is unavailable."""
+        psdimage = PSDImage.open(get_fixture(self.FIXTURE))
+        eager = SVGDocument.from_psd(psdimage)
+        with patch("psd2svg.core.layer._channel_data", return_value=None):
+            lazy = SVGDocument.from_psd(psdimage, lazy_images=True)
+        assert lazy.images.keys() == eager.images.keys()
+        assert all(isinstance(image, Image.Image) for image in lazy.images.values())
+        assert lazy.tostring() == eager.tostring()
+
+
+class TestLowMemory:
+    """Tests for keeping images compressed during the build."""
+
+    def test_images_are_compressed(self) -> None:
+        """Test images are stored as PNG bytes and opaque layers as RGB."""
+        converter = Converter(PSDImage.new("RGB", (4, 4)), low_memory=True)
+        converter.store_image("opaque", Image.new("RGBA", (4, 4), (1, 2, 3, 255)))
+        converter.store_image("clear", Image.new("RGBA", (4, 4), (1, 2, 3, 128)))
+        converter.store_image("mask", Image.new("L", (4, 4), 7))
+
+        images = converter.images
+        assert all(
+            isinstance(image, image_utils.CompressedImage) for image in images.values()
+        )
+        assert [images[key].mode for key in ("opaque", "clear", "mask")] == [
+            "RGB",
+            "RGBA",
+            "L",
+        ]
+        assert images["opaque"].load().getpixel((0, 0)) == (1, 2, 3)
+
+    def test_duplicates_are_compressed_once(self) -> None:
+        """Test identical images share one compressed image."""
+        converter = Converter(PSDImage.new("RGB", (4, 4)), low_memory=True)
+        converter.store_image("a", Image.new("RGBA", (4, 4), (1, 2, 3, 255)))
+        converter.store_image("b", Image.new("RGBA", (4, 4), (1, 2, 3, 255)))
+        assert converter.images["a"] is converter.images["b"]
+
+    def test_output_renders_identically(self) -> None:
+        """Test low-memory documents rasterize like regular ones."""
+        psdimage = PSDImage.open(
+            get_fixture("clipping/clipping-4-pixel-mask-with-transform-w-mask.psd")
+        )
+        regular = SVGDocument.from_psd(psdimage)
+        compressed = SVGDocument.from_psd(psdimage, low_memory=True)
+        assert compressed.rasterize().tobytes() == regular.rasterize().tobytes()
+
+    def test_pickle_keeps_images_compressed(self) -> None:
+        """Test compressed images pickle as their PNG bytes."""
+        image = image_utils.CompressedImage.from_image(
+            Image.new("RGBA", (64, 64), (1, 2, 3, 4))
+        )
+        restored = pickle.loads(pickle.dumps(image))
+        assert isinstance(restored, image_utils.CompressedImage)
+        assert restored.data == image.data
+        assert restored.key == image.key
+        assert restored.load().tobytes() == image.load().tobytes()
+
+
+class TestTrimImages:
+    """Tests for cropping transparent borders of layer images and masks."""
+
+    def test_content_bbox(self) -> None:
+        """Test the box covers non-transparent pixels or non-background values."""
+        image = Image.new("RGBA", (8, 6), (255, 0, 0, 0))
+        image.putpixel((2, 1), (255, 0, 0, 1))
+        image.putpixel((5, 3), (255, 0, 0, 255))
+        assert image_utils.content_bbox(image) == (2, 1, 6, 4)
+        assert image_utils.content_bbox(Image.new("RGBA", (4, 4))) is None
+        assert image_utils.content_bbox(Image.new("L", (4, 4), 9), 9) is None
+
+    def test_mask_is_trimmed(self) -> None:
+        """Test a mask with black borders is cropped and repositioned."""
+        psdimage = PSDImage.new("RGB", (200, 100))
+        image = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+        sticker = Image.new("RGBA", (20, 20), (255, 0, 0, 255))
+        gradient = Image.linear_gradient("L").resize((20, 20))
+        sticker.putalpha(Image.eval(gradient, lambda value: max(value, 1)))
+        image.paste(sticker, (50, 20))
+        psdimage.append(PixelLayer.frompil(image, psdimage, "sticker"))
+
+        regular = SVGDocument.from_psd(psdimage)
+        trimmed = SVGDocument.from_psd(psdimage, trim_images=True)
+        mask = trimmed.svg.find(".//mask/image")
+        assert mask is not None
+        assert [mask.get(key) for key in ("x", "y", "width", "height")] == [
+            "50",
+            "20",
+            "20",
+            "20",
+        ]
+        assert trimmed.images[mask.attrib["id"]].size == (20, 20)
+
+        assert np.array_equal(render(trimmed), render(regular))
+
+    @pytest.mark.parametrize(
+        "fixture",
+        [
+            "layer-types/pixel-layer.psd",
+            "clipping/clipping-4-pixel-mask-with-transform-w-mask.psd",
+        ],
+    )
+    def test_fixture_renders_identically(self, fixture: str) -> None:
+        """Test trimming does not change the rendering of fixtures."""
+        psdimage = PSDImage.open(get_fixture(fixture))
+        regular = SVGDocument.from_psd(psdimage)
+        trimmed = SVGDocument.from_psd(psdimage, trim_images=True)
+        assert trimmed.rasterize().tobytes() == regular.rasterize().tobytes()
+
+
+class TestCropToCanvas:
+    """Tests for cropping layer images and masks to the canvas."""
+
+    @staticmethod
+    def _bleeding_psd(alpha: bool = False) -> PSDImage:
+        """Create a 100x80 canvas with a 300x200 layer bleeding off every side."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        image = Image.linear_gradient("L").resize((300, 200)).convert("RGBA")
+        if alpha:
+            image.putalpha(Image.linear_gradient("L").resize((300, 200)))
+        psdimage.append(
+            PixelLayer.frompil(image, psdimage, "photo", top=-50, left=-100)
+        )
+        return psdimage
+
+    def test_layer_is_cropped(self) -> None:
+        """Test a layer is cropped to the canvas and renders identically."""
+        psdimage = self._bleeding_psd()
+        regular = SVGDocument.from_psd(psdimage)
+        cropped = SVGDocument.from_psd(psdimage, crop_to_canvas=True)
+
+        node = cropped.svg.find(".//image")
+        assert node is not None
+        assert [node.get(key) for key in ("x", "y", "width", "height")] == [
+            "0",
+            "0",
+            "100",
+            "80",
+        ]
+        assert cropped.images[node.attrib["id"]].size == (100, 80)
+        assert np.array_equal(render(cropped), render(regular))
+
+    def test_mask_is_cropped(self) -> None:
+        """Test a layer mask is cropped along with its layer."""
+        psdimage = self._bleeding_psd(alpha=True)
+        regular = SVGDocument.from_psd(psdimage)
+        cropped = SVGDocument.from_psd(psdimage, crop_to_canvas=True)
+
+        assert [image.size for image in cropped.images.values()] == [
+            (100, 80),
+            (100, 80),
+        ]
+        assert np.array_equal(render(cropped), render(regular))
+
+    def test_lazy_images_stay_lazy(self) -> None:
+        """Test lazy images are cropped when loaded."""
+        document = SVGDocument.from_psd(
+            self._bleeding_psd(), crop_to_canvas=True, lazy_images=True
+        )
+        for image in document.images.values():
+            assert isinstance(image, image_utils.LazyImage)
+            assert image.size == (100, 80)
+            assert image.load().size == (100, 80)
+
+    def test_layer_outside_canvas(self) -> None:
+        """Test a layer outside the canvas is reduced to a single pixel."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        psdimage.append(
+            PixelLayer.frompil(Image.new("RGB", (20, 20)), psdimage, left=200)
+        )
+        document = SVGDocument.from_psd(psdimage, crop_to_canvas=True)
+        assert [image.size for image in document.images.values()] == [(1, 1)]
+
+    def test_artboard_bounds(self) -> None:
+        """Test visible bounds are intersected with each artboard."""
+        psdimage = PSDImage.open(get_fixture("layer-types/artboard.psd"))
+        converter = Converter(psdimage, crop_to_canvas=True)
+        bounds = []
+        add_fill = converter.add_fill
+
+        def record(layer: Any, **attrib: str) -> ET.Element | None:
+            bounds.append(converter.visible_bounds)
+            return add_fill(layer, **attrib)
+
+        with patch.object(converter, "add_fill", record):
+            converter.build()
+        assert bounds == [(0, 40, 320, 280), (460, 0, 700, 320)]
+        assert converter.visible_bounds == (0, 0, 700, 320)
+
+
+class TestVectorMasks:
+    """Tests for drawing uniform and rectangular masks with rectangles."""
+
+    @staticmethod
+    def _masked_psd(alpha: Image.Image) -> PSDImage:
+        """Create a canvas with a 60x50 layer whose alpha becomes its mask."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        image = Image.linear_gradient("L").resize((60, 50)).convert("RGBA")
+        image.putalpha(alpha)
+        psdimage.append(PixelLayer.frompil(image, psdimage, top=10, left=20))
+        return psdimage
+
+    def test_uniform_rectangle(self) -> None:
+        """Test images of one value with at most one rectangle are described."""
+        image = Image.new("L", (8, 6), 0)
+        assert image_utils.uniform_rectangle(image) == (0, 0, (0, 0, 8, 6))
+        image.paste(200, (2, 1, 5, 6))
+        assert image_utils.uniform_rectangle(image) == (0, 200, (2, 1, 5, 6))
+        image.paste(200, (0, 0, 8, 3))
+        assert image_utils.uniform_rectangle(image) is None
+
+        image = Image.new("L", (8, 6), 200)
+        image.paste(0, (0, 3, 2, 6))
+        assert image_utils.uniform_rectangle(image) == (200, 0, (0, 3, 2, 6))
+
+    @pytest.mark.parametrize(
+        "value, box",
+        [(128, None), (200, (10, 5, 40, 30)), (0, None)],
+    )
+    def test_mask_is_drawn_with_rectangles(
+        self, value: int, box: tuple[int, int, int, int] | None
+    ) -> None:
+        """Test a vector mask renders like the mask image it replaces."""
+        alpha = Image.new("L", (60, 50), 0 if box else value)
+        if box:
+            alpha.paste(value, box)
+        psdimage = self._masked_psd(alpha)
+        document = SVGDocument.from_psd(psdimage)
+        mask = document.svg.find(".//mask")
+        assert mask is not None
+        assert mask.find("image") is None
+        assert len(document.images) == 1
+
+        with patch.object(image_utils, "uniform_rectangle", return_value=None):
+            expected = SVGDocument.from_psd(psdimage)
+        assert len(expected.images) == 2
+        assert np.array_equal(render(document), render(expected))
+
+    def test_white_mask_is_dropped(self) -> None:
+        """Test a mask that hides nothing is left out."""
+        document = SVGDocument.from_psd(self._masked_psd(Image.new("L", (60, 50), 255)))
+        assert document.svg.find(".//mask") is None
+        assert len(document.images) == 1
+
+
+class TestBakeMasks:
+    """Tests for multiplying layer masks into pixel layer alpha."""
+
+    def test_multiply_alpha(self) -> None:
+        """Test the mask scales alpha and the background fills the rest."""
+        image = Image.new("RGBA", (4, 2), (10, 20, 30, 200))
+        mask = Image.new("L", (2, 2), 128)
+        baked = image_utils.multiply_alpha(image, mask, (1, 0), background=255)
+        assert list(baked.getchannel("A").tobytes()) == [200, 100, 100, 200] * 2
+        assert baked.getpixel((1, 0))[:3] == (10, 20, 30)
+        assert image.getpixel((1, 0))[3] == 200
+
+    @pytest.mark.parametrize(
+        "fixture",
+        [
+            "clipping/clipping-4-pixel-mask-with-transform-w-mask.psd",
+            "clipping/clipping-4-pixel-mask-with-transform-wo-mask.psd",
+        ],
+    )
+    def test_mask_is_baked(self, fixture: str) -> None:
+        """Test a masked pixel layer becomes one image without a mask."""
+        psdimage = PSDImage.open(get_fixture(fixture))
+        regular = SVGDocument.from_psd(psdimage)
+        baked = SVGDocument.from_psd(psdimage, bake_masks=True)
+        assert len(baked.images) == len(regular.images) - 1
+        assert len(baked.svg.findall(".//mask")) == (
+            len(regular.svg.findall(".//mask")) - 1
+        )
+        difference = np.abs(render(baked) - render(regular))
+        assert difference.max() <= 1
+
+    @pytest.mark.parametrize(
+        "fixture",
+        [
+            "clipping/clipping-4-pixel-mask-with-transform-w-mask.psd",
+            "clipping/clipping-4-pixel-mask-with-transform-wo-mask.psd",
+        ],
+    )
+    def test_baked_mask_with_lossy_format(self, fixture: str) -> None:
+        """Test lossy WebP error comes from the separate mask, not baking.
+
+        The clipped, transformed layers of these fixtures have soft mask edges.
+        A separately encoded WebP mask picks up compression error there, while
+        the baked alpha is kept exactly.
+        """
+        psdimage = PSDImage.open(get_fixture(fixture))
+        regular = SVGDocument.from_psd(psdimage)
+        baked = SVGDocument.from_psd(psdimage, bake_masks=True)
+        expected = render(regular)
+        assert np.abs(render(baked, image_format="webp") - expected).max() <= 2
+
+    def test_inverted_mask_is_baked(self) -> None:
+        """Test pixels outside a mask with a white background stay visible."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        image = Image.new("RGBA", (60, 50), (255, 0, 0, 255))
+        alpha = Image.linear_gradient("L").resize((60, 50))
+        image.putalpha(alpha)
+        layer = PixelLayer.frompil(image, psdimage, top=10, left=20)
+        psdimage.append(layer)
+        assert layer.mask is not None
+        # Keep the first 20 mask rows, so the white background covers the rest.
+        layer.mask._data.background_color = 255
+        layer.mask._data.top, layer.mask._data.bottom = 20, 40
+
+        regular = SVGDocument.from_psd(psdimage)
+        baked = SVGDocument.from_psd(psdimage, bake_masks=True)
+        assert baked.svg.find(".//mask") is None
+        difference = np.abs(render(baked) - render(regular))
+        assert difference.max() <= 1
+
+
+class TestImageScale:
+    """Tests for downsampling images with max_image_scale and target_width."""
+
+    @staticmethod
+    def _gradient_psd() -> PSDImage:
+        """Create a 200x100 canvas with a masked gradient layer."""
+        psdimage = PSDImage.new("RGB", (200, 100))
+        image = Image.linear_gradient("L").resize((200, 100)).convert("RGBA")
+        image.putalpha(Image.linear_gradient("L").rotate(90).resize((200, 100)))
+        psdimage.append(PixelLayer.frompil(image, psdimage, "photo"))
+        return psdimage
+
+    def test_images_are_downsampled(self) -> None:
+        """Test layer and mask images shrink while their elements keep size."""
+        psdimage = self._gradient_psd()
+        regular = SVGDocument.from_psd(psdimage)
+        scaled = SVGDocument.from_psd(psdimage, max_image_scale=0.5)
+
+        assert [image.size for image in scaled.images.values()] == [
+            (100, 50),
+            (100, 50),
+        ]
+        nodes = scaled.svg.findall(".//image")
+        assert len(nodes) == 2
+        for node in nodes:
+            assert (node.get("width"), node.get("height")) == ("200", "100")
+            assert node.get("preserveAspectRatio") == "none"
+        difference = np.abs(render(scaled) - render(regular))
+        assert difference.mean() < 2
+
+    def test_target_width(self) -> None:
+        """Test target_width scales by the document width and never upsamples."""
+        psdimage = self._gradient_psd()
+        document = SVGDocument.from_psd(psdimage, target_width=50)
+        assert {image.size for image in document.images.values()} == {(50, 25)}
+
+        document = SVGDocument.from_psd(psdimage, target_width=100, max_image_scale=0.1)
+        assert {image.size for image in document.images.values()} == {(20, 10)}
+
+        document = SVGDocument.from_psd(psdimage, target_width=400)
+        assert {image.size for image in document.images.values()} == {(200, 100)}
+        assert "preserveAspectRatio=" not in document.tostring()
+
+    def test_lazy_images_stay_lazy(self) -> None:
+        """Test lazy images are downsampled when loaded."""
+        document = SVGDocument.from_psd(
+            self._gradient_psd(), max_image_scale=0.25, lazy_images=True
+        )
+        for image in document.images.values():
+            assert isinstance(image, image_utils.LazyImage)
+            assert image.size == (50, 25)
+            assert image.load().size == (50, 25)
+
+    def test_low_memory(self) -> None:
+        """Test compressed images hold the downsampled pixels."""
+        document = SVGDocument.from_psd(
+            self._gradient_psd(), max_image_scale=0.5, low_memory=True
+        )
+        for image in document.images.values():
+            assert isinstance(image, image_utils.CompressedImage)
+            assert image.load().size == (100, 50)
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"max_image_scale": 0}, {"max_image_scale": 1.5}, {"target_width": 0}],
+    )
+    def test_invalid_options(self, options: dict[str, Any]) -> None:
+        """Test invalid scale options are rejected."""
+        with pytest.raises(ValueError):
+            SVGDocument.from_psd(self._gradient_psd(), **options)
+
+
+class TestTileImages:
+    """Tests for splitting large images into tiles."""
+
+    @staticmethod
+    def _large_psd() -> PSDImage:
+        """Create a 600x300 canvas with a translucent, masked gradient layer."""
+        psdimage = PSDImage.new("RGB", (600, 300))
+        image = Image.linear_gradient("L").resize((600, 300)).convert("RGBA")
+        image.putalpha(Image.linear_gradient("L").rotate(90).resize((600, 300)))
+        layer = PixelLayer.frompil(image, psdimage, "photo")
+        layer.opacity = 128
+        psdimage.append(layer)
+        return psdimage
+
+    def test_layer_and_mask_are_tiled(self) -> None:
+        """Test large images become groups of tiles that render identically."""
+        psdimage = self._large_psd()
+        regular = SVGDocument.from_psd(psdimage)
+        tiled = SVGDocument.from_psd(psdimage, tile_size=256)
+
+        assert len(regular.images) == 2
+        assert len(tiled.images) == 12
+        groups = [
+            group for group in tiled.svg.iter("g") if group.find("image") is not None
+        ]
+        assert len(groups) == 2
+        layer_group = tiled.svg.find("g[@mask]")
+        assert layer_group is not None
+        assert layer_group.get("opacity") is not None
+        assert [tile.get("width") for tile in layer_group] == ["256", "256", "88"] * 2
+        assert [tile.get("y") for tile in layer_group] == ["0"] * 3 + ["256"] * 3
+        assert {tiled.images[tile.attrib["id"]].size for tile in layer_group} == {
+            (256, 256),
+            (88, 256),
+            (256, 44),
+            (88, 44),
+        }
+        assert np.array_equal(render(tiled), render(regular))
+
+    def test_small_images_are_kept_whole(self) -> None:
+        """Test images within the tile size produce unchanged output."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        regular = SVGDocument.from_psd(psdimage)
+        tiled = SVGDocument.from_psd(psdimage, tile_size=256)
+        assert tiled.tostring() == regular.tostring()
+
+    @pytest.mark.parametrize(
+        "fixture",
+        [
+            "effects/drop-shadow-1.psd",
+            "effects/gradient-overlay-1.psd",
+            "effects/gradient-overlay-2.psd",
+            "effects/multiple-overlays-1-no-color.psd",
+            "effects/pattern-overlay-1.psd",
+            "effects/stroke-1-raster-gradient.psd",
+        ],
+    )
+    def test_layer_with_effects(self, fixture: str) -> None:
+        """Test effect targets stay whole, as effects are sized by the target."""
+        psdimage = PSDImage.open(get_fixture(fixture))
+        regular = SVGDocument.from_psd(psdimage)
+        with patch("psd2svg.core.converter.MIN_TILE_SIZE", 16):
+            tiled = SVGDocument.from_psd(psdimage, tile_size=32)
+        assert len(tiled.images) > len(regular.images)
+        for target in tiled.svg.iterfind("defs/*[@class='pixel']"):
+            assert target.tag == "image"
+        assert np.array_equal(render(tiled), render(regular))
+
+    def test_tiles_of_downsampled_image(self) -> None:
+        """Test tiles are cut after downsampling, so they cover the layer."""
+        psdimage = self._large_psd()
+        scaled = SVGDocument.from_psd(psdimage, max_image_scale=0.5)
+        tiled = SVGDocument.from_psd(psdimage, max_image_scale=0.5, tile_size=256)
+        layer_group = tiled.svg.find("g[@mask]")
+        assert layer_group is not None
+        assert [
+            (tile.get("x"), tile.get("width"), tile.get("preserveAspectRatio"))
+            for tile in layer_group
+        ] == [("0", "512", "none"), ("512", "88", "none")]
+        assert [tiled.images[tile.attrib["id"]].size for tile in layer_group] == [
+            (256, 150),
+            (44, 150),
+        ]
+        # Upsampled tiles interpolate only up to their own edges.
+        difference = np.abs(render(tiled) - render(scaled))
+        assert difference.mean() < 0.05
+
+    def test_lazy_images_are_not_tiled(self) -> None:
+        """Test lazy images stay whole rather than decoding once per tile."""
+        document = SVGDocument.from_psd(
+            self._large_psd(), tile_size=256, lazy_images=True
+        )
+        assert len(document.images) == 2
+
+    @pytest.mark.parametrize("tile_size", [0, 255, 16384])
+    def test_invalid_tile_size(self, tile_size: int) -> None:
+        """Test tile sizes outside the supported range are rejected."""
+        with pytest.raises(ValueError):
+            SVGDocument.from_psd(self._large_psd(), tile_size=tile_size)
+
+
+class TestMaskProfile:
+    """Tests for encoding layer masks with their own profile."""
+
+    @staticmethod
+    def _masked_document() -> SVGDocument:
+        """Create a document with an opaque layer and a soft 60x50 mask."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        image = Image.new("RGBA", (60, 50), (255, 0, 0, 255))
+        image.putalpha(Image.linear_gradient("L").resize((60, 50)))
+        psdimage.append(PixelLayer.frompil(image, psdimage, top=10, left=20))
+        return SVGDocument.from_psd(psdimage)
+
+    @pytest.mark.parametrize(
+        "levels, mode",
+        [((0, 255), "1"), ((0, 85, 170, 255), "P"), (tuple(range(256)), "L")],
+    )
+    def test_encode_mask(self, levels: tuple[int, ...], mode: str) -> None:
+        """Test hard masks are packed into 1-bit or palette PNG losslessly."""
+        mask = Image.new("L", (len(levels), 3))
+        mask.putdata([value for _ in range(3) for value in levels])
+        format, data = image_utils.encode_mask(mask, image_utils.MaskProfile())
+        assert format == "png"
+        decoded = image_utils.decode_image(data)
+        assert decoded.mode == mode
+        assert decoded.convert("L").tobytes() == mask.tobytes()
+
+    def test_soft_mask_is_downsampled(self) -> None:
+        """Test soft masks use the profile format, quality, and scale."""
+        mask = Image.linear_gradient("L").resize((64, 40))
+        profile = image_utils.MaskProfile(format="webp", quality=50, scale=0.5)
+        format, data = image_utils.encode_mask(mask, profile)
+        assert format == "webp"
+        assert image_utils.decode_image(data).size == (32, 20)
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"format": "gif"}, {"quality": 101}, {"scale": 0}, {"scale": 1.5}],
+    )
+    def test_invalid_profile(self, options: dict[str, Any]) -> None:
+        """Test invalid profiles are rejected."""
+        with pytest.raises(ValueError):
+            image_utils.MaskProfile(**options)
+
+    def test_masks_use_profile(self) -> None:
+        """Test embedded masks get their own format and still cover the layer."""
+        document = self._masked_document()
+        profile = image_utils.MaskProfile(format="webp", scale=0.5)
+        svg = document.tostring(image_format="png", mask_profile=profile)
+        root = ET.fromstring(svg)
+        mask_image = root.find(".//{*}mask//{*}image")
+        assert mask_image is not None
+        assert mask_image.get("href", "").startswith("data:image/webp;")
+        assert mask_image.get("preserveAspectRatio") == "none"
+        assert image_utils.decode_data_uri(mask_image.get("href", "")).size == (30, 25)
+        hrefs = [node.get("href", "") for node in root.findall(".//{*}image")]
+        assert sum(href.startswith("data:image/png;") for href in hrefs) == 1
+
+        expected = render(document.tostring(image_format="png"))
+        assert np.abs(render(svg) - expected).max() <= 16
+
+    def test_saved_masks_get_own_extension(self, tmp_path: Path) -> None:
+        """Test saved mask files are named after the mask format."""
+        document = self._masked_document()
+        document.save(
+            str(tmp_path / "output.svg"),
+            image_prefix="images/img",
+            image_format="webp",
+            mask_profile=image_utils.MaskProfile(),
+        )
+        names = sorted(os.listdir(tmp_path / "images"))
+        assert {os.path.splitext(name)[1] for name in names} == {".png", ".webp"}
+        svg = (tmp_path / "output.svg").read_text()
+        assert all(name in svg for name in names)
+
+    def test_profile_is_part_of_cache_key(self) -> None:
+        """Test masks are encoded again when the profile changes."""
+        document = self._masked_document()
+        default = document.tostring(image_format="png")
+        document.tostring(image_format="png", mask_profile=image_utils.MaskProfile())
+        assert document.tostring(image_format="png") == default
+        assert len(document._image_data_cache) == 3
+
+
+class TestAutoImageFormat:
+    """Tests for choosing the image format per image."""
+
+    @staticmethod
+    def _flat_image() -> Image.Image:
+        """Create transparent UI art with a few colors."""
+        image = Image.new("RGBA", (60, 40), (0, 0, 0, 0))
+        image.paste((255, 0, 0, 255), (5, 5, 30, 30))
+        image.paste((0, 0, 255, 128), (20, 10, 55, 35))
+        return image
+
+    @staticmethod
+    def _photo_image() -> Image.Image:
+        """Create an opaque image with thousands of colors."""
+        noise = Image.effect_noise((64, 48), 60)
+        gradient = Image.linear_gradient("L").resize((64, 48))
+        return Image.merge("RGB", [noise, gradient, gradient.rotate(90)])
+
+    def test_flat_image_is_lossless(self) -> None:
+        """Test images with few colors are encoded without loss."""
+        image = self._flat_image()
+        format, data = image_utils.encode_auto(image)
+        assert format in ("png", "webp")
+        decoded = image_utils.decode_image(data, "RGBA")
+        assert decoded.tobytes() == image.tobytes()
+
+    def test_palette_png(self) -> None:
+        """Test the first candidate for flat images is an exact palette PNG."""
+        image = self._flat_image()
+        deadline = Deadline(0.001)
+        time.sleep(0.01)
+        format, data = image_utils.encode_auto(image, deadline)
+        assert format == "png"
+        decoded = image_utils.decode_image(data)
+        assert decoded.mode == "P"
+        assert decoded.convert("RGBA").tobytes() == image.tobytes()
+
+    def test_photo_is_lossy(self) -> None:
+        """Test opaque photos may use JPEG and transparent ones use WebP."""
+        image = self._photo_image()
+        format, _ = image_utils.encode_auto(image)
+        assert format in ("jpeg", "webp")
+        image.putalpha(128)
+        format, _ = image_utils.encode_auto(image)
+        assert format == "webp"
+
+    def test_document_uses_per_image_formats(self, tmp_path: Path) -> None:
+        """Test data URI types and file extensions follow each image's format."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        psdimage.append(PixelLayer.frompil(self._photo_image(), psdimage))
+        # The alpha of the flat image becomes a layer mask.
+        psdimage.append(PixelLayer.frompil(self._flat_image(), psdimage))
+        document = SVGDocument.from_psd(psdimage)
+        formats = {
+            image_id: image_utils.encode_auto(image_utils.load_image(image))[0]
+            for image_id, image in document.images.items()
+        }
+        assert "jpeg" in formats.values() or "webp" in formats.values()
+
+        root = ET.fromstring(document.tostring(image_format="auto"))
+        for node in root.findall(".//{*}image"):
+            href = node.get("href", "")
+            assert href.startswith(f"data:image/{formats[node.get('id', '')]};")
+
+        document.save(
+            str(tmp_path / "output.svg"), image_prefix="img", image_format="auto"
+        )
+        extensions = {os.path.splitext(name)[1] for name in os.listdir(tmp_path)}
+        assert extensions == {".svg"} | {f".{f}" for f in formats.values()}
+
+    def test_budgeted_results_are_not_cached(self) -> None:
+        """Test a result cut short by the budget is not reused without one."""
+        psdimage = PSDImage.new("RGB", (100, 80))
+        psdimage.append(PixelLayer.frompil(self._photo_image(), psdimage))
+        document = SVGDocument.from_psd(psdimage)
+        expected = SVGDocument.from_psd(psdimage).tostring(image_format="auto")
+        with patch.object(
+            image_utils, "encode_auto", wraps=image_utils.encode_auto
+        ) as encode:
+            document.tostring(image_format="auto", encode_budget=1e-9)
+            assert document.tostring(image_format="auto") == expected
+            assert document.tostring(image_format="auto") == expected
+        assert encode.call_count == 2
+
+
+class TestEncoderOptions:
+    """Tests for encoder speed/size presets."""
+
+    @staticmethod
+    def _document() -> SVGDocument:
+        return SVGDocument.from_psd(
+            PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        )
+
+    def test_balanced_matches_default(self) -> None:
+        """Test the balanced preset produces the same bytes as no options."""
+        document = self._document()
+        default = document.tostring()
+        assert document.tostring(encoder_options="balanced") == default
+        assert document.tostring(encoder_options=EncoderOptions()) == default
+        assert len(document._image_data_cache) == len(document.images)
+
+    def test_presets_trade_time_for_size(self) -> None:
+        """Test presets change the encoded bytes but not the PNG pixels."""
+        document = self._document()
+        image_ids = list(document.images)
+        fastest = document._encode_images(image_ids, "png", encoder_options="fastest")
+        smallest = document._encode_images(image_ids, "png", encoder_options="smallest")
+        assert sum(len(data) for _, data in smallest) < sum(
+            len(data) for _, data in fastest
+        )
+        for (_, fast), (_, small) in zip(fastest, smallest):
+            assert (
+                image_utils.decode_image(fast).tobytes()
+                == image_utils.decode_image(small).tobytes()
+            )
+        assert len(document._image_data_cache) == 2 * len(image_ids)
+
+    def test_export_uses_options(self) -> None:
+        """Test export() encodes with the given options."""
+        document = self._document()
+        options = EncoderOptions(webp_lossless=True)
+        exported = document.export(encoder_options=options)
+        assert isinstance(exported["images"], dict)
+        for image_id, data in exported["images"].items():
+            image = image_utils.load_image(document.images[image_id])
+            expected = np.asarray(image.convert("RGBA"))
+            decoded = np.asarray(image_utils.decode_image(data, "RGBA"))
+            # Lossless WebP keeps visible pixels, not colors under alpha 0.
+            visible = expected[..., 3] > 0
+            assert np.array_equal(decoded[visible], expected[visible])
+
+    @pytest.mark.parametrize(
+        "options",
+        ["tiny", {"webp_method": 7}, {"png_compress_level": -1}, {"jpeg_quality": 101}],
+    )
+    def test_invalid_options(self, options: str | dict[str, int]) -> None:
+        """Test unknown presets and out-of-range settings are rejected."""
+        with pytest.raises(ValueError):
+            if isinstance(options, str):
+                EncoderOptions.preset(options)
+            else:
+                EncoderOptions(**options)
+
+
+class TestOutputCopy:
+    """Tests for copying only what the output passes change."""
+
+    @pytest.mark.parametrize(
+        "fixture",
+        [
+            "clipping/clipping-4-pixel-mask-with-transform-w-mask.psd",
+            "texts/font-sizes-1.psd",
+        ],
+    )
+    def test_output_leaves_document_unchanged(self, fixture: str) -> None:
+        """Test output without optimization matches a full copy and the original."""
+        document = SVGDocument.from_psd(PSDImage.open(get_fixture(fixture)))
+        original = svg_utils.tostring(document.svg)
+        outputs = [
+            document.tostring(optimize=False, embed_fonts=embed_fonts)
+            for embed_fonts in (False, True)
+        ]
+
+        with patch.object(
+            SVGDocument,
+            "_copy_for_output",
+            lambda self, optimize: copy.deepcopy(self.svg),
+        ):
+            expected = [
+                document.tostring(optimize=False, embed_fonts=embed_fonts)
+                for embed_fonts in (False, True)
+            ]
+        assert outputs == expected
+        assert svg_utils.tostring(document.svg) == original
+
+    def test_unoptimized_output_shares_untouched_subtrees(self) -> None:
+        """Test elements the output passes do not change are not copied."""
+        document = SVGDocument.load(
+            '<svg><g id="g"><rect/></g><image id="image" href="a.png"/></svg>', {}
+        )
+        svg = document._copy_for_output(optimize=False)
+        assert svg[0] is document.svg[0]
+        assert svg[1] is not document.svg[1]
+        assert document._copy_for_output(optimize=True)[0] is not document.svg[0]
+
+    def test_serializing_leaves_shared_subtrees_alone(self, tmp_path: Path) -> None:
+        """Test output does not rewrite text or tail of elements in self.svg."""
+        document = SVGDocument(
+            svg=ET.fromstring(
+                '<svg><g id="g"><rect/><rect/></g><image id="image"/></svg>'
+            ),
+            images={"image": Image.new("RGB", (2, 2))},
+        )
+        before = ET.tostring(document.svg, encoding="unicode")
+        expected = document.tostring(optimize=False)
+        assert ET.tostring(document.svg, encoding="unicode") == before
+
+        async def save_all() -> None:
+            await asyncio.gather(
+                *(
+                    document.save_async(
+                        str(tmp_path / f"{index}.svg"),
+                        indent=" " * index,
+                        optimize=False,
+                    )
+                    for index in range(4)
+                )
+            )
+
+        asyncio.run(save_all())
+        assert ET.tostring(document.svg, encoding="unicode") == before
+        assert (tmp_path / "2.svg").read_text(encoding="utf-8") == expected
+
+
 class TestSVGDocumentEmbedFonts:
     """Tests for SVGDocument font embedding functionality."""
 
@@ -321,6 +1740,38 @@ class TestSVGDocumentEmbedFonts:
         assert "data:font/ttf;base64,MOCKDATA" in result
         mock_encode.assert_called_once_with(str(font_file))
 
+    @patch("psd2svg.core.font_utils.encode_font_data_uri")
+    @patch("psd2svg.core.font_utils.FontInfo.resolve")
+    def test_embed_fonts_cache_stats(
+        self, mock_resolve: MagicMock, mock_encode: MagicMock, tmp_path: Path
+    ) -> None:
+        """Test font embedding counts names by the result of resolution."""
+        mock_encode.return_value = "data:font/ttf;base64,MOCKDATA"
+        font_file = tmp_path / "arial.ttf"
+        font_file.write_bytes(b"FAKE_FONT")
+        mock_resolve.return_value = FontInfo(
+            postscript_name="ArialMT",
+            family="Arial",
+            style="Regular",
+            weight=80.0,
+            file=str(font_file),
+        )
+
+        def make_document() -> SVGDocument:
+            svg_elem = ET.Element("svg")
+            text_elem = ET.SubElement(svg_elem, "text")
+            text_elem.set("font-family", "ArialMT")
+            text_elem.text = "Test"
+            return SVGDocument(svg=svg_elem, images={})
+
+        hits, misses = cache_stats()["font_mapping"]
+        make_document().tostring(embed_fonts=True, subset_fonts=False)
+        assert cache_stats()["font_mapping"] == (hits + 1, misses)
+
+        mock_resolve.return_value = None
+        make_document().tostring(embed_fonts=True, subset_fonts=False)
+        assert cache_stats()["font_mapping"] == (hits + 1, misses + 1)
+
     @patch("psd2svg.core.font_utils.encode_font_data_uri")
     @patch("psd2svg.core.font_utils.FontInfo.resolve")
     def test_save_with_embed_fonts_true(
@@ -1007,3 +2458,125 @@ class TestAppendCss:
         # Read file and verify CSS is present
         svg_content = output_file.read_text()
         assert "text { color: green; }" in svg_content
+
+
+class TestSVGDocumentAsync:
+    """Tests for the asyncio API of SVGDocument."""
+
+    def test_from_psd_async_matches_from_psd(self) -> None:
+        """Test from_psd_async() produces the same document as from_psd()."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+
+        expected = SVGDocument.from_psd(psdimage).tostring()
+        document = asyncio.run(SVGDocument.from_psd_async(psdimage))
+
+        assert document.tostring() == expected
+
+    def test_tostring_async_matches_tostring(self) -> None:
+        """Test tostring_async() produces the same output as tostring()."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        document = SVGDocument.from_psd(psdimage)
+
+        async def run() -> str:
+            with ThreadPoolExecutor(max_workers=2) as image_executor:
+                return await document.tostring_async(image_executor=image_executor)
+
+        assert asyncio.run(run()) == document.tostring()
+
+    def test_image_preparation_runs_off_event_loop(self) -> None:
+        """Test mask preparation and atlas packing run in the image executor."""
+        document = SVGDocument.from_psd(TestPackImages._icons_psd())
+        threads: dict[str, threading.Thread] = {}
+
+        def record(name: str, method: Any) -> Any:
+            def wrapper(*args: Any) -> Any:
+                threads[name] = threading.current_thread()
+                return method(*args)
+
+            return wrapper
+
+        async def run() -> str:
+            with (
+                patch.object(
+                    document,
+                    "_prepare_mask_nodes",
+                    record("masks", document._prepare_mask_nodes),
+                ),
+                patch.object(
+                    document,
+                    "_pack_images",
+                    record("atlases", document._pack_images),
+                ),
+                ThreadPoolExecutor(max_workers=1) as image_executor,
+            ):
+                return await document.tostring_async(
+                    image_executor=image_executor, pack_images=32
+                )
+
+        assert asyncio.run(run()) == document.tostring(pack_images=32)
+        assert set(threads) == {"masks", "atlases"}
+        assert threading.main_thread() not in threads.values()
+
+    def test_save_async_with_image_prefix(self, tmp_path: Path) -> None:
+        """Test save_async() writes the SVG and external images."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        document = SVGDocument.from_psd(psdimage)
+        output_file = tmp_path / "output.svg"
+
+        asyncio.run(
+            document.save_async(
+                str(output_file), embed_images=False, image_prefix="img"
+            )
+        )
+
+        svg_content = output_file.read_text()
+        images = list(tmp_path.glob("img*.webp"))
+        assert len(images) == 1
+        assert f'href="{images[0].name}"' in svg_content
+
+    def test_rasterize_async(self) -> None:
+        """Test rasterize_async() returns an image of the canvas size."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        document = SVGDocument.from_psd(psdimage)
+
+        image = asyncio.run(document.rasterize_async())
+
+        assert image.size == psdimage.size
+
+    def test_from_psd_async_cancellation_stops_build(self) -> None:
+        """Test cancelling the awaiting task stops the build at the next check."""
+        psdimage = PSDImage.open(get_fixture("layer-types/pixel-layer.psd"))
+        started = threading.Event()
+        release = threading.Event()
+        deadline = Deadline(0)
+        errors: list[BaseException] = []
+
+        def blocking_build(self: Converter) -> None:
+            started.set()
+            release.wait(5)
+            try:
+                self.check_deadline()
+            except BaseException as e:
+                errors.append(e)
+                raise
+
+        async def run() -> None:
+            task = asyncio.create_task(
+                SVGDocument.from_psd_async(
+                    psdimage, executor=executor, deadline=deadline
+                )
+            )
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        with (
+            patch.object(Converter, "build", blocking_build),
+            ThreadPoolExecutor(max_workers=1) as executor,
+        ):
+            asyncio.run(run())
+            assert deadline.cancelled()
+            release.set()
+        assert len(errors) == 1
+        assert isinstance(errors[0], CancelledError)
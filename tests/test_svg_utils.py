@@ -1,5 +1,7 @@
 """Tests for SVG utility functions."""
 
+import base64
+import io
 import xml.etree.ElementTree as ET
 
 import pytest
@@ -221,6 +223,122 @@ class TestSvgFormatting:
         )
 
 
+class TestWrite:
+    """Tests for writing SVG with streamed payloads."""
+
+    def test_write_matches_tostring(self) -> None:
+        """Test write() produces the same text as tostring()."""
+        svg = ET.fromstring('<svg><g><rect width="1"/></g></svg>')
+        stream = io.StringIO()
+        svg_utils.write(svg, stream)
+        assert stream.getvalue() == svg_utils.tostring(svg)
+
+    def test_payloads_are_written_as_base64_chunks(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test placeholder tokens are replaced by base64 in several writes."""
+        monkeypatch.setattr(svg_utils, "BASE64_CHUNK_SIZE", 3)
+        data = bytes(range(10))
+        svg = ET.fromstring(
+            '<svg><image href="data:image/png;base64,TOKEN1"/>'
+            '<image href="data:image/png;base64,TOKEN2"/></svg>'
+        )
+        expected = svg_utils.tostring(svg, indent="")
+        writes: list[str] = []
+        stream = io.StringIO()
+        monkeypatch.setattr(stream, "write", writes.append)
+        payloads = {"TOKEN1": data, "TOKEN2": data}
+        svg_utils.write(svg, stream, indent="", payloads=payloads)
+
+        encoded = base64.b64encode(data).decode("ascii")
+        assert "".join(writes) == expected.replace("TOKEN1", encoded).replace(
+            "TOKEN2", encoded
+        )
+        assert max(len(chunk) for chunk in writes if chunk in encoded) == 4
+        assert payloads == {}
+
+    def test_payloads_are_released_once_written(self) -> None:
+        """Test each payload is dropped before later elements are written."""
+        svg = ET.fromstring(
+            '<svg><image href="data:image/png;base64,TOKEN1"/>'
+            '<image href="data:image/png;base64,TOKEN2"/></svg>'
+        )
+        payloads = {"TOKEN1": b"first", "TOKEN2": b"second"}
+        remaining: list[set[str]] = []
+
+        class Stream(io.StringIO):
+            def write(self, text: str) -> int:
+                remaining.append(set(payloads))
+                return super().write(text)
+
+        svg_utils.write(svg, Stream(), indent="", payloads=payloads)
+        assert {"TOKEN2"} in remaining
+        assert remaining[-1] == set()
+
+    def test_write_does_not_modify_tree(self) -> None:
+        """Test indentation and whitespace handling leave the tree untouched."""
+        svg = ET.fromstring(
+            '<svg><g> <rect width="1"/></g><text> <tspan>A</tspan> </text></svg>'
+        )
+        before = ET.tostring(svg, encoding="unicode")
+        assert svg_utils.tostring(svg) == (
+            '<svg>\n  <g>\n    <rect width="1" />\n  </g>\n'
+            "  <text><tspan>A</tspan></text>\n</svg>"
+        )
+        assert ET.tostring(svg, encoding="unicode") == before
+
+    def test_xhtml_elements_are_unprefixed(self) -> None:
+        """Test XHTML in foreignObject is written with a default namespace."""
+        svg = svg_utils.create_node("svg")
+        foreign_object = svg_utils.create_node("foreignObject", parent=svg)
+        div = svg_utils.create_xhtml_node("div", parent=foreign_object)
+        svg_utils.create_xhtml_node("p", parent=div, text="Hello", xml_space="preserve")
+        assert svg_utils.tostring(svg, indent="") == (
+            "<svg>\n<foreignObject>\n"
+            f'<div xmlns="{svg_utils.XHTML_NAMESPACE}">\n'
+            '<p xml:space="preserve">Hello</p>\n'
+            "</div>\n</foreignObject>\n</svg>"
+        )
+
+
+class TestCopySubtrees:
+    """Tests for copying only the subtrees that get modified."""
+
+    def test_copies_matches_and_ancestors(self) -> None:
+        """Test matches are copied with their ancestors and the rest is shared."""
+        svg = ET.fromstring(
+            '<svg><g id="a"><image id="i"/><rect/></g><g id="b"><rect/></g></svg>'
+        )
+        copied = svg_utils.copy_subtrees(svg, lambda node: node.tag == "image")
+
+        assert svg_utils.tostring(copied) == svg_utils.tostring(svg)
+        assert copied is not svg
+        assert copied[0] is not svg[0]
+        assert copied[0][0] is not svg[0][0]
+        assert copied[0][1] is svg[0][1]
+        assert copied[1] is svg[1]
+
+    def test_changes_to_copies_do_not_affect_original(self) -> None:
+        """Test modifying copied elements leaves the original tree unchanged."""
+        svg = ET.fromstring(
+            '<svg><g><text font-family="A"><tspan>x</tspan></text></g></svg>'
+        )
+        original = svg_utils.tostring(svg)
+        copied = svg_utils.copy_subtrees(svg, lambda node: "font-family" in node.attrib)
+        copied[0][0][0].set("font-weight", "700")
+        copied[0].set("id", "group")
+        copied.insert(0, ET.Element("style"))
+
+        assert svg_utils.tostring(svg) == original
+        assert copied[1][0][0].get("font-weight") == "700"
+
+    def test_matching_root_is_deep_copied(self) -> None:
+        """Test the whole tree is copied when the root matches."""
+        svg = ET.fromstring("<svg><g/></svg>")
+        copied = svg_utils.copy_subtrees(svg, lambda node: True)
+        assert copied[0] is not svg[0]
+
+
 class TestMergeAttributeLessChildren:
     """Test the merge_attribute_less_children function."""
 
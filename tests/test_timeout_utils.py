@@ -5,15 +5,18 @@ This module tests the cross-platform timeout functionality:
 - Threading-based timeout on Windows
 - Timeout disabled behavior
 - Exception propagation
+- Cooperative deadlines from worker threads
 """
 
 import signal
 import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
-from psd2svg.timeout_utils import with_timeout
+from psd2svg.timeout_utils import Deadline, with_timeout
 
 
 class TestWithTimeoutBasicBehavior:
@@ -293,3 +296,63 @@ class TestWithTimeoutEdgeCases:
 
         result = with_timeout(outer_function, 5)
         assert result == "outer: inner result"
+
+
+class TestDeadline:
+    """Tests for the cooperative Deadline."""
+
+    def test_disabled_deadline_never_expires(self) -> None:
+        """Test a zero or negative timeout disables the deadline."""
+        for timeout in (0, -1):
+            deadline = Deadline(timeout)
+            assert deadline.remaining() is None
+            assert not deadline.expired()
+            deadline.check()
+
+    def test_check_passes_before_expiry(self) -> None:
+        """Test check() does nothing while time remains."""
+        deadline = Deadline(60)
+        deadline.check()
+        remaining = deadline.remaining()
+        assert remaining is not None and 0 < remaining <= 60
+
+    def test_check_raises_after_expiry(self) -> None:
+        """Test check() raises the standard TimeoutError once expired."""
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        assert deadline.expired()
+        assert deadline.remaining() == 0.0
+        with pytest.raises(
+            TimeoutError, match="PSD conversion timed out after 0.01 seconds"
+        ):
+            deadline.check()
+
+    def test_error_message_matches_with_timeout(self) -> None:
+        """Test the error message includes the same guidance as with_timeout()."""
+        deadline = Deadline(1)
+        later = time.monotonic() + 2.0
+        with patch("psd2svg.timeout_utils.time.monotonic", return_value=later):
+            with pytest.raises(TimeoutError) as exc_info:
+                deadline.check()
+        message = str(exc_info.value)
+        assert "PSD conversion timed out after 1 seconds" in message
+        assert "PSD2SVG_TIMEOUT=2" in message
+        assert "ResourceLimits(timeout=2)" in message
+
+    def test_check_raises_from_worker_thread(self) -> None:
+        """Test an expired deadline raises TimeoutError outside the main thread."""
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(deadline.check)
+            with pytest.raises(TimeoutError):
+                future.result()
+
+    def test_cancel_raises_cancelled_error(self) -> None:
+        """Test check() raises CancelledError after cancel(), even if unlimited."""
+        deadline = Deadline(0)
+        assert not deadline.cancelled()
+        deadline.cancel()
+        assert deadline.cancelled()
+        with pytest.raises(CancelledError, match="cancelled"):
+            deadline.check()